@@ -0,0 +1,217 @@
+import asyncio
+import collections
+
+from minheap import MinHeap
+
+
+class AsyncPriorityQueue:
+    """
+    Priority queue for asyncio coroutines, with the same
+    interface as asyncio.Queue (get, put, task_done, join)
+    plus update_priority. Unlike asyncio.PriorityQueue, which
+    uses the heapq module, this queue is built on a MinHeap,
+    so the priority of an element that is already in the
+    queue can be changed.
+
+    If the queue has a maximum size, put waits until there
+    is space in the queue, so that fast producers can't
+    overwhelm slower consumers.
+
+    This class is not thread-safe: it must only be used
+    from coroutines running in the same event loop.
+    """
+
+    _mh: MinHeap
+    _maxsize: int
+
+    # Futures for the coroutines that are waiting to get
+    # an element from the queue, or to put an element in it
+    _getters: collections.deque[asyncio.Future]
+    _putters: collections.deque[asyncio.Future]
+
+    # Number of elements that have been put in the queue, but
+    # for which task_done hasn't been called yet
+    _unfinished_tasks: int
+    _finished: asyncio.Event
+
+    def __init__(self, maxsize: int = 0):
+        """
+        Constructor. Creates an empty priority queue.
+
+        Args:
+          maxsize: Maximum number of elements in the queue
+            (if zero or negative, the queue is unbounded)
+        """
+        self._mh = MinHeap()
+        self._maxsize = maxsize
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+        self._unfinished_tasks = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of elements in the priority queue
+        """
+        return self._mh.size
+
+    def empty(self) -> bool:
+        """
+        Returns: whether the queue is empty or not
+        """
+        return self._mh.empty
+
+    def full(self) -> bool:
+        """
+        Returns: whether the queue has reached its maximum size
+        """
+        return 0 < self._maxsize <= self._mh.size
+
+    @staticmethod
+    def _wakeup_next(waiters: collections.deque[asyncio.Future]) -> None:
+        """
+        Wakes up the first coroutine in waiters that is still
+        waiting (i.e., that hasn't been cancelled)
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait(self, waiters: collections.deque[asyncio.Future]) -> None:
+        """
+        Adds a future to waiters, and waits until another
+        coroutine sets its result.
+
+        If the waiting coroutine is cancelled after it was
+        woken up, we wake up the next coroutine in waiters
+        instead, so that the wake-up isn't lost.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            if waiters is self._getters and not self.empty():
+                self._wakeup_next(waiters)
+            elif waiters is self._putters and not self.full():
+                self._wakeup_next(waiters)
+            raise
+
+    async def put(self, value: str, priority: int) -> None:
+        """
+        Puts an element in the queue. If the queue is full,
+        waits until there is space in the queue.
+
+        Args:
+          value: Value to enqueue
+          priority: Priority (lower values mean higher priority)
+
+        Raises:
+          ValueError: If `value` is already in the priority queue
+
+        Returns: Nothing
+        """
+        while self.full():
+            await self._wait(self._putters)
+        self.put_nowait(value, priority)
+
+    def put_nowait(self, value: str, priority: int) -> None:
+        """
+        Puts an element in the queue without waiting.
+
+        Args:
+          value: Value to enqueue
+          priority: Priority (lower values mean higher priority)
+
+        Raises:
+          ValueError: If `value` is already in the priority queue
+          asyncio.QueueFull: If the queue is full
+
+        Returns: Nothing
+        """
+        if self.full():
+            raise asyncio.QueueFull
+        self._mh.insert(priority, value)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+    async def get(self) -> tuple[str, int]:
+        """
+        Removes the highest-priority element from the queue.
+        If the queue is empty, waits until an element is added.
+
+        Returns: Tuple with the highest-priority element
+        and its priority.
+        """
+        while self.empty():
+            await self._wait(self._getters)
+        return self.get_nowait()
+
+    def get_nowait(self) -> tuple[str, int]:
+        """
+        Removes the highest-priority element from the queue
+        without waiting.
+
+        Raises:
+          asyncio.QueueEmpty: If the queue is empty
+
+        Returns: Tuple with the highest-priority element
+        and its priority.
+        """
+        elem = self._mh.remove_min()
+        if elem is None:
+            raise asyncio.QueueEmpty
+        self._wakeup_next(self._putters)
+        prio, val = elem
+        return val, prio
+
+    def update_priority(self, value: str, new_priority: int) -> None:
+        """
+        Updates the priority of an element in the priority queue
+
+        Args:
+          value: Value whose priority we want to update
+          new_priority: New priority (lower values mean higher priority)
+
+        Raises:
+          ValueError: If `value` does not exist in the priority queue.
+
+        Returns: Nothing
+        """
+        self._mh.change_priority(value, new_priority)
+
+    def task_done(self) -> None:
+        """
+        Indicates that an element that was removed from the
+        queue has been processed.
+
+        Raises:
+          ValueError: If called more times than there were
+            elements put in the queue.
+
+        Returns: Nothing
+        """
+        if self._unfinished_tasks <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished_tasks -= 1
+        if self._unfinished_tasks == 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """
+        Waits until every element that was put in the queue
+        has been removed and processed (i.e., task_done has
+        been called once for every element).
+        """
+        if self._unfinished_tasks > 0:
+            await self._finished.wait()
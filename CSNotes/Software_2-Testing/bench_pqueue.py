@@ -0,0 +1,362 @@
+"""
+Benchmark harness that compares the PriorityQueue in
+pqueue_naive.py with the PriorityQueue in pqueue.py (with
+each of its backends) on reproducible workloads, and can save
+the results to a JSON file so they can be compared across
+releases.
+
+Usage:
+    python bench_pqueue.py                        # Default sizes
+    python bench_pqueue.py --sizes 100 10000000   # From 1e2 to 1e7
+    python bench_pqueue.py --workloads mixed --impls naive heap
+    python bench_pqueue.py --output new.json      # Save the results
+    python bench_pqueue.py --baseline old.json    # Compare with old results
+
+For every implementation, workload and size, the harness
+reports the throughput (operations per second, measured on
+a run without any per-operation instrumentation), the p50
+and p99 latency of a single operation (measured on a second
+run), and the peak memory allocated while running the
+workload (measured on a third run, with tracemalloc).
+
+If a run takes longer than the time budget, the larger
+sizes are skipped for that implementation and workload.
+The naive implementation keeps its elements sorted (in
+a SortedRuns), so it takes O(sqrt(n)) time per operation
+instead of O(log n).
+"""
+
+import argparse
+from array import array
+import heapq
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Optional, Union
+
+import pqueue
+import pqueue_naive
+
+Queue = Union[pqueue.PriorityQueue, pqueue_naive.PriorityQueue]
+
+# Operations in a workload
+ENQUEUE, DEQUEUE, UPDATE = 0, 1, 2
+
+# A workload is a list of (value, priority) pairs that are
+# enqueued before the measurement starts, and a list of
+# (operation, value, priority) triples
+Workload = tuple[list[tuple[str, int]], list[tuple[int, str, int]]]
+
+
+def _implementations() -> dict[str, Callable[[], Queue]]:
+    """
+    Returns: Functions that create an empty queue for each
+     implementation. Every backend of pqueue.PriorityQueue is
+     included, so new backends are benchmarked automatically.
+    """
+    impls: dict[str, Callable[[], Queue]] = {
+        "naive": pqueue_naive.PriorityQueue,
+    }
+    for backend in pqueue._BACKENDS:
+        impls[backend] = lambda backend=backend: pqueue.PriorityQueue(backend)
+    return impls
+
+
+def _make_workload(name: str, n: int, seed: int) -> Workload:
+    """
+    Generates a workload with n operations. The contents of
+    the queue are simulated with heapq while generating the
+    operations, so that every dequeue is done on a non-empty
+    queue and every update refers to a value in the queue.
+
+    Workloads:
+      enqueue: n enqueues on an empty queue
+      dequeue: n dequeues from a queue with n elements
+      update:  n priority updates on a queue with n elements
+      mixed:   40% enqueues, 40% dequeues and 20% updates, on a
+               queue that starts with n/2 elements
+    """
+    rng = random.Random(f"{name}-{n}-{seed}")
+    prio_range = max(n, 10)
+    counter = 0
+
+    # Simulated queue: a heap with stale entries, the current
+    # priority of each value, and a list of the values in the
+    # queue (to pick random values to update)
+    heap: list[tuple[int, str]] = []
+    prio_of: dict[str, int] = {}
+    live: list[str] = []
+    live_index: dict[str, int] = {}
+
+    def enqueue() -> tuple[str, int]:
+        nonlocal counter
+        value = f"item{counter:08d}"
+        counter += 1
+        prio = rng.randrange(prio_range)
+        heapq.heappush(heap, (prio, value))
+        prio_of[value] = prio
+        live_index[value] = len(live)
+        live.append(value)
+        return value, prio
+
+    def dequeue() -> None:
+        while True:
+            prio, value = heapq.heappop(heap)
+            if prio_of.get(value) == prio:
+                break
+        del prio_of[value]
+        i = live_index.pop(value)
+        last = live.pop()
+        if last != value:
+            live[i] = last
+            live_index[last] = i
+
+    def update() -> tuple[str, int]:
+        value = live[rng.randrange(len(live))]
+        prio = rng.randrange(prio_range)
+        heapq.heappush(heap, (prio, value))
+        prio_of[value] = prio
+        return value, prio
+
+    if name == "enqueue":
+        prefill_size, mix = 0, (1.0, 0.0)
+    elif name == "dequeue":
+        prefill_size, mix = n, (0.0, 1.0)
+    elif name == "update":
+        prefill_size, mix = n, (0.0, 0.0)
+    elif name == "mixed":
+        prefill_size, mix = n // 2, (0.4, 0.8)
+    else:
+        raise ValueError(f"unknown workload: {name}")
+
+    prefill = [enqueue() for _ in range(prefill_size)]
+    ops = []
+    for _ in range(n):
+        r = rng.random()
+        if r < mix[0] or not live:
+            ops.append((ENQUEUE, *enqueue()))
+        elif r < mix[1]:
+            dequeue()
+            ops.append((DEQUEUE, "", 0))
+        else:
+            ops.append((UPDATE, *update()))
+    return prefill, ops
+
+
+WORKLOADS = ("enqueue", "dequeue", "update", "mixed")
+
+
+def _prefilled(make_queue: Callable[[], Queue], workload: Workload) -> Queue:
+    """
+    Returns: A new queue containing the prefill of a workload
+    """
+    q = make_queue()
+    for value, prio in workload[0]:
+        q.enqueue(value, prio)
+    return q
+
+
+def _run(q: Queue, ops: list[tuple[int, str, int]]) -> None:
+    """
+    Runs the operations of a workload on a queue
+    """
+    enqueue, dequeue, update = q.enqueue, q.dequeue, q.update_priority
+    for op, value, prio in ops:
+        if op == ENQUEUE:
+            enqueue(value, prio)
+        elif op == DEQUEUE:
+            dequeue()
+        else:
+            update(value, prio)
+
+
+def _latencies(q: Queue, ops: list[tuple[int, str, int]]) -> array:
+    """
+    Runs the operations of a workload on a queue, timing
+    each of them individually.
+
+    Returns: Array with the latency of each operation, in ns
+    """
+    enqueue, dequeue, update = q.enqueue, q.dequeue, q.update_priority
+    clock = time.perf_counter_ns
+    rv = array("q", bytes(8 * len(ops)))
+    for i, (op, value, prio) in enumerate(ops):
+        if op == ENQUEUE:
+            start = clock()
+            enqueue(value, prio)
+            rv[i] = clock() - start
+        elif op == DEQUEUE:
+            start = clock()
+            dequeue()
+            rv[i] = clock() - start
+        else:
+            start = clock()
+            update(value, prio)
+            rv[i] = clock() - start
+    return rv
+
+
+def _percentile(sorted_values: list[int], p: float) -> int:
+    """
+    Returns: The p-th percentile (0 <= p <= 100) of a sorted
+     list of values, using the nearest-rank method
+    """
+    if not sorted_values:
+        return 0
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def benchmark(impl: str, make_queue: Callable[[], Queue], workload_name: str,
+              n: int, workload: Workload) -> dict[str, Any]:
+    """
+    Runs a workload on an implementation, and measures its
+    throughput, latency and peak memory.
+
+    Returns: Dictionary with the results (if the workload is
+     not supported by the implementation, for example because
+     it decreases priorities below the last dequeued priority
+     with the "bucket" backend, the dictionary has an "error"
+     key instead of the measurements)
+    """
+    result: dict[str, Any] = {"impl": impl, "workload": workload_name,
+                              "n": n, "ops": len(workload[1])}
+    start = time.perf_counter()
+    try:
+        q = _prefilled(make_queue, workload)
+        t0 = time.perf_counter()
+        _run(q, workload[1])
+        seconds = time.perf_counter() - t0
+
+        q = _prefilled(make_queue, workload)
+        latencies = sorted(_latencies(q, workload[1]))
+        del q
+
+        tracemalloc.start()
+        try:
+            q = _prefilled(make_queue, workload)
+            tracemalloc.reset_peak()
+            _run(q, workload[1])
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            del q
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    result.update({
+        "seconds": seconds,
+        "ops_per_sec": len(workload[1]) / seconds if seconds > 0 else None,
+        "p50_ns": _percentile(latencies, 50),
+        "p99_ns": _percentile(latencies, 99),
+        "peak_bytes": peak,
+        "total_seconds": time.perf_counter() - start,
+    })
+    return result
+
+
+def _metadata(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Returns: Information about the environment in which the
+     benchmarks were run
+    """
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "commit": commit,
+        "seed": args.seed,
+        "budget": args.budget,
+    }
+
+
+def _key(result: dict[str, Any]) -> tuple[str, str, int]:
+    return (result["impl"], result["workload"], result["n"])
+
+
+def _format(result: dict[str, Any],
+            baseline: dict[tuple[str, str, int], dict[str, Any]]) -> str:
+    """
+    Returns: A line of the results table
+    """
+    label = f"{result['impl']:>8} {result['workload']:>8} {result['n']:>9,}"
+    if "error" in result:
+        return f"{label}  unsupported ({result['error']})"
+    if "skipped" in result:
+        return f"{label}  skipped ({result['skipped']})"
+
+    line = (f"{label}  {result['ops_per_sec']:12,.0f} ops/s  "
+            f"p50 {result['p50_ns']:8,} ns  p99 {result['p99_ns']:9,} ns  "
+            f"peak {result['peak_bytes'] / 2**20:9.2f} MiB")
+    old = baseline.get(_key(result))
+    if old is not None and old.get("ops_per_sec"):
+        change = result["ops_per_sec"] / old["ops_per_sec"] - 1
+        line += f"  ({change:+.1%} vs baseline)"
+    return line
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    impls = _implementations()
+
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the priority queue implementations")
+    parser.add_argument("--sizes", type=lambda s: int(float(s)), nargs="+",
+                        default=[100, 1_000, 10_000, 100_000],
+                        help="number of operations (e.g., 100 1e7)")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS,
+                        default=list(WORKLOADS))
+    parser.add_argument("--impls", nargs="+", choices=list(impls),
+                        default=list(impls))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="skip larger sizes once a run takes longer "
+                             "than this many seconds")
+    parser.add_argument("--output",
+                        help="JSON file to write the results to (by "
+                             "default, the results are only printed)")
+    parser.add_argument("--baseline",
+                        help="JSON file with earlier results to compare with")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {_key(r): r for r in json.load(f)["results"]}
+
+    results = []
+    for workload_name in args.workloads:
+        over_budget: set[str] = set()
+        for n in sorted(args.sizes):
+            workload = _make_workload(workload_name, n, args.seed)
+            for impl in args.impls:
+                if impl in over_budget:
+                    result = {"impl": impl, "workload": workload_name,
+                              "n": n, "skipped": "over time budget"}
+                else:
+                    result = benchmark(impl, impls[impl], workload_name,
+                                       n, workload)
+                    if result.get("total_seconds", 0) > args.budget:
+                        over_budget.add(impl)
+                results.append(result)
+                print(_format(result, baseline), flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"metadata": _metadata(args), "results": results}, f,
+                      indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
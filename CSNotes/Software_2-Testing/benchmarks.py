@@ -0,0 +1,867 @@
+"""
+Benchmarks for the MinHeap and PriorityQueue classes.
+
+Usage:
+    python benchmarks.py              # Runs every benchmark
+    python benchmarks.py from_items   # Runs only the named benchmarks
+"""
+
+import asyncio
+import heapq
+import math
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable
+
+from async_pqueue import AsyncPriorityQueue
+from compact_minheap import CompactMinHeap
+from concurrent_pqueue import ConcurrentPriorityQueue, Empty
+from kmerge import merge_sorted
+from minheap import MinHeap
+from minmax_heap import MinMaxHeap
+from pqueue import PriorityQueue
+from scheduler import Scheduler
+from sharded_pqueue import ShardedPriorityQueue
+from topk import TopK
+
+
+def _timeit(fn: Callable[[], object]) -> float:
+    """
+    Returns: Number of seconds it takes to run fn once
+    """
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _random_items(n: int, seed: int = 42) -> list[tuple[int, str]]:
+    """
+    Returns: n (priority, item) pairs with random priorities
+    """
+    rng = random.Random(seed)
+    return [(rng.randrange(n), f"item{i}") for i in range(n)]
+
+
+def bench_from_items() -> None:
+    """
+    Compares building a heap with MinHeap.from_items against
+    inserting the same items one at a time.
+    """
+    for n in (10_000, 100_000, 1_000_000):
+        items = _random_items(n)
+
+        def repeated_insert() -> None:
+            mh = MinHeap()
+            for prio, item in items:
+                mh.insert(prio, item)
+
+        t_insert = _timeit(repeated_insert)
+        t_bulk = _timeit(lambda: MinHeap.from_items(items))
+        print(f"{n:>10,} items: insert {t_insert:7.3f}s  "
+              f"from_items {t_bulk:7.3f}s  ({t_insert / t_bulk:.1f}x)")
+
+
+def bench_compact() -> None:
+    """
+    Compares the memory used by a MinHeap and a CompactMinHeap
+    holding the same items, and the throughput of a mix of
+    insert, change_priority and remove_min operations.
+    """
+    n = 1_000_000
+    items = _random_items(n)
+    rng = random.Random(7)
+    updates = [(f"item{rng.randrange(n)}", rng.randrange(n)) for _ in range(n)]
+
+    for heap_class in (MinHeap, CompactMinHeap):
+        heap = heap_class()
+
+        def insert_all() -> None:
+            for prio, item in items:
+                heap.insert(prio, item)
+
+        def update_all() -> None:
+            for item, prio in updates:
+                heap.change_priority(item, prio)
+
+        def remove_all() -> None:
+            for _ in range(n):
+                heap.remove_min()
+
+        t_insert = _timeit(insert_all)
+        t_update = _timeit(update_all)
+        t_remove = _timeit(remove_all)
+
+        # Measure memory separately, since tracing allocations
+        # slows everything down. The item strings are shared
+        # by both heaps, so they are not counted.
+        tracemalloc.start()
+        heap = heap_class()
+        insert_all()
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del heap
+
+        print(f"{heap_class.__name__:>15}: {mem / n:6.1f} bytes/entry  "
+              f"insert {n / t_insert:10,.0f}/s  "
+              f"change_priority {n / t_update:10,.0f}/s  "
+              f"remove_min {n / t_remove:10,.0f}/s")
+
+
+def bench_arity() -> None:
+    """
+    Runs an insert-heavy and a pop-heavy mix of operations on
+    heaps with different numbers of children per node.
+    """
+    n = 200_000
+    rng = random.Random(3)
+    base = _random_items(n)
+
+    # Insert-heavy: mostly inserts and priority decreases, few
+    # removals. Pop-heavy: start from a full heap and remove most
+    # of it, with a few insertions along the way.
+    insert_heavy = []
+    for i in range(n):
+        op = rng.random()
+        if op < 0.5:
+            insert_heavy.append(("insert", f"item{n + i}", rng.randrange(n)))
+        elif op < 0.9:
+            insert_heavy.append(("decrease", f"item{rng.randrange(n)}",
+                                 rng.randrange(n)))
+        else:
+            insert_heavy.append(("remove", "", 0))
+    pop_heavy = []
+    for i in range(n):
+        if rng.random() < 0.1:
+            pop_heavy.append(("insert", f"item{n + i}", rng.randrange(n)))
+        else:
+            pop_heavy.append(("remove", "", 0))
+
+    def run(mh: MinHeap, ops: list[tuple[str, str, int]]) -> None:
+        for op, item, prio in ops:
+            if op == "insert":
+                mh.insert(prio, item)
+            elif op == "decrease":
+                if item in mh._index_of_item:
+                    entry = mh._data[mh._index_of_item[item]]
+                    assert entry is not None
+                    mh.change_priority(item, entry[0] - prio)
+            else:
+                mh.remove_min()
+
+    for arity in (2, 3, 4, 8, 16):
+        times = []
+        for ops in (insert_heavy, pop_heavy):
+            mh = MinHeap.from_items(base, arity=arity)
+            times.append(_timeit(lambda: run(mh, ops)))
+        print(f"arity {arity:>2}: insert-heavy {times[0]:6.3f}s  "
+              f"pop-heavy {times[1]:6.3f}s")
+
+
+def bench_batch() -> None:
+    """
+    Compares the batch operations of MinHeap against performing
+    the same operations one element at a time, for batches of
+    different sizes on a heap with 200,000 elements.
+    """
+    n = 200_000
+    base = _random_items(n)
+    rng = random.Random(5)
+
+    for k in (100, 10_000, 100_000):
+        new_items = [(rng.randrange(n), f"new{i}") for i in range(k)]
+        updates = [(f"item{i}", rng.randrange(n))
+                   for i in rng.sample(range(n), k)]
+
+        mh1 = MinHeap.from_items(base)
+        mh2 = MinHeap.from_items(base)
+
+        def one_at_a_time(mh: MinHeap = mh1) -> None:
+            for prio, item in new_items:
+                mh.insert(prio, item)
+            for item, prio in updates:
+                mh.change_priority(item, prio)
+            for _ in range(k):
+                mh.remove_min()
+
+        def batched(mh: MinHeap = mh2) -> None:
+            mh.insert_many(new_items)
+            mh.change_priority_many(updates)
+            mh.remove_min_many(k)
+
+        t_single = _timeit(one_at_a_time)
+        t_batch = _timeit(batched)
+        print(f"batches of {k:>7,}: one at a time {t_single:6.3f}s  "
+              f"batched {t_batch:6.3f}s  ({t_single / t_batch:.1f}x)")
+
+
+def _random_graph(n: int, degree: int,
+                  seed: int = 11) -> list[list[tuple[int, int]]]:
+    """
+    Returns: Adjacency lists of a random directed graph with
+     n nodes, where each node has `degree` outgoing edges
+     with random integer weights
+    """
+    rng = random.Random(seed)
+    return [[(rng.randrange(n), rng.randrange(1, 1000))
+             for _ in range(degree)] for _ in range(n)]
+
+
+def dijkstra(graph: list[list[tuple[int, int]]], source: int,
+             backend: str) -> dict[int, int]:
+    """
+    Dijkstra's algorithm, using a PriorityQueue with the given
+    backend. Nodes are added to the queue when they are first
+    reached, and their priority is updated every time we find
+    a shorter path to them.
+
+    Returns: Dictionary with the distance to every reachable node
+    """
+    dist = {source: 0}
+    done = set()
+    q = PriorityQueue(backend)
+    q.enqueue(str(source), 0)
+
+    while q.size > 0:
+        val, d = q.dequeue()
+        u = int(val)
+        done.add(u)
+        for v, w in graph[u]:
+            if v in done:
+                continue
+            nd = d + w
+            if v not in dist:
+                dist[v] = nd
+                q.enqueue(str(v), nd)
+            elif nd < dist[v]:
+                dist[v] = nd
+                q.update_priority(str(v), nd)
+    return dist
+
+
+def bench_dijkstra() -> None:
+    """
+    Runs Dijkstra's algorithm on large sparse graphs with each
+    of the PriorityQueue backends.
+    """
+    for n, degree in ((100_000, 4), (100_000, 16), (500_000, 4)):
+        graph = _random_graph(n, degree)
+        times = []
+        for backend in ("heap", "compact", "pairing", "bucket"):
+            t = _timeit(lambda: dijkstra(graph, 0, backend))
+            times.append(f"{backend} {t:6.3f}s")
+        print(f"{n:>9,} nodes, {n * degree:>10,} edges: "
+              + "  ".join(times))
+
+
+def bench_concurrent() -> None:
+    """
+    Measures the throughput of a ConcurrentPriorityQueue shared by
+    several producer and consumer threads, and how often threads
+    had to wait for the lock.
+    """
+    n = 200_000
+    for workers in (1, 2, 4, 8):
+        q = ConcurrentPriorityQueue(maxsize=1000)
+        rng = random.Random(workers)
+        per_producer = n // workers
+        prios = [rng.randrange(n) for _ in range(per_producer)]
+
+        def produce(p: int) -> None:
+            for i, prio in enumerate(prios):
+                q.enqueue(f"{p}-{i}", prio)
+
+        def consume() -> None:
+            while True:
+                try:
+                    q.dequeue(timeout=0.1)
+                except Empty:
+                    return
+
+        threads = [threading.Thread(target=produce, args=(p,))
+                   for p in range(workers)]
+        threads += [threading.Thread(target=consume) for _ in range(workers)]
+
+        def run() -> None:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        # The consumers wait for 0.1s before giving up
+        t = _timeit(run) - 0.1
+        print(f"{workers} producers + {workers} consumers: "
+              f"{2 * per_producer * workers / t:10,.0f} ops/s  "
+              f"contention {q.contention:6.1%}")
+
+
+def bench_async() -> None:
+    """
+    Measures the throughput of an AsyncPriorityQueue with a
+    bounded size, shared by thousands of producer and consumer
+    coroutines.
+    """
+    n = 200_000
+
+    async def run(coroutines: int) -> float:
+        q = AsyncPriorityQueue(maxsize=1000)
+        rng = random.Random(coroutines)
+        per_producer = n // coroutines
+
+        async def produce(p: int) -> None:
+            for i in range(per_producer):
+                await q.put(f"{p}-{i}", rng.randrange(n))
+
+        async def consume() -> None:
+            while True:
+                await q.get()
+                q.task_done()
+
+        start = time.perf_counter()
+        consumers = [asyncio.create_task(consume()) for _ in range(coroutines)]
+        await asyncio.gather(*(produce(p) for p in range(coroutines)))
+        await q.join()
+        elapsed = time.perf_counter() - start
+        for c in consumers:
+            c.cancel()
+        return 2 * per_producer * coroutines / elapsed
+
+    for coroutines in (1, 10, 1000, 5000):
+        ops = asyncio.run(run(coroutines))
+        print(f"{coroutines:>5} producers + {coroutines:>5} consumers: "
+              f"{ops:10,.0f} ops/s")
+
+
+def bench_cancel() -> None:
+    """
+    Cancels half of the elements of a heap, comparing the old
+    workaround (raising the priority of each cancelled element
+    to a sentinel value, and removing it later) with eager and
+    lazy removal. Cancelling the elements with the lowest
+    priorities is the worst case for eager removal, since the
+    elements that replace them have to be sifted all the way
+    down the heap.
+    """
+    n = 500_000
+    base = _random_items(n)
+    rng = random.Random(9)
+    patterns = {
+        "random": [f"item{i}" for i in rng.sample(range(n), n // 2)],
+        "lowest": [item for _, item in sorted(base)[:n // 2]],
+    }
+
+    def sentinel(mh: MinHeap, cancelled: list[str]) -> None:
+        for item in cancelled:
+            mh.change_priority(item, -1)
+        for _ in range(len(cancelled)):
+            mh.remove_min()
+
+    def remove(mh: MinHeap, cancelled: list[str]) -> None:
+        for item in cancelled:
+            mh.remove(item)
+        mh.min()
+
+    for pattern, cancelled in patterns.items():
+        for name, fn, options in (("sentinel", sentinel, {}),
+                                  ("eager remove", remove, {}),
+                                  ("lazy remove", remove,
+                                   {"lazy_removal": True})):
+            mh = MinHeap.from_items(base, **options)
+            t = _timeit(lambda: fn(mh, cancelled))
+            print(f"{pattern:>6} items, {name:>12}: "
+                  f"{len(cancelled) / t:10,.0f} cancellations/s")
+
+
+def bench_tie_break() -> None:
+    """
+    Inserts and then removes job ids that share a long common
+    prefix (like the ids generated by a job scheduler), with
+    only a handful of distinct priorities, using each of the
+    tie-break policies. With lexicographic tie-breaking, most
+    comparisons have to compare the prefixes of two ids.
+    """
+    n = 200_000
+    prefix = "cluster-eu-west-1/batch/nightly-reindex/"
+    rng = random.Random(10)
+    items = [(rng.randrange(4), f"{prefix}{i:012d}") for i in range(n)]
+
+    def run(tie_break: str) -> None:
+        mh = MinHeap(tie_break=tie_break)
+        for prio, item in items:
+            mh.insert(prio, item)
+        for _ in range(n):
+            mh.remove_min()
+
+    for tie_break in ("lexicographic", "fifo", "none"):
+        t = _timeit(lambda: run(tie_break))
+        print(f"{tie_break:>13}: {2 * n / t:10,.0f} ops/s")
+
+
+def bench_topk() -> None:
+    """
+    Keeps the 100 highest-scoring records of a stream, using
+    a TopK selector (with push and push_many) and, for
+    comparison, a PriorityQueue that holds the whole stream.
+    The stream is generated on the fly, so only the memory
+    used by each approach is counted.
+    """
+    n, k = 1_000_000, 100
+
+    def stream():
+        rng = random.Random(11)
+        for i in range(n):
+            yield (rng.random(), f"record{i}")
+
+    def with_push() -> None:
+        top = TopK(k, key=lambda record: record[0])
+        for record in stream():
+            top.push(record)
+
+    def with_push_many() -> None:
+        top = TopK(k, key=lambda record: record[0])
+        top.push_many(stream())
+
+    def with_pqueue() -> None:
+        q = PriorityQueue()
+        for score, item in stream():
+            q.enqueue(item, -score)
+        q.dequeue_many(k)
+
+    for name, fn in (("TopK.push", with_push),
+                     ("TopK.push_many", with_push_many),
+                     ("PriorityQueue", with_pqueue)):
+        t = _timeit(fn)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:>15}: {n / t:10,.0f} records/s  "
+              f"peak memory {peak / 2**20:8.1f} MiB")
+
+
+def bench_merge() -> None:
+    """
+    Merges 1,000,000 sorted (timestamp, line) pairs split into
+    10 to 1000 streams with merge_sorted, and compares it with
+    heapq.merge.
+    """
+    n = 1_000_000
+    rng = random.Random(12)
+    lines = sorted((rng.randrange(10**9), f"line{i}") for i in range(n))
+
+    for n_streams in (10, 100, 1000):
+        streams: list[list[tuple[int, str]]] = [[] for _ in range(n_streams)]
+        for line in lines:
+            streams[rng.randrange(n_streams)].append(line)
+
+        for name, merge in (("merge_sorted", merge_sorted),
+                            ("heapq.merge", heapq.merge)):
+            t = _timeit(lambda: sum(1 for _ in merge(
+                *streams, key=lambda line: line[0])))
+            print(f"{n_streams:5} streams, {name:>12}: "
+                  f"{n / t:10,.0f} lines/s")
+
+
+def bench_snapshot() -> None:
+    """
+    Saves a heap with 1,000,000 elements to a file and restores
+    it, compared with rebuilding the heap by inserting every
+    element again (or with from_items).
+    """
+    n = 1_000_000
+    items = _random_items(n)
+    mh = MinHeap.from_items(items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "heap.bin")
+
+        def dump() -> None:
+            with open(path, "wb") as f:
+                mh.dump(f)
+
+        def load() -> None:
+            with open(path, "rb") as f:
+                MinHeap.load(f)
+
+        def reinsert() -> None:
+            heap = MinHeap()
+            for prio, item in items:
+                heap.insert(prio, item)
+
+        print(f"{'dump':>10}: {_timeit(dump):6.2f} s "
+              f"({os.path.getsize(path) / n:.1f} bytes/element)")
+        print(f"{'load':>10}: {_timeit(load):6.2f} s")
+        print(f"{'from_items':>10}: "
+              f"{_timeit(lambda: MinHeap.from_items(items)):6.2f} s")
+        print(f"{'insert':>10}: {_timeit(reinsert):6.2f} s")
+
+
+def bench_peek() -> None:
+    """
+    Looks at the next 100 elements of a queue with 1,000,000
+    elements with peek, compared with dequeueing them and
+    enqueueing them again, and renders the whole heap as
+    a string.
+    """
+    n, k = 1_000_000, 100
+    q = PriorityQueue.from_items((item, prio)
+                                 for prio, item in _random_items(n))
+
+    def drain_and_restore() -> None:
+        top = q.dequeue_many(k)
+        q.enqueue_many(top)
+
+    reps = 1000
+    t_peek = _timeit(lambda: [q.peek(k) for _ in range(reps)]) / reps
+    t_drain = _timeit(lambda: [drain_and_restore() for _ in range(reps)]) / reps
+    t_str = _timeit(lambda: str(q))
+    print(f"peek({k}): {t_peek * 1e6:8.1f} us  "
+          f"dequeue+enqueue: {t_drain * 1e6:8.1f} us  "
+          f"str of {n:,} elements: {t_str:.2f} s")
+
+
+def bench_handles() -> None:
+    """
+    Changes the priority of elements with long item strings,
+    looking them up by item with MinHeap and CompactMinHeap,
+    and by handle with CompactMinHeap.
+    """
+    n = 200_000
+    prefix = "tenant-0042/queue/high-priority/job-"
+    rng = random.Random(17)
+    items = [(rng.randrange(n), f"{prefix}{i:012d}") for i in range(n)]
+    updates = [(rng.randrange(n), rng.randrange(n)) for _ in range(n)]
+
+    mh = MinHeap()
+    compact = CompactMinHeap()
+    handles = []
+    for prio, item in items:
+        mh.insert(prio, item)
+        handles.append(compact.insert(prio, item))
+
+    def by_item(heap) -> None:
+        for i, prio in updates:
+            heap.change_priority(items[i][1], prio)
+
+    def by_handle() -> None:
+        for i, prio in updates:
+            compact.change_priority_by_handle(handles[i], prio)
+
+    for name, fn in (("MinHeap, by item", lambda: by_item(mh)),
+                     ("CompactMinHeap, by item", lambda: by_item(compact)),
+                     ("CompactMinHeap, by handle", by_handle)):
+        t = _timeit(fn)
+        print(f"{name:>26}: {n / t:10,.0f} change_priority/s")
+
+
+def bench_minmax() -> None:
+    """
+    Keeps a queue at a fixed capacity, evicting the element
+    with the highest priority value whenever it is full. With
+    a MinHeap, the element to evict is found with a linear
+    scan of the heap, while a MinMaxHeap can remove it in
+    O(log n) time.
+    """
+    n = 20_000
+    items = _random_items(n)
+
+    for capacity in (100, 1_000, 10_000):
+        def with_minheap() -> None:
+            mh = MinHeap()
+            for prio, item in items:
+                mh.insert(prio, item)
+                if mh.size > capacity:
+                    mh.remove(max(mh._data[:mh._next])[1])
+
+        def with_minmax() -> None:
+            mh = MinMaxHeap()
+            for prio, item in items:
+                mh.insert(prio, item)
+                if mh.size > capacity:
+                    mh.remove_max()
+
+        for name, fn in (("MinHeap + scan", with_minheap),
+                         ("MinMaxHeap", with_minmax)):
+            t = _timeit(fn)
+            print(f"capacity {capacity:6,}, {name:>14}: "
+                  f"{n / t:10,.0f} inserts/s")
+
+
+def bench_meld() -> None:
+    """
+    Merges two queues of the same size with PriorityQueue.merge,
+    compared with enqueueing every element of one queue into
+    the other.
+    """
+    n = 200_000
+    a_items = [(item, prio) for prio, item in _random_items(n, seed=1)]
+    b_items = [(item + "b", prio) for prio, item in _random_items(n, seed=2)]
+
+    for backend in ("heap", "compact", "pairing"):
+        a = PriorityQueue.from_items(a_items, backend=backend)
+        b = PriorityQueue.from_items(b_items, backend=backend)
+        t_merge = _timeit(lambda: a.merge(b))
+
+        a = PriorityQueue.from_items(a_items, backend=backend)
+
+        def enqueue_all() -> None:
+            for value, prio in b_items:
+                a.enqueue(value, prio)
+
+        t_enqueue = _timeit(enqueue_all)
+        print(f"{backend:>8}: merge {t_merge:6.3f} s  "
+              f"enqueue {t_enqueue:6.3f} s")
+
+
+def bench_scheduler() -> None:
+    """
+    Measures the throughput of a Scheduler (scheduling, then
+    rescheduling or cancelling some of the timers, and running
+    all of them) with a PriorityQueue and with a timing wheel,
+    and the firing jitter (how late each callback runs) of the
+    run loop with the real clock.
+    """
+    class Clock:
+        now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    for n in (100_000, 1_000_000):
+        rng = random.Random(n)
+        delays = [rng.random() for _ in range(n)]
+        changes = rng.sample(range(n), n // 5)
+        for resolution in (None, 0.001):
+            clock = Clock()
+            s = Scheduler(resolution, clock=clock)
+            fired = 0
+
+            def callback() -> None:
+                nonlocal fired
+                fired += 1
+
+            def run() -> None:
+                names = [s.schedule_after(delay, callback) for delay in delays]
+                for i, j in enumerate(changes):
+                    if i % 2:
+                        s.cancel(names[j])
+                    else:
+                        s.reschedule(names[j], delays[j] / 2)
+                # Run the timers 1ms at a time, for 1s
+                for ms in range(1, 1001):
+                    clock.now = ms / 1000
+                    s.run_pending()
+
+            t = _timeit(run)
+            assert fired == n - len(changes) // 2
+            label = "heap" if resolution is None else "wheel"
+            print(f"{label:>5}, {n:9,} timers: {n / t:10,.0f} timers/s")
+
+    for resolution in (None, 0.001):
+        s = Scheduler(resolution)
+        lateness: list[float] = []
+        start = time.monotonic()
+        for i in range(200):
+            when = start + 0.05 + i * 0.0025
+            s.schedule_at(when, lambda when=when:
+                          lateness.append(time.monotonic() - when))
+        s.run(until_empty=True)
+        lateness.sort()
+        label = "heap" if resolution is None else "wheel"
+        print(f"{label:>5} jitter: p50 {lateness[100] * 1e6:8,.0f} us  "
+              f"p99 {lateness[197] * 1e6:8,.0f} us  "
+              f"max {lateness[-1] * 1e6:8,.0f} us")
+
+
+def bench_order_stats() -> None:
+    """
+    Compares answering count_below and quantile queries with the
+    order statistics index of a PriorityQueue against scanning
+    and sorting the queue's contents, and measures how much the
+    index slows down enqueue and dequeue.
+    """
+    for n in (10_000, 100_000, 1_000_000):
+        items = [(item, prio) for prio, item in _random_items(n)]
+        plain = PriorityQueue()
+        indexed = PriorityQueue(order_stats=True)
+        t_plain = _timeit(lambda: [plain.enqueue(*pair) for pair in items])
+        t_indexed = _timeit(lambda: [indexed.enqueue(*pair) for pair in items])
+
+        def scan() -> None:
+            # Without the index, we have to scan the heap's array
+            mh = plain._mh
+            prios = sorted(entry[0] for entry in mh._data[:mh._next])
+            sum(prio < n // 2 for prio in prios)
+            prios[max(1, math.ceil(0.95 * len(prios))) - 1]
+
+        def query() -> None:
+            indexed.count_below(n // 2)
+            indexed.quantile(0.95)
+
+        t_scan = _timeit(scan)
+        t_query = _timeit(lambda: [query() for _ in range(100)]) / 100
+        t_dequeue_plain = _timeit(lambda: plain.dequeue_many(n // 10))
+        t_dequeue_indexed = _timeit(lambda: indexed.dequeue_many(n // 10))
+        print(f"n={n:9,}: query {t_query * 1e6:8,.1f} us "
+              f"(scan {t_scan * 1e3:8,.1f} ms)  "
+              f"enqueue {t_indexed / t_plain:4.2f}x slower  "
+              f"dequeue {t_dequeue_indexed / t_dequeue_plain:4.2f}x slower")
+
+
+def bench_aging() -> None:
+    """
+    Compares aging every element of a queue by calling
+    update_priority on each of them with aging them all at
+    once with advance_epoch (which only changes an offset).
+    """
+    ticks = 10
+    for n in (10_000, 100_000):
+        items = [(item, prio) for prio, item in _random_items(n)]
+
+        q = PriorityQueue.from_items(items)
+        prio_of = dict(items)
+
+        def update_all() -> None:
+            for _ in range(ticks):
+                for item in prio_of:
+                    prio_of[item] -= 1
+                    q.update_priority(item, prio_of[item])
+
+        aged = PriorityQueue.from_items(items, aging=1)
+
+        def advance() -> None:
+            for _ in range(ticks):
+                aged.advance_epoch()
+
+        t_update = _timeit(update_all) / ticks
+        t_advance = _timeit(advance) / ticks
+        assert q.peek(10) == aged.peek(10)
+        print(f"n={n:7,}: update_priority {t_update * 1e3:9.3f} ms/tick  "
+              f"advance_epoch {t_advance * 1e6:6.3f} us/tick")
+
+
+def bench_engine() -> None:
+    """
+    Compares the "hole" and "swap" sift engines of MinHeap, on
+    inserts, priority changes and removals.
+    """
+    n = 200_000
+    items = _random_items(n)
+    rng = random.Random(24)
+    changes = [(f"item{rng.randrange(n)}", rng.randrange(n))
+               for _ in range(n)]
+    for arity in (2, 4):
+        # Best of 3 rounds, alternating between the engines
+        best: dict[str, list[float]] = {}
+        for _ in range(3):
+            for engine in ("swap", "hole"):
+                mh = MinHeap(arity=arity, engine=engine)
+                times = [
+                    _timeit(lambda: [mh.insert(*pair) for pair in items]),
+                    _timeit(lambda: [mh.change_priority(*pair)
+                                     for pair in changes]),
+                    _timeit(lambda: [mh.remove_min() for _ in range(n)]),
+                ]
+                best[engine] = [min(pair) for pair in
+                                zip(best.get(engine, times), times)]
+        for engine, (t_insert, t_change, t_remove) in best.items():
+            print(f"arity {arity}, {engine}: insert {n / t_insert:10,.0f}/s  "
+                  f"change_priority {n / t_change:10,.0f}/s  "
+                  f"remove_min {n / t_remove:10,.0f}/s")
+
+
+def _sharded_worker(q: ShardedPriorityQueue, worker: int, ops: int) -> None:
+    """
+    Worker process of bench_sharded: alternates between
+    enqueueing a new element and dequeueing one.
+    """
+    rng = random.Random(worker)
+    for i in range(ops):
+        q.enqueue(f"w{worker}-{i}", rng.randrange(1_000_000))
+        q.dequeue()
+    q.close()
+
+
+def bench_sharded() -> None:
+    """
+    Measures how the throughput of ShardedPriorityQueue scales
+    with the number of processes (up to the number of CPUs),
+    doing the same total number of enqueue/dequeue pairs, and
+    compares it with a PriorityQueue used by a single process.
+    """
+    n = 100_000
+    prefill = [(item, prio) for prio, item in _random_items(n)]
+
+    pq = PriorityQueue.from_items(prefill)
+    rng = random.Random(0)
+
+    def single() -> None:
+        for i in range(n):
+            pq.enqueue(f"w0-{i}", rng.randrange(1_000_000))
+            pq.dequeue()
+
+    t = _timeit(single)
+    print(f"PriorityQueue, 1 process: {2 * n / t:12,.0f} ops/s")
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cpus} if cpus >= 4 else {1, 2, 4})
+    for sample in (2, None):
+        for procs in counts:
+            shards = max(4, 2 * procs)
+            with ShardedPriorityQueue(shards=shards, capacity=2 * n,
+                                      sample=sample) as q:
+                for item, prio in prefill:
+                    q.enqueue(item, prio)
+                workers = [multiprocessing.Process(
+                    target=_sharded_worker, args=(q, w, n // procs))
+                    for w in range(procs)]
+
+                def run() -> None:
+                    for p in workers:
+                        p.start()
+                    for p in workers:
+                        p.join()
+
+                t = _timeit(run)
+            kind = "relaxed" if sample else "strict"
+            print(f"ShardedPriorityQueue ({kind}, {shards} shards), "
+                  f"{procs} processes: {2 * n / t:12,.0f} ops/s")
+    if cpus < max(counts):
+        print(f"(only {cpus} CPUs: the extra processes share them)")
+
+
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    "from_items": bench_from_items,
+    "compact": bench_compact,
+    "arity": bench_arity,
+    "batch": bench_batch,
+    "dijkstra": bench_dijkstra,
+    "concurrent": bench_concurrent,
+    "async": bench_async,
+    "cancel": bench_cancel,
+    "tie_break": bench_tie_break,
+    "topk": bench_topk,
+    "merge": bench_merge,
+    "snapshot": bench_snapshot,
+    "peek": bench_peek,
+    "handles": bench_handles,
+    "minmax": bench_minmax,
+    "meld": bench_meld,
+    "scheduler": bench_scheduler,
+    "order_stats": bench_order_stats,
+    "aging": bench_aging,
+    "engine": bench_engine,
+    "sharded": bench_sharded,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
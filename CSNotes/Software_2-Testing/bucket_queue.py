@@ -0,0 +1,450 @@
+import heapq
+import itertools
+from typing import Iterable, Iterator, Optional
+
+
+class BucketQueue:
+    """
+    Class implementing a monotone priority queue (a "radix
+    heap") with the same interface as MinHeap. Priorities
+    must be non-negative integers, and can never be lower
+    than the priority of the last element that was removed
+    (this is the case, for example, in Dijkstra's algorithm
+    with integer weights, or in a queue of timers).
+
+    Instead of comparing priorities with each other, each
+    element is placed in a bucket determined by the highest
+    bit in which its priority differs from the priority of
+    the last removed element (the "last" priority). Bucket 0
+    contains the elements whose priority is equal to the last
+    priority. When bucket 0 is empty, the elements of the
+    first non-empty bucket are redistributed into lower
+    buckets. Every element can only move down a bucket a
+    limited number of times, so all operations take (nearly)
+    constant amortized time.
+    """
+
+    # _last is the priority of the last removed element.
+    # _buckets[0] is a heap of the items whose priority is
+    # equal to _last (ordered lexicographically, to break
+    # ties). The rest of the buckets are unordered lists.
+    _buckets: list[list[str]]
+    _last: int
+
+    # Items are removed from bucket 0 lazily (removing them from
+    # the middle of the heap would take linear time), so the heap
+    # may contain stale entries: those whose item no longer has
+    # priority _last (or is already in the heap, if the item was
+    # removed and added back). _size0 is the number of items that
+    # are really in bucket 0.
+    _size0: int
+
+    # Maps items to their priorities, and items in buckets
+    # other than bucket 0 to their position in their bucket
+    _prio_of_item: dict[str, int]
+    _index_in_bucket: dict[str, int]
+
+    def __init__(self, initial_capacity=10):
+        """
+        Constructor. Creates an empty bucket queue.
+
+        Args:
+            initial_capacity: Ignored. Accepted only so that
+              this class can be used in place of a MinHeap.
+        """
+        self._buckets = [[]]
+        self._last = 0
+        self._size0 = 0
+        self._prio_of_item = {}
+        self._index_in_bucket = {}
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[int, str]]) -> "BucketQueue":
+        """
+        Builds a bucket queue from (priority, item) pairs
+        in O(n) time.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If the same item appears more than once,
+              or if any of the priorities is not valid.
+
+        Returns: A new bucket queue containing the items
+        """
+        bq = cls()
+        for priority, item in items:
+            bq.insert(priority, item)
+        return bq
+
+    @property
+    def size(self) -> int:
+        """
+        Returns: Number of elements in the queue
+        """
+        return len(self._prio_of_item)
+
+    @property
+    def empty(self) -> bool:
+        """
+        Returns: whether the queue is empty or not
+        """
+        return len(self._prio_of_item) == 0
+
+    def _check_priority(self, priority: int) -> None:
+        """
+        Checks that a priority can be added to the queue
+
+        Raises:
+            ValueError: If the priority is not a non-negative
+              integer, or if it is lower than the last removed
+              priority.
+        """
+        if not isinstance(priority, int) or priority < 0:
+            raise ValueError("priority must be a non-negative integer "
+                             f"(got {priority!r})")
+        if priority < self._last:
+            raise ValueError(f"priority {priority} is lower than the priority "
+                             f"of the last removed element ({self._last}), "
+                             f"and priorities must never decrease")
+
+    def _add(self, priority: int, item: str) -> None:
+        """
+        Adds an item to the bucket that corresponds to its priority
+        """
+        b = (priority ^ self._last).bit_length()
+        if b == 0:
+            heapq.heappush(self._buckets[0], item)
+            self._size0 += 1
+            return
+
+        while len(self._buckets) <= b:
+            self._buckets.append([])
+        bucket = self._buckets[b]
+        self._index_in_bucket[item] = len(bucket)
+        bucket.append(item)
+
+    def _discard(self, priority: int, item: str) -> None:
+        """
+        Removes an item from its bucket
+        """
+        b = (priority ^ self._last).bit_length()
+        if b == 0:
+            # The item's entry becomes stale. Once most of the
+            # heap is stale, we rebuild it with the items that are
+            # still in bucket 0 (which takes constant amortized
+            # time per removal)
+            self._size0 -= 1
+            heap = self._buckets[0]
+            if len(heap) > 2 * self._size0:
+                # (change_priority hasn't updated the item's
+                # priority yet, so we exclude it explicitly)
+                live = self._live0()
+                live.discard(item)
+                heap[:] = live
+                heapq.heapify(heap)
+            return
+
+        # Move the last item of the bucket into the position
+        # of the removed item
+        bucket = self._buckets[b]
+        i = self._index_in_bucket.pop(item)
+        last_item = bucket.pop()
+        if last_item != item:
+            bucket[i] = last_item
+            self._index_in_bucket[last_item] = i
+
+    def _is_live0(self, item: str) -> bool:
+        """
+        Returns: Whether an entry of the heap of bucket 0 is not
+         stale (if the item appears more than once in the heap,
+         we consider any of its entries to be the live one)
+        """
+        return self._prio_of_item.get(item) == self._last
+
+    def _live0(self) -> set[str]:
+        """
+        Returns: Set of the items that are really in bucket 0
+        """
+        return {item for item in self._buckets[0] if self._is_live0(item)}
+
+    def _purge0(self) -> None:
+        """
+        Removes the stale entries from the top of the heap of
+        bucket 0, so that its first entry is the minimum item
+        (bucket 0 must not be empty)
+        """
+        heap = self._buckets[0]
+        while not self._is_live0(heap[0]):
+            heapq.heappop(heap)
+
+    def _first_bucket(self) -> int:
+        """
+        Returns: Index of the first non-empty bucket
+        """
+        if self._size0:
+            return 0
+        b = 1
+        while not self._buckets[b]:
+            b += 1
+        return b
+
+    def _refill(self) -> None:
+        """
+        If bucket 0 is empty, redistributes the elements of
+        the first non-empty bucket, so that the elements with
+        the lowest priority end up in bucket 0.
+        """
+        b = self._first_bucket()
+        if b == 0:
+            return
+        bucket = self._buckets[b]
+        self._buckets[b] = []
+        # Every entry left in bucket 0 is stale
+        self._buckets[0] = []
+
+        self._last = min(self._prio_of_item[item] for item in bucket)
+        for item in bucket:
+            del self._index_in_bucket[item]
+            self._add(self._prio_of_item[item], item)
+
+    def min(self) -> Optional[tuple[int, str]]:
+        """
+        Returns: If the queue is not empty, returns the
+         priority and value of the minimum element.
+         Otherwise, returns None.
+        """
+        if self.empty:
+            return None
+
+        # We don't redistribute the elements here, since that
+        # would raise the last priority (and the minimum allowed
+        # priority) without removing any element.
+        b = self._first_bucket()
+        if b == 0:
+            self._purge0()
+            return (self._last, self._buckets[0][0])
+        return min((self._prio_of_item[item], item)
+                   for item in self._buckets[b])
+
+    def remove_min(self) -> Optional[tuple[int, str]]:
+        """
+        Removes the minimum element from the queue.
+
+        Returns: If the queue is not empty, returns the
+         priority and value of the minimum element.
+         Otherwise, returns None.
+        """
+        if self.empty:
+            return None
+        self._refill()
+        self._purge0()
+        item = heapq.heappop(self._buckets[0])
+        self._size0 -= 1
+        del self._prio_of_item[item]
+        return (self._last, item)
+
+    def remove(self, item: str) -> tuple[int, str]:
+        """
+        Removes an item from the queue (wherever it is)
+
+        Args:
+            item: Value of the item to remove.
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the queue.
+
+        Returns: Priority and value of the removed item
+        """
+        if item not in self._prio_of_item:
+            raise ValueError(f"item '{item}' not in minheap")
+
+        priority = self._prio_of_item.pop(item)
+        self._discard(priority, item)
+        return (priority, item)
+
+    def insert(self, priority: int, item: str) -> None:
+        """
+        Inserts a new element into the queue
+
+        Args:
+            priority: Priority of element to insert
+            item: Value of element to insert
+
+        Raises:
+            ValueError: If the item is already in the queue, or
+              if the priority is not a non-negative integer or is
+              lower than the last removed priority.
+
+        Returns: Nothing
+        """
+        if item in self._prio_of_item:
+            raise ValueError(f"item '{item}' already in minheap")
+        self._check_priority(priority)
+
+        self._prio_of_item[item] = priority
+        self._add(priority, item)
+
+    def change_priority(self, item: str, new_prio: int) -> None:
+        """
+        Changes the priority of an item in the queue.
+
+        Args:
+            item: Value of the item to update.
+            new_prio: New priority
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the queue, or if the new priority is not a
+              non-negative integer or is lower than the last
+              removed priority.
+
+        Returns: Nothing
+        """
+        if item not in self._prio_of_item:
+            raise ValueError(f"item '{item}' not in minheap")
+        self._check_priority(new_prio)
+
+        old_prio = self._prio_of_item[item]
+        if new_prio != old_prio:
+            self._discard(old_prio, item)
+            self._prio_of_item[item] = new_prio
+            self._add(new_prio, item)
+
+    def insert_many(self, items: Iterable[tuple[int, str]]) -> None:
+        """
+        Inserts several (priority, item) pairs into the queue.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If any of the items is already in the
+              queue (or appears twice in the batch), or if any
+              of the priorities is not valid. In that case,
+              none of the items are inserted.
+
+        Returns: Nothing
+        """
+        batch = [(priority, item) for priority, item in items]
+        seen = set()
+        for priority, item in batch:
+            if item in self._prio_of_item or item in seen:
+                raise ValueError(f"item '{item}' already in minheap")
+            self._check_priority(priority)
+            seen.add(item)
+
+        for priority, item in batch:
+            self.insert(priority, item)
+
+    def meld(self, other: "BucketQueue") -> None:
+        """
+        Moves all the elements of another bucket queue into
+        this one, leaving the other queue empty. Each element
+        is added to its bucket in O(1) time.
+
+        Args:
+            other: Bucket queue to meld into this one
+
+        Raises:
+            ValueError: If both queues contain the same item (or
+              if other is this queue), or if any of the other
+              queue's priorities is lower than the last removed
+              priority of this queue. In that case, neither
+              queue is modified.
+
+        Returns: Nothing
+        """
+        if other is self:
+            raise ValueError("can't meld a minheap with itself")
+        self.insert_many((prio, item)
+                         for item, prio in other._prio_of_item.items())
+        other.__init__()
+
+    def remove_min_many(self, k: int) -> list[tuple[int, str]]:
+        """
+        Removes the k minimum elements from the queue.
+
+        Args:
+            k: Number of elements to remove
+
+        Returns: List with (up to) k (priority, value) pairs,
+         in the order in which remove_min would return them.
+        """
+        rv = []
+        for _ in range(min(k, self.size)):
+            entry = self.remove_min()
+            assert entry is not None
+            rv.append(entry)
+        return rv
+
+    def change_priority_many(self, updates: Iterable[tuple[str, int]]) -> None:
+        """
+        Changes the priority of several items in the queue.
+
+        Args:
+            updates: Iterable of (item, new priority) pairs
+
+        Raises:
+            ValueError: If any of the items is not in the queue,
+              or if any of the priorities is not valid. In that
+              case, no priorities are changed.
+
+        Returns: Nothing
+        """
+        batch = [(item, new_prio) for item, new_prio in updates]
+        for item, new_prio in batch:
+            if item not in self._prio_of_item:
+                raise ValueError(f"item '{item}' not in minheap")
+            self._check_priority(new_prio)
+
+        for item, new_prio in batch:
+            self.change_priority(item, new_prio)
+
+    def iter_sorted(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the elements of the queue in the order in
+        which remove_min would return them, without modifying
+        the queue. The queue must not be modified while iterating.
+
+        The priorities in each bucket are lower than those in
+        the following buckets, so we only have to sort one
+        bucket at a time (when the iteration reaches it).
+
+        Returns: Iterator over (priority, item) pairs
+        """
+        for b, bucket in enumerate(self._buckets):
+            if b == 0:
+                for item in sorted(self._live0()):
+                    yield (self._last, item)
+            else:
+                yield from sorted((self._prio_of_item[item], item)
+                                  for item in bucket)
+
+    def peek(self, k: int) -> list[tuple[int, str]]:
+        """
+        Returns: List with (up to) the k minimum (priority, value)
+         pairs, in the order in which remove_min would return
+         them, without removing them from the queue.
+        """
+        return list(itertools.islice(self.iter_sorted(), max(k, 0)))
+
+    def __str__(self) -> str:
+        """
+        Returns: String representation of the queue, with one
+         line per non-empty bucket.
+        """
+        if self.empty:
+            return "[empty]"
+
+        lines = []
+        for b, bucket in enumerate(self._buckets):
+            if b == 0:
+                bucket = sorted(self._live0())
+            if bucket:
+                entries = " ".join(str((self._prio_of_item[item], item))
+                                   for item in bucket)
+                lines.append(f"{b}: {entries}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,545 @@
+from array import array
+import heapq
+import itertools
+from typing import Iterable, Iterator, Optional
+
+
+class CompactMinHeap:
+    """
+    Min heap with the same interface as MinHeap, but with
+    a more compact internal representation. Instead of a
+    list of (priority, item) tuples, priorities are stored
+    in a typed array of 64-bit integers, and each item is
+    interned into a small integer "handle" that is stored
+    in a parallel array.
+
+    Moving an entry around the heap only requires writing
+    integers into arrays (no tuples are allocated, and
+    no string-keyed dictionary entries are rewritten), so
+    this layout uses much less memory and produces no
+    garbage-collector churn on heaps with millions of
+    entries. Priorities must fit in a signed 64-bit integer.
+
+    insert returns the handle of the new element, which can
+    be passed to change_priority_by_handle and remove_by_handle
+    to find the element through the _pos array, without looking
+    up the item in a dictionary. A handle is valid until its
+    element is removed (after that, it may be reused by another
+    element). The methods that take an item are a thin layer on
+    top of the handle-based ones.
+    """
+
+    __slots__ = ("_prio", "_handle", "_pos", "_items",
+                 "_handle_of_item", "_free")
+
+    # _prio[i] and _handle[i] are the priority and the
+    # handle of the entry in position i of the heap.
+    _prio: array
+    _handle: array
+
+    # _pos[h] is the position in the heap of the entry
+    # with handle h, and _items[h] is its item (handles
+    # that are not in use have position -1 and item None)
+    _pos: array
+    _items: list[Optional[str]]
+
+    # Maps items to their handles, and keeps track of
+    # the handles that can be reused.
+    _handle_of_item: dict[str, int]
+    _free: list[int]
+
+    def __init__(self, initial_capacity=10):
+        """
+        Constructor. The arrays grow dynamically as more
+        elements are added, so (unlike MinHeap) there is no
+        need to preallocate any space.
+
+        Args:
+            initial_capacity: Ignored. Accepted only so that
+              this class can be used in place of a MinHeap.
+        """
+        self._prio = array("q")
+        self._handle = array("q")
+        self._pos = array("q")
+        self._items = []
+        self._handle_of_item = {}
+        self._free = []
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[int, str]]) -> "CompactMinHeap":
+        """
+        Builds a min heap from (priority, item) pairs in O(n)
+        time, by filling the arrays and then sifting down every
+        internal node, starting from the last one.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If the same item appears more than once,
+              or if any of the priorities is not a 64-bit integer.
+
+        Returns: A new min heap containing the items
+        """
+        mh = cls()
+        for priority, item in items:
+            if item in mh._handle_of_item:
+                raise ValueError(f"item '{item}' already in minheap")
+            mh._append_priority(priority)
+            handle = len(mh._items)
+            mh._items.append(item)
+            mh._handle_of_item[item] = handle
+            mh._handle.append(handle)
+            mh._pos.append(handle)
+
+        for pos in range((mh.size - 2) // 2, -1, -1):
+            mh._sift_down(pos)
+        return mh
+
+    @property
+    def size(self) -> int:
+        """
+        Returns: Number of elements in the min heap
+        """
+        return len(self._prio)
+
+    @property
+    def empty(self) -> bool:
+        """
+        Returns: whether the min heap is empty or not
+        """
+        return len(self._prio) == 0
+
+    def min(self) -> Optional[tuple[int, str]]:
+        """
+        Returns: If the heap is not empty, returns the
+         priority and value of the minimum element.
+         Otherwise, returns None.
+        """
+        if self.empty:
+            return None
+        item = self._items[self._handle[0]]
+        assert item is not None
+        return (self._prio[0], item)
+
+    def _sift_up(self, pos: int) -> None:
+        """
+        Sifts up the element in the given position until
+        it is in the correct position. Instead of swapping
+        the element with its parent at every level, we move
+        the parents down and only write the element once
+        it has reached its final position.
+        """
+        prios, handles, positions, items = \
+            self._prio, self._handle, self._pos, self._items
+        prio = prios[pos]
+        handle = handles[pos]
+        item = items[handle]
+
+        while pos > 0:
+            parent = (pos - 1) // 2
+            parent_prio = prios[parent]
+            parent_handle = handles[parent]
+            if prio < parent_prio or \
+                    (prio == parent_prio and item < items[parent_handle]):
+                prios[pos] = parent_prio
+                handles[pos] = parent_handle
+                positions[parent_handle] = pos
+                pos = parent
+            else:
+                break
+
+        prios[pos] = prio
+        handles[pos] = handle
+        positions[handle] = pos
+
+    def _sift_down(self, pos: int) -> None:
+        """
+        Sifts down the element in the given position until
+        it is in the correct position (moving the smaller
+        child up at every level).
+        """
+        prios, handles, positions, items = \
+            self._prio, self._handle, self._pos, self._items
+        n = len(prios)
+        prio = prios[pos]
+        handle = handles[pos]
+        item = items[handle]
+
+        while True:
+            child = 2 * pos + 1
+            if child >= n:
+                break
+            child_prio = prios[child]
+            right = child + 1
+            if right < n:
+                right_prio = prios[right]
+                if right_prio < child_prio or \
+                        (right_prio == child_prio and
+                         items[handles[right]] < items[handles[child]]):
+                    child = right
+                    child_prio = right_prio
+            child_handle = handles[child]
+            if child_prio < prio or \
+                    (child_prio == prio and items[child_handle] < item):
+                prios[pos] = child_prio
+                handles[pos] = child_handle
+                positions[child_handle] = pos
+                pos = child
+            else:
+                break
+
+        prios[pos] = prio
+        handles[pos] = handle
+        positions[handle] = pos
+
+    def remove_min(self) -> Optional[tuple[int, str]]:
+        """
+        Removes the minimum element from the minheap.
+
+        Returns: If the heap is not empty, returns the
+         priority and value of the minimum element.
+         Otherwise, returns None.
+        """
+        if self.empty:
+            return None
+        return self._remove_at(0)
+
+    def _remove_at(self, pos: int) -> tuple[int, str]:
+        """
+        Removes the element in the given position, by moving
+        the last element of the arrays into its place and then
+        sifting that element up or down.
+
+        Returns: The removed element
+        """
+        prio = self._prio[pos]
+        handle = self._handle[pos]
+        item = self._items[handle]
+        assert item is not None
+
+        last_prio = self._prio.pop()
+        last_handle = self._handle.pop()
+        if pos < len(self._prio):
+            self._prio[pos] = last_prio
+            self._handle[pos] = last_handle
+            self._sift_up(pos)
+            self._sift_down(self._pos[last_handle])
+
+        del self._handle_of_item[item]
+        self._items[handle] = None
+        self._pos[handle] = -1
+        self._free.append(handle)
+        return (prio, item)
+
+    def handle_of(self, item: str) -> int:
+        """
+        Returns: The handle of an item in the minheap
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the minheap.
+        """
+        if item not in self._handle_of_item:
+            raise ValueError(f"item '{item}' not in minheap")
+        return self._handle_of_item[item]
+
+    def _position_of_handle(self, handle: int) -> int:
+        """
+        Returns: Position in the heap of the element with the
+         given handle
+
+        Raises:
+            ValueError: If the handle is not in use
+        """
+        if not 0 <= handle < len(self._pos) or self._pos[handle] < 0:
+            raise ValueError(f"handle {handle} not in minheap")
+        return self._pos[handle]
+
+    def remove(self, item: str) -> tuple[int, str]:
+        """
+        Removes an item from the minheap (wherever it is)
+
+        Args:
+            item: Value of the item to remove.
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the minheap.
+
+        Returns: Priority and value of the removed item
+        """
+        return self.remove_by_handle(self.handle_of(item))
+
+    def remove_by_handle(self, handle: int) -> tuple[int, str]:
+        """
+        Removes the element with the given handle from the
+        minheap (wherever it is)
+
+        Args:
+            handle: Handle returned by insert
+
+        Raises:
+            ValueError: If the handle is not in use
+
+        Returns: Priority and value of the removed element
+        """
+        return self._remove_at(self._position_of_handle(handle))
+
+    def _append_priority(self, priority: int) -> None:
+        """
+        Appends a priority to the priority array (before any other
+        array is modified, so a priority that doesn't fit leaves
+        the heap unchanged)
+
+        Raises:
+            ValueError: If the priority is not a 64-bit integer
+        """
+        try:
+            self._prio.append(priority)
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"priorities must be 64-bit integers ({e})")
+
+    def insert(self, priority: int, item: str) -> int:
+        """
+        Inserts a new element into the min heap
+
+        Args:
+            priority: Priority of element to insert
+            item: Value of element to insert
+
+        Raises:
+            ValueError: If the item is already in the min heap, or
+              if the priority is not a 64-bit integer.
+
+        Returns: Handle of the new element
+        """
+        if item in self._handle_of_item:
+            raise ValueError(f"item '{item}' already in minheap")
+
+        self._append_priority(priority)
+        if self._free:
+            handle = self._free.pop()
+            self._items[handle] = item
+        else:
+            handle = len(self._items)
+            self._items.append(item)
+            self._pos.append(-1)
+
+        self._handle.append(handle)
+        self._handle_of_item[item] = handle
+        self._sift_up(len(self._prio) - 1)
+        return handle
+
+    def change_priority(self, item: str, new_prio: int) -> None:
+        """
+        Changes the priority of an item in the minheap.
+
+        Args:
+            item: Value of the item to update.
+            new_prio: New priority
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the minheap.
+
+        Returns: Nothing
+        """
+        self.change_priority_by_handle(self.handle_of(item), new_prio)
+
+    def change_priority_by_handle(self, handle: int, new_prio: int) -> None:
+        """
+        Changes the priority of the element with the given handle.
+
+        Args:
+            handle: Handle returned by insert
+            new_prio: New priority
+
+        Raises:
+            ValueError: If the handle is not in use, or if the new
+              priority is not a 64-bit integer.
+
+        Returns: Nothing
+        """
+        at = self._position_of_handle(handle)
+        old_prio = self._prio[at]
+        try:
+            self._prio[at] = new_prio
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"priorities must be 64-bit integers ({e})")
+        if new_prio < old_prio:
+            self._sift_up(at)
+        elif new_prio > old_prio:
+            self._sift_down(at)
+
+    def meld(self, other: "CompactMinHeap") -> None:
+        """
+        Moves all the elements of another min heap into this
+        one, leaving the other heap empty. The other heap's
+        arrays are appended to this heap's arrays (with new
+        handles) and, if the other heap is larger than this
+        one, the whole heap is rebuilt in O(n + m) time.
+        Otherwise, each new element is sifted up.
+
+        Args:
+            other: Min heap to meld into this one
+
+        Raises:
+            ValueError: If both heaps contain the same item (or
+              if other is this heap). In that case, neither heap
+              is modified.
+
+        Returns: Nothing
+        """
+        if other is self:
+            raise ValueError("can't meld a minheap with itself")
+        for item in other._handle_of_item:
+            if item in self._handle_of_item:
+                raise ValueError(f"item '{item}' already in minheap")
+
+        n = self.size
+        rebuild = other.size > n
+        for pos in range(other.size):
+            item = other._items[other._handle[pos]]
+            assert item is not None
+            if self._free:
+                handle = self._free.pop()
+                self._items[handle] = item
+            else:
+                handle = len(self._items)
+                self._items.append(item)
+                self._pos.append(-1)
+            self._prio.append(other._prio[pos])
+            self._handle.append(handle)
+            self._handle_of_item[item] = handle
+            self._pos[handle] = len(self._prio) - 1
+            if not rebuild:
+                self._sift_up(len(self._prio) - 1)
+        if rebuild:
+            for pos in range((self.size - 2) // 2, -1, -1):
+                self._sift_down(pos)
+
+        other.__init__()
+
+    def insert_many(self, items: Iterable[tuple[int, str]]) -> None:
+        """
+        Inserts several (priority, item) pairs into the min heap.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If any of the items is already in the
+              minheap (or appears twice in the batch), or if any
+              of the priorities is not a 64-bit integer. In that
+              case, none of the items are inserted.
+
+        Returns: Nothing
+        """
+        batch = [(priority, item) for priority, item in items]
+        seen = set()
+        for _, item in batch:
+            if item in self._handle_of_item or item in seen:
+                raise ValueError(f"item '{item}' already in minheap")
+            seen.add(item)
+        try:
+            array("q", [priority for priority, _ in batch])
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"priorities must be 64-bit integers ({e})")
+
+        for priority, item in batch:
+            self.insert(priority, item)
+
+    def remove_min_many(self, k: int) -> list[tuple[int, str]]:
+        """
+        Removes the k minimum elements from the minheap.
+
+        Args:
+            k: Number of elements to remove
+
+        Returns: List with (up to) k (priority, value) pairs,
+         in the order in which remove_min would return them.
+        """
+        rv = []
+        for _ in range(min(k, self.size)):
+            entry = self.remove_min()
+            assert entry is not None
+            rv.append(entry)
+        return rv
+
+    def change_priority_many(self, updates: Iterable[tuple[str, int]]) -> None:
+        """
+        Changes the priority of several items in the minheap.
+
+        Args:
+            updates: Iterable of (item, new priority) pairs
+
+        Raises:
+            ValueError: If any of the items is not in the minheap.
+              In that case, no priorities are changed.
+
+        Returns: Nothing
+        """
+        batch = [(item, new_prio) for item, new_prio in updates]
+        for item, _ in batch:
+            if item not in self._handle_of_item:
+                raise ValueError(f"item '{item}' not in minheap")
+
+        for item, new_prio in batch:
+            self.change_priority(item, new_prio)
+
+    def iter_sorted(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the elements of the minheap in the order
+        in which remove_min would return them, without modifying
+        the heap (see MinHeap.iter_sorted). The heap must not be
+        modified while iterating.
+
+        Returns: Iterator over (priority, item) pairs
+        """
+        prios, handles, items = self._prio, self._handle, self._items
+        n = len(prios)
+        if n == 0:
+            return
+
+        frontier = [(prios[0], items[handles[0]], 0)]
+        while frontier:
+            prio, item, pos = heapq.heappop(frontier)
+            assert item is not None
+            yield (prio, item)
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < n:
+                    heapq.heappush(frontier, (prios[child],
+                                              items[handles[child]], child))
+
+    def peek(self, k: int) -> list[tuple[int, str]]:
+        """
+        Returns: List with (up to) the k minimum (priority, value)
+         pairs, in the order in which remove_min would return
+         them, without removing them from the minheap.
+        """
+        return list(itertools.islice(self.iter_sorted(), max(k, 0)))
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Yields the string representation of the minheap one
+        line (one level of the tree) at a time.
+        """
+        if self.empty:
+            yield "[empty]"
+            return
+
+        start = 0
+        width = 1
+        while start < self.size:
+            end = min(start + width, self.size)
+            yield "".join(str((self._prio[i], self._items[self._handle[i]]))
+                          + " " for i in range(start, end)) + "\n"
+            start = end
+            width *= 2
+
+    def __str__(self) -> str:
+        """
+        Returns: String representation of min heap.
+        """
+        return "".join(self.iter_lines())
@@ -0,0 +1,256 @@
+import queue
+import threading
+import time
+from typing import Optional
+
+from pqueue import PriorityQueue
+
+# We raise the same exceptions as the queue module in the
+# standard library, so code written for queue.Queue can
+# handle timeouts in the same way.
+Empty = queue.Empty
+Full = queue.Full
+
+
+class ConcurrentPriorityQueue:
+    """
+    Thread-safe priority queue, which can be shared by multiple
+    producer and consumer threads. Consumers can block until an
+    element is available and, if the queue has a maximum size,
+    producers block until there is space in the queue.
+
+    All the operations are protected by a single lock, which is
+    held for as short a time as possible: timeouts are turned into
+    deadlines, and elements are validated and built, before
+    acquiring the lock, and the lock is released while a thread
+    is waiting.
+    """
+
+    _pq: PriorityQueue
+    _maxsize: int
+    _lock: threading.Lock
+    _not_empty: threading.Condition
+    _not_full: threading.Condition
+
+    # Number of times the lock has been acquired, and number
+    # of times a thread had to wait to acquire it
+    lock_acquisitions: int
+    lock_contentions: int
+
+    def __init__(self, maxsize: int = 0, backend: Optional[str] = None):
+        """
+        Constructor. Creates an empty priority queue.
+
+        Args:
+          maxsize: Maximum number of elements in the queue
+            (if zero or negative, the queue is unbounded)
+          backend: Name of the heap implementation to use
+            (see PriorityQueue)
+        """
+        self._pq = PriorityQueue(backend)
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self.lock_acquisitions = 0
+        self.lock_contentions = 0
+
+    def _acquire(self) -> None:
+        """
+        Acquires the lock, keeping track of whether we had
+        to wait for another thread to release it.
+        """
+        if not self._lock.acquire(blocking=False):
+            self._lock.acquire()
+            self.lock_contentions += 1
+        self.lock_acquisitions += 1
+
+    @staticmethod
+    def _deadline(block: bool, timeout: Optional[float]) -> Optional[float]:
+        """
+        Returns: Time (according to time.monotonic) at which a
+         blocking operation must give up, or None if it can wait
+         forever.
+
+        Raises:
+          ValueError: If the timeout is negative
+        """
+        if not block:
+            return time.monotonic()
+        if timeout is None:
+            return None
+        if timeout < 0:
+            raise ValueError("timeout must be a non-negative number")
+        return time.monotonic() + timeout
+
+    @staticmethod
+    def _entry(value: str, priority: int) -> tuple[str, int]:
+        """
+        Returns: The (value, priority) pair to pass to the
+         underlying priority queue
+
+        Raises:
+          ValueError: If the value is not a string or the
+            priority is not an integer
+        """
+        if not isinstance(value, str):
+            raise ValueError(f"values must be strings (got {value!r})")
+        if not isinstance(priority, int):
+            raise ValueError(f"priorities must be integers (got {priority!r})")
+        return (value, priority)
+
+    def _wait(self, cond: threading.Condition, deadline: Optional[float]) -> bool:
+        """
+        Waits on a condition (the lock must be held)
+
+        Returns: False if the deadline has passed, True otherwise
+        """
+        if deadline is None:
+            cond.wait()
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        cond.wait(remaining)
+        return True
+
+    def enqueue(self, value: str, priority: int, block: bool = True,
+                timeout: Optional[float] = None) -> None:
+        """
+        Enqueues an element with a priority. The element must
+        not already be in the priority queue. If the queue is
+        full, waits until there is space in the queue.
+
+        Args:
+          value: Value to enqueue
+          priority: Priority (lower values mean higher priority)
+          block: If False, don't wait if the queue is full
+          timeout: Maximum number of seconds to wait (if None,
+            wait for as long as necessary)
+
+        Raises:
+          ValueError: If `value` is already in the priority queue,
+            or if the value or the priority has the wrong type
+          Full: If there was no space in the queue before the
+            timeout expired (or if the queue was full and block
+            is False)
+
+        Returns: Nothing
+        """
+        deadline = self._deadline(block, timeout)
+        entry = self._entry(value, priority)
+
+        self._acquire()
+        try:
+            while 0 < self._maxsize <= self._pq.size:
+                if not self._wait(self._not_full, deadline):
+                    raise Full
+            self._pq.enqueue(*entry)
+            self._not_empty.notify()
+        finally:
+            self._lock.release()
+
+    def dequeue(self, block: bool = True,
+                timeout: Optional[float] = None) -> tuple[str, int]:
+        """
+        Dequeue the highest-priority element from the queue.
+        If the queue is empty, waits until an element is
+        enqueued.
+
+        Args:
+          block: If False, don't wait if the queue is empty
+          timeout: Maximum number of seconds to wait (if None,
+            wait for as long as necessary)
+
+        Raises:
+          Empty: If no element was available before the timeout
+            expired (or if the queue was empty and block is False)
+
+        Returns: Tuple with the highest-priority element
+        and its priority.
+        """
+        deadline = self._deadline(block, timeout)
+
+        self._acquire()
+        try:
+            while self._pq.size == 0:
+                if not self._wait(self._not_empty, deadline):
+                    raise Empty
+            rv = self._pq.dequeue()
+            self._not_full.notify()
+        finally:
+            self._lock.release()
+        return rv
+
+    def dequeue_many(self, k: int, block: bool = True,
+                     timeout: Optional[float] = None) -> list[tuple[str, int]]:
+        """
+        Dequeues up to k elements while holding the lock only
+        once. If the queue is empty, waits until at least one
+        element is enqueued.
+
+        Args:
+          k: Maximum number of elements to dequeue
+          block: If False, don't wait if the queue is empty
+          timeout: Maximum number of seconds to wait (if None,
+            wait for as long as necessary)
+
+        Raises:
+          Empty: If no element was available before the timeout
+            expired (or if the queue was empty and block is False)
+
+        Returns: List with between 1 and k (value, priority)
+        pairs, in priority order.
+        """
+        deadline = self._deadline(block, timeout)
+
+        self._acquire()
+        try:
+            while self._pq.size == 0:
+                if not self._wait(self._not_empty, deadline):
+                    raise Empty
+            rv = self._pq.dequeue_many(k)
+            self._not_full.notify(len(rv))
+        finally:
+            self._lock.release()
+        return rv
+
+    def update_priority(self, value: str, new_priority: int) -> None:
+        """
+        Updates the priority of an element in the priority queue
+
+        Args:
+          value: Value whose priority we want to update
+          new_priority: New priority (lower values mean higher priority)
+
+        Raises:
+          ValueError: If `value` does not exist in the priority queue,
+            or if the value or the new priority has the wrong type
+
+        Returns: Nothing
+        """
+        entry = self._entry(value, new_priority)
+
+        self._acquire()
+        try:
+            self._pq.update_priority(*entry)
+        finally:
+            self._lock.release()
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of elements in the priority queue
+        (which may have changed by the time the caller uses it)
+        """
+        return self._pq.size
+
+    @property
+    def contention(self) -> float:
+        """
+        Returns the fraction of lock acquisitions in which
+        a thread had to wait for another thread.
+        """
+        if self.lock_acquisitions == 0:
+            return 0.0
+        return self.lock_contentions / self.lock_acquisitions
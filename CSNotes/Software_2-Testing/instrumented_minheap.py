@@ -0,0 +1,162 @@
+import collections
+import time
+from typing import Any, Callable
+
+from minheap import MinHeap
+
+
+class HeapStats:
+    """
+    Counters collected by an InstrumentedMinHeap. They can be
+    used to tune the capacity and arity of a heap, by looking
+    at how much work the heap actually does.
+    """
+
+    # Number of comparisons between elements, number of swaps,
+    # and number of times the array had to grow
+    comparisons: int
+    swaps: int
+    regrowths: int
+
+    # Histograms of the number of levels an element moved by
+    # each sift (depth -> number of sifts)
+    sift_up_depths: collections.Counter[int]
+    sift_down_depths: collections.Counter[int]
+
+    # For each timed operation (insert, remove_min and
+    # change_priority): the number of calls, the total time
+    # spent in them (in nanoseconds), and a histogram of their
+    # latencies, where bucket b counts the calls that took
+    # less than 2**b ns (and at least 2**(b-1) ns)
+    calls: collections.Counter[str]
+    total_ns: collections.Counter[str]
+    latencies: dict[str, collections.Counter[int]]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets all the counters back to zero
+        """
+        self.comparisons = 0
+        self.swaps = 0
+        self.regrowths = 0
+        self.sift_up_depths = collections.Counter()
+        self.sift_down_depths = collections.Counter()
+        self.calls = collections.Counter()
+        self.total_ns = collections.Counter()
+        self.latencies = collections.defaultdict(collections.Counter)
+
+    def mean_latency_ns(self, op: str) -> float:
+        """
+        Returns: Average time (in nanoseconds) that a call to
+         the given operation took, or 0.0 if it was never called
+        """
+        if self.calls[op] == 0:
+            return 0.0
+        return self.total_ns[op] / self.calls[op]
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Returns: The counters as a dictionary (which can be
+         serialized to JSON)
+        """
+        return {
+            "comparisons": self.comparisons,
+            "swaps": self.swaps,
+            "regrowths": self.regrowths,
+            "sift_up_depths": dict(self.sift_up_depths),
+            "sift_down_depths": dict(self.sift_down_depths),
+            "calls": dict(self.calls),
+            "mean_latency_ns": {op: self.mean_latency_ns(op)
+                                for op in self.calls},
+            "latencies": {op: dict(hist)
+                          for op, hist in self.latencies.items()},
+        }
+
+
+class InstrumentedMinHeap(MinHeap):
+    """
+    MinHeap that keeps track of how much work it does (see
+    HeapStats). The counters are kept by overriding the
+    methods of MinHeap, so a regular MinHeap doesn't pay
+    anything for them: to turn instrumentation on, use this
+    class (or the "instrumented" backend of PriorityQueue)
+    instead of MinHeap.
+    """
+
+    stats: HeapStats
+
+    # Swaps and sift depths are counted by overriding _swap, so
+    # the sifts must go through it (the "hole" engine doesn't)
+    default_engine = "swap"
+
+    def __init__(self, *args, **kwargs):
+        """
+        Constructor. Takes the same arguments as MinHeap.
+
+        Raises:
+            ValueError: If the engine is not "swap" (or if any of
+              the other arguments is not valid, see MinHeap)
+        """
+        super().__init__(*args, **kwargs)
+        if self._hole:
+            raise ValueError("an instrumented heap must use the 'swap' engine")
+        self.stats = HeapStats()
+
+        # The sifts call self._lt for every comparison, so
+        # we count comparisons by wrapping it.
+        stats = self.stats
+        lt = self._lt
+
+        def counting_lt(a: tuple, b: tuple) -> bool:
+            stats.comparisons += 1
+            return lt(a, b)
+
+        self._lt = counting_lt
+
+    def _timed(self, op: str, fn: Callable, *args) -> Any:
+        """
+        Calls fn(*args), and records how long it took
+        """
+        start = time.perf_counter_ns()
+        rv = fn(*args)
+        elapsed = time.perf_counter_ns() - start
+        self.stats.calls[op] += 1
+        self.stats.total_ns[op] += elapsed
+        self.stats.latencies[op][elapsed.bit_length()] += 1
+        return rv
+
+    def _swap(self, p: int, q: int) -> None:
+        self.stats.swaps += 1
+        super()._swap(p, q)
+
+    def _sift_up(self, pos: int) -> None:
+        before = self.stats.swaps
+        super()._sift_up(pos)
+        self.stats.sift_up_depths[self.stats.swaps - before] += 1
+
+    def _sift_down(self, pos: int) -> None:
+        before = self.stats.swaps
+        super()._sift_down(pos)
+        self.stats.sift_down_depths[self.stats.swaps - before] += 1
+
+    def insert(self, priority: int, item: str) -> None:
+        capacity = self._capacity
+        self._timed("insert", super().insert, priority, item)
+        if self._capacity != capacity:
+            self.stats.regrowths += 1
+
+    def insert_many(self, items) -> None:
+        capacity = self._capacity
+        super().insert_many(items)
+        if self._capacity != capacity:
+            self.stats.regrowths += 1
+
+    def remove_min(self):
+        return self._timed("remove_min", super().remove_min)
+
+    def change_priority(self, item: str, new_prio: int) -> None:
+        self._timed("change_priority", super().change_priority,
+                    item, new_prio)
@@ -0,0 +1,66 @@
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from minheap import MinHeap
+
+
+def merge_sorted(*iterables: Iterable[Any],
+                 key: Optional[Callable[[Any], Any]] = None) -> Iterator[Any]:
+    """
+    Merges several sorted iterables into a single sorted
+    stream (like heapq.merge, but using a MinHeap).
+
+    The iterables are consumed lazily: the heap holds only
+    the current first element (the "head") of each iterable,
+    so the memory used is constant per iterable, no matter
+    how long the iterables are. Each time a head is yielded,
+    the next element of the same iterable replaces it at the
+    root of the heap.
+
+    Elements with the same priority are yielded in the order
+    of the iterables they come from (and, within an iterable,
+    in their original order), so the merge is stable.
+
+    Args:
+        iterables: Iterables, each of which must be sorted
+          (according to key)
+        key: Function that returns the priority of an element
+          (if None, elements are compared directly)
+
+    Returns: Iterator over the elements of all the iterables,
+     in sorted order
+    """
+    # The items in the heap are the indices of the iterables,
+    # so ties are broken by comparing two (distinct) integers.
+    mh = MinHeap(initial_capacity=len(iterables))
+    iterators: list[Iterator[Any]] = []
+    heads: list[Any] = []
+    for i, iterable in enumerate(iterables):
+        it = iter(iterable)
+        iterators.append(it)
+        heads.append(None)
+        for value in it:
+            heads[i] = value
+            mh.insert(value if key is None else key(value), i)  # type: ignore
+            break
+
+    while mh.size > 1:
+        entry = mh.min()
+        assert entry is not None
+        i = entry[1]
+        yield heads[i]
+        for value in iterators[i]:
+            heads[i] = value
+            mh.replace_min(value if key is None else key(value), i)  # type: ignore
+            break
+        else:
+            heads[i] = None
+            mh.remove_min()
+
+    # Once there is only one iterable left, there is nothing
+    # left to compare.
+    if not mh.empty:
+        entry = mh.min()
+        assert entry is not None
+        i = entry[1]
+        yield heads[i]
+        yield from iterators[i]
@@ -1,18 +1,76 @@
-from typing import Optional
+from array import array
+import heapq
+import itertools
+import io
+import math
+import mmap
+import operator
+import struct
+import sys
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 
 
-# Helper functions for obtaining the parent/left/right
-# index of a given position.
-def _parent_index(i):
+# Helper functions for obtaining the parent/children
+# index of a given position in a d-ary heap (in a binary
+# heap, the children of i are in positions 2i+1 and 2i+2)
+def _parent_index(i, arity=2):
     if i == 0:
         return None
-    return (i - 1) // 2
+    return (i - 1) // arity
 
-def _left_child_index(i):
-    return 2 * i + 1
+def _first_child_index(i, arity=2):
+    return arity * i + 1
 
-def _right_child_index(i):
-    return 2 * i + 2
+
+class _Tombstone:
+    """
+    Placeholder for an item that has been removed from a
+    min heap with lazy removal, but is still in the array.
+    A tombstone compares like the item it replaces, so the
+    array is still a valid heap.
+    """
+
+    __slots__ = ("item",)
+
+    def __init__(self, item: str):
+        self.item = item
+
+    def __lt__(self, other):
+        if isinstance(other, _Tombstone):
+            other = other.item
+        return self.item < other
+
+    def __gt__(self, other):
+        if isinstance(other, _Tombstone):
+            other = other.item
+        return self.item > other
+
+    def __repr__(self) -> str:
+        return f"<removed {self.item!r}>"
+
+
+def _priority_lt(a: tuple, b: tuple) -> bool:
+    """
+    Compares two heap entries by their priority only
+    """
+    return a[0] < b[0]
+
+
+# Ways of ordering elements that have the same priority
+TIE_BREAKS = ("lexicographic", "fifo", "none")
+
+# Ways of sifting elements up and down (see MinHeap._sift_up)
+ENGINES = ("hole", "swap")
+
+# Layout of the header of a binary snapshot (see MinHeap.dump):
+# magic number, format version, arity, tie-break policy (as an
+# index into TIE_BREAKS), kind of heap (see _snapshot_kind),
+# number of elements, size of the item section in bytes, and
+# next sequence number (for "fifo")
+_SNAPSHOT_MAGIC = b"MNHP"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sBBBBQQQ")
+_ITEM_LENGTH = struct.Struct("<I")
 
 
 class MinHeap:
@@ -21,14 +79,62 @@ class MinHeap:
     specifically store string values with an associated
     integer priority (and the heap will return the values
     with the lowest integer priorities first)
+
+    By default, each node has two children (a binary
+    heap), but the heap can be configured to have any
+    number of children per node. Heaps with more children
+    are shallower, which makes insertions and priority
+    decreases cheaper (at the expense of removals, which
+    have to look at more children at each level)
+
+    Items can be removed from anywhere in the heap. With
+    lazy removal, a removed item is just replaced by a
+    tombstone in O(1) time, and the tombstones are discarded
+    when they reach the root of the heap (or when there are
+    so many of them that it is worth rebuilding the heap)
+
+    Elements with the same priority are returned in
+    lexicographical order by default. Since comparing long
+    strings is slow, the heap can instead return them in
+    the order in which they were inserted ("fifo"), or in
+    no particular order ("none"). Neither of these compares
+    the items themselves.
     """
 
     _data: list[Optional[tuple[int, str]]]
+    _arity: int
     _capacity: int
     _index_of_item: dict[str, int]
     _next: int
 
-    def __init__(self, initial_capacity=10):
+    # Number of tombstones in the array, and fraction of the
+    # array that they can take up before the heap is rebuilt
+    # (if _compact_ratio is None, items are removed eagerly)
+    _dead: int
+    _compact_ratio: Optional[float]
+
+    # How to break ties, and the function used to compare
+    # elements of the array. With "fifo", elements of the
+    # array are (priority, sequence number, item) tuples
+    # instead of (priority, item) tuples.
+    _tie_break: str
+    _lt: Callable[[tuple, tuple], bool]
+    _seq: Iterable[int]
+
+    # Whether the sifts use the "hole" engine (see _sift_up), and
+    # the engine used when none is given to the constructor
+    _hole: bool
+    default_engine = "hole"
+
+    # Subclasses that arrange the array differently (like
+    # MinMaxHeap) override these: whether a sorted array is a
+    # valid heap, and the kind of heap recorded in snapshots
+    # (so that a snapshot can't be loaded into the wrong class)
+    _sorted_is_heap = True
+    _snapshot_kind = 0
+
+    def __init__(self, initial_capacity=10, arity=2, lazy_removal=False,
+                 compact_ratio=0.5, tie_break="lexicographic", engine=None):
         """
         Constructor. The min heap is constructed with
         an initial capacity, which grows dynamically
@@ -36,7 +142,45 @@ class MinHeap:
 
         Args:
             initial_capacity: Initial capacity of the min heap.
+            arity: Number of children of each node.
+            lazy_removal: Whether remove() should leave tombstones
+              in the array, instead of removing items right away.
+            compact_ratio: With lazy removal, the heap is rebuilt
+              without its tombstones when they take up more than
+              this fraction of the array.
+            tie_break: How to order elements with the same
+              priority: "lexicographic", "fifo" or "none".
+            engine: How to sift elements: "hole" or "swap" (if
+              None, default_engine is used). Both leave the heap
+              in exactly the same state, but "hole" is faster.
+
+        Raises:
+            ValueError: If the arity is less than 2, if the
+              compact ratio is not between 0 and 1, or if the
+              tie-break policy or the engine are not valid.
         """
+        if arity < 2:
+            raise ValueError(f"arity must be at least 2 (got {arity})")
+        self._arity = arity
+
+        if not 0 < compact_ratio <= 1:
+            raise ValueError("compact_ratio must be between 0 and 1 "
+                             f"(got {compact_ratio})")
+        self._dead = 0
+        self._compact_ratio = compact_ratio if lazy_removal else None
+
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"unknown tie-break policy: {tie_break}")
+        self._tie_break = tie_break
+        self._lt = _priority_lt if tie_break == "none" else operator.lt
+        self._seq = itertools.count()
+
+        if engine is None:
+            engine = self.default_engine
+        if engine not in ENGINES:
+            raise ValueError(f"unknown sift engine: {engine}")
+        self._hole = engine == "hole"
+
         # Create an array with enough space for the initial
         # capacity of the min heap
         self._data = [None] * initial_capacity
@@ -49,19 +193,256 @@ class MinHeap:
         self._index_of_item = {}
         self._next = 0
 
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[int, str]],
+                   **options) -> "MinHeap":
+        """
+        Builds a min heap from (priority, item) pairs in O(n)
+        time. Instead of inserting the items one by one (which
+        takes O(n log n) time), we copy all of them into the
+        array and then heapify it bottom-up.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+            options: Arguments for the constructor (e.g., arity)
+
+        Raises:
+            ValueError: If the same item appears more than once.
+
+        Returns: A new min heap containing the items
+        """
+        mh = cls(initial_capacity=0, **options)
+        data = [mh._make_entry(priority, item) for priority, item in items]
+        mh._data = data
+        mh._capacity = len(data)
+        mh._next = len(data)
+        mh._heapify()
+
+        if len(mh._index_of_item) != mh._next:
+            seen = set()
+            for entry in data:
+                item = entry[-1]
+                if item in seen:
+                    raise ValueError(f"item '{item}' already in minheap")
+                seen.add(item)
+        return mh
+
+    def dump(self, fileobj: BinaryIO, priority_offset: int = 0) -> None:
+        """
+        Writes a binary snapshot of the min heap to a file,
+        which can be restored with MinHeap.load. The array is
+        saved in heap order, so loading it doesn't have to
+        heapify it again.
+
+        The snapshot consists of a fixed-size header, followed
+        by the priorities (and, with "fifo" tie-breaking, the
+        sequence numbers) as packed little-endian 64-bit
+        integers, followed by the items as UTF-8 strings, each
+        prefixed by its length. Any tombstones (with lazy
+        removal) are discarded before writing the snapshot.
+
+        Args:
+            fileobj: File opened in binary mode
+            priority_offset: Number added to every priority before
+              writing it (adding the same number to every priority
+              doesn't change the order of the heap)
+
+        Raises:
+            ValueError: If a priority is not an integer that fits
+              in 64 bits, or if an item is not a string.
+
+        Returns: Nothing
+        """
+        if self._dead > 0:
+            self._compact()
+        entries = self._data[:self._next]
+
+        try:
+            prios = array("q", [entry[0] + priority_offset  # type: ignore
+                                for entry in entries])
+            seqs = array("q", [entry[1] for entry in entries]  # type: ignore
+                         if self._tie_break == "fifo" else [])
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"priorities must be 64-bit integers ({e})")
+        if sys.byteorder != "little":
+            prios.byteswap()
+            seqs.byteswap()
+
+        chunks = []
+        for entry in entries:
+            item = entry[-1]  # type: ignore
+            if not isinstance(item, str):
+                raise ValueError(f"items must be strings (got {item!r})")
+            encoded = item.encode("utf-8")
+            chunks.append(_ITEM_LENGTH.pack(len(encoded)))
+            chunks.append(encoded)
+        items = b"".join(chunks)
+
+        next_seq = max(seqs, default=-1) + 1 if self._tie_break == "fifo" else 0
+        fileobj.write(_SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, self._arity,
+            TIE_BREAKS.index(self._tie_break), self._snapshot_kind,
+            self._next, len(items), next_seq))
+        fileobj.write(prios.tobytes())
+        fileobj.write(seqs.tobytes())
+        fileobj.write(items)
+
+    @staticmethod
+    def _read_ints(fileobj: BinaryIO, n: int) -> list[int]:
+        """
+        Reads n packed little-endian 64-bit integers from a file.
+        If the file is a regular file on disk, the integers are
+        read straight from a memory map of the file (instead of
+        copying them into an intermediate buffer).
+        """
+        if n == 0:
+            return []
+        size = 8 * n
+
+        # Other file objects may have a file descriptor that
+        # doesn't hold the bytes we read (e.g., a gzip file), or
+        # one that can't be mapped (e.g., a pipe), and then we
+        # fall back to reading the bytes
+        mm = None
+        if isinstance(fileobj, (io.BufferedReader, io.FileIO)) and \
+                fileobj.seekable() and sys.byteorder == "little":
+            try:
+                start = fileobj.tell()
+                mm = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mm = None
+
+        if mm is not None:
+            with mm:
+                if start + size > len(mm):
+                    raise ValueError("truncated minheap snapshot")
+                with memoryview(mm) as view, \
+                        view[start:start + size] as region, \
+                        region.cast("q") as ints:
+                    rv = ints.tolist()
+            fileobj.seek(start + size)
+            return rv
+
+        data = fileobj.read(size)
+        if len(data) != size:
+            raise ValueError("truncated minheap snapshot")
+        ints = array("q")
+        ints.frombytes(data)
+        if sys.byteorder != "little":
+            ints.byteswap()
+        return ints.tolist()
+
+    @classmethod
+    def load(cls, fileobj: BinaryIO, **options) -> "MinHeap":
+        """
+        Restores a min heap from a snapshot written by dump.
+        The elements are put back in the array in the same
+        order, so the heap doesn't have to be heapified, and
+        _index_of_item is rebuilt in a single pass.
+
+        Args:
+            fileobj: File opened in binary mode, positioned at
+              the start of the snapshot (after loading, it is
+              positioned at the end of the snapshot)
+            options: Arguments for the constructor (e.g.,
+              lazy_removal). The arity and tie-break policy are
+              taken from the snapshot.
+
+        Raises:
+            ValueError: If the file does not contain a valid
+              snapshot.
+
+        Returns: The restored min heap
+        """
+        header = fileobj.read(_SNAPSHOT_HEADER.size)
+        if len(header) != _SNAPSHOT_HEADER.size:
+            raise ValueError("truncated minheap snapshot")
+        magic, version, arity, tie_break, kind, n, items_size, next_seq = \
+            _SNAPSHOT_HEADER.unpack(header)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION \
+                or tie_break >= len(TIE_BREAKS):
+            raise ValueError("not a minheap snapshot")
+        if kind != cls._snapshot_kind:
+            raise ValueError(f"snapshot can't be loaded as a {cls.__name__}")
+
+        mh = cls(initial_capacity=0, arity=arity,
+                 tie_break=TIE_BREAKS[tie_break], **options)
+        prios = cls._read_ints(fileobj, n)
+        seqs = cls._read_ints(fileobj, n) if mh._tie_break == "fifo" else []
+
+        data = fileobj.read(items_size)
+        if len(data) != items_size:
+            raise ValueError("truncated minheap snapshot")
+        items = []
+        offset = 0
+        for _ in range(n):
+            (length,) = _ITEM_LENGTH.unpack_from(data, offset)
+            offset += _ITEM_LENGTH.size
+            items.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        if offset != items_size:
+            raise ValueError("corrupt minheap snapshot")
+
+        if seqs:
+            mh._data = list(zip(prios, seqs, items))
+            mh._seq = itertools.count(next_seq)
+        else:
+            mh._data = list(zip(prios, items))
+        mh._capacity = n
+        mh._next = n
+        mh._rebuild_index()
+        if len(mh._index_of_item) != n:
+            raise ValueError("corrupt minheap snapshot")
+        return mh
+
     @property
     def size(self) -> int:
         """
         Returns: Number of elements in the min heap
         """
-        return self._next
+        return self._next - self._dead
 
     @property
     def empty(self) -> bool:
         """
         Returns: whether the min heap is empty or not
         """
-        return self._next == 0
+        return self._next == self._dead
+
+    def _make_entry(self, priority: int, item: str) -> tuple:
+        """
+        Returns: The tuple that represents an element in the
+         minheap array (which depends on the tie-break policy)
+        """
+        if self._tie_break == "fifo":
+            return (priority, next(self._seq), item)
+        return (priority, item)
+
+    @staticmethod
+    def _public(entry: tuple) -> tuple[int, str]:
+        """
+        Returns: The (priority, item) pair for an element
+         of the minheap array
+        """
+        if len(entry) == 2:
+            return entry
+        return (entry[0], entry[-1])
+
+    def _discard_tombstones(self) -> None:
+        """
+        Removes the tombstones from the root of the heap,
+        so that the root is an element that is still
+        in the heap.
+        """
+        while self._dead > 0 and isinstance(self._data[0][-1], _Tombstone):
+            # If there are many tombstones, removing them one by
+            # one from the root is slower than rebuilding the heap
+            if self._rebuild_is_cheaper(self._dead,
+                                        2 * math.log2(self._next + 2)):
+                self._compact()
+                return
+            self._remove_at(0)
+            self._dead -= 1
 
     def min(self) -> Optional[tuple[int, str]]:
         """
@@ -71,7 +452,10 @@ class MinHeap:
         """
         if self.empty:
             return None
-        return self._data[0]
+        self._discard_tombstones()
+        entry = self._data[0]
+        assert entry is not None
+        return self._public(entry)
 
     def _swap(self, p: int, q: int) -> None:
         """
@@ -84,8 +468,8 @@ class MinHeap:
         assert elem_p is not None and elem_q is not None
 
         tmp = elem_p
-        self._index_of_item[elem_p[1]] = q
-        self._index_of_item[elem_q[1]] = p
+        self._index_of_item[elem_p[-1]] = q
+        self._index_of_item[elem_q[-1]] = p
         self._data[p] = elem_q
         self._data[q] = tmp
 
@@ -93,38 +477,143 @@ class MinHeap:
         """
         Sifts up the element in the given position until
         it is in the correct position.
+
+        With the "swap" engine, the element is swapped with its
+        parent at every level. With the "hole" engine, the element
+        is held aside while the parents that are larger than it
+        are moved down one level into the "hole" it leaves, and
+        it is written once, in its final position. So every level
+        takes a single write to the array and to _index_of_item
+        (instead of two of each, plus re-reading both elements).
         """
-        if pos == 0:
+        data = self._data
+        arity = self._arity
+        lt = self._lt
+        if not self._hole:
+            while pos > 0:
+                pi = _parent_index(pos, arity)
+                if lt(data[pos], data[pi]):
+                    self._swap(pos, pi)
+                    pos = pi
+                else:
+                    break
             return
-        pi = _parent_index(pos)
-        if self._data[pos] < self._data[pi]:
-            self._swap(pos, pi)
-            self._sift_up(pi)
+
+        index = self._index_of_item
+        entry = data[pos]
+        start = pos
+        while pos > 0:
+            pi = (pos - 1) // arity
+            parent = data[pi]
+            if not lt(entry, parent):
+                break
+            data[pos] = parent
+            index[parent[-1]] = pos  # type: ignore
+            pos = pi
+        if pos != start:
+            data[pos] = entry
+            index[entry[-1]] = pos  # type: ignore
 
     def _sift_down(self, pos: int) -> None:
         """
         Sifts down the element in the given position until
-        it is in the correct position.
+        it is in the correct position (with either engine, see
+        _sift_up).
         """
-        curr = self._data[pos]
-        (li, ri) = (_left_child_index(pos), _right_child_index(pos))
-        if li >= self._next:
+        data = self._data
+        arity = self._arity
+        lt = self._lt
+        n = self._next
+        if not self._hole:
+            while True:
+                first = _first_child_index(pos, arity)
+                if first >= n:
+                    break
+
+                # Find the smallest of the (up to arity) children
+                mi = first
+                m = data[first]
+                for ci in range(first + 1, min(first + arity, n)):
+                    if lt(data[ci], m):
+                        mi = ci
+                        m = data[ci]
+
+                if lt(m, data[pos]):
+                    self._swap(pos, mi)
+                    pos = mi
+                else:
+                    break
             return
-        elif li < self._next and ri >= self._next:
-            lc = self._data[li]
-            m = min(curr, lc)
-            if lc == m:
-                self._swap(pos, li)
-                self._sift_down(li)
-        else:
-            (lc, rc) = (self._data[li], self._data[ri])
-            m = min([curr, lc, rc])
-            if rc == m:
-                self._swap(pos, ri)
-                self._sift_down(ri)
-            elif lc == m:
-                self._swap(pos, li)
-                self._sift_down(li)
+
+        index = self._index_of_item
+        entry = data[pos]
+        start = pos
+        while True:
+            first = arity * pos + 1
+            if first >= n:
+                break
+            mi = first
+            m = data[first]
+            if arity == 2:
+                if first + 1 < n and lt(data[first + 1], m):
+                    mi = first + 1
+                    m = data[mi]
+            else:
+                for ci in range(first + 1, min(first + arity, n)):
+                    if lt(data[ci], m):
+                        mi = ci
+                        m = data[ci]
+            if not lt(m, entry):
+                break
+            data[pos] = m
+            index[m[-1]] = pos  # type: ignore
+            pos = mi
+        if pos != start:
+            data[pos] = entry
+            index[entry[-1]] = pos  # type: ignore
+
+    def _heapify(self) -> None:
+        """
+        Rearranges the first _next elements of the minheap
+        array into a valid heap, starting from the last
+        internal node and sifting each node down. The
+        _index_of_item dictionary is rebuilt once at the end,
+        instead of being updated on every move.
+        """
+        data = self._data
+        arity = self._arity
+        lt = self._lt
+        n = self._next
+        # (n - 2) // arity is the parent of the last element
+        for start in range((n - 2) // arity, -1, -1):
+            pos = start
+            entry = data[pos]
+            while True:
+                first = _first_child_index(pos, arity)
+                if first >= n:
+                    break
+                child = first
+                for ci in range(first + 1, min(first + arity, n)):
+                    if lt(data[ci], data[child]):
+                        child = ci
+                if lt(data[child], entry):
+                    data[pos] = data[child]
+                    pos = child
+                else:
+                    break
+            data[pos] = entry
+
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """
+        Rebuilds the _index_of_item dictionary from scratch
+        """
+        self._index_of_item = {}
+        for i in range(self._next):
+            entry = self._data[i]
+            assert entry is not None
+            self._index_of_item[entry[-1]] = i
 
     def remove_min(self) -> Optional[tuple[int, str]]:
         """
@@ -137,18 +626,79 @@ class MinHeap:
         if self.empty:
             return None
 
-        min_item = self._data[0]
-        assert min_item is not None
+        self._discard_tombstones()
+        return self._public(self._remove_at(0))
 
-        if self._next > 0:
-            self._data[0] = self._data[self._next - 1]
-            assert self._data[0] is not None
+    def _remove_at(self, pos: int) -> tuple:
+        """
+        Removes the element in the given position, by moving
+        the last element of the array into its place and then
+        sifting that element up or down.
+
+        Returns: The removed element (as stored in the array)
+        """
+        entry = self._data[pos]
+        assert entry is not None
+        self._next -= 1
+        last = self._data[self._next]
+        assert last is not None
+        del self._index_of_item[entry[-1]]
 
-            self._index_of_item[self._data[0][1]] = 0
-            self._next -= 1
-            del self._index_of_item[min_item[1]]
-            self._sift_down(0)
-        return min_item
+        if pos < self._next:
+            self._data[pos] = last
+            self._index_of_item[last[-1]] = pos
+            if self._lt(last, entry):
+                self._sift_up(pos)
+            else:
+                self._sift_down(pos)
+        return entry
+
+    def remove(self, item: str) -> tuple[int, str]:
+        """
+        Removes an item from the minheap (wherever it is)
+
+        With lazy removal, the item is replaced by a tombstone,
+        which takes O(1) time. Otherwise, the item is removed
+        right away, which takes O(log n) time.
+
+        Args:
+            item: Value of the item to remove.
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the minheap.
+
+        Returns: Priority and value of the removed item
+        """
+        if item not in self._index_of_item:
+            raise ValueError(f"item '{item}' not in minheap")
+
+        at = self._index_of_item[item]
+        if self._compact_ratio is None:
+            return self._public(self._remove_at(at))
+
+        entry = self._data[at]
+        assert entry is not None
+        tombstone = _Tombstone(item)
+        del self._index_of_item[item]
+        self._index_of_item[tombstone] = at  # type: ignore
+        self._data[at] = entry[:-1] + (tombstone,)  # type: ignore
+        self._dead += 1
+        if self._dead > self._compact_ratio * self._next:
+            self._compact()
+        return self._public(entry)
+
+    def _compact(self) -> None:
+        """
+        Removes all the tombstones from the array, and
+        rebuilds the heap with the remaining elements.
+        """
+        live = [entry for entry in self._data[:self._next]
+                if entry is not None and not isinstance(entry[-1], _Tombstone)]
+        self._data[:len(live)] = live
+        self._next = len(live)
+        self._dead = 0
+        self._heapify()
 
     def insert(self, priority: int, item: str) -> None:
         """
@@ -163,15 +713,53 @@ class MinHeap:
         if item in self._index_of_item:
             raise ValueError(f"item '{item}' already in minheap")
 
-        if self.size == self._capacity:
+        if self._next == self._capacity:
             self._data += [None] * 10
             self._capacity += 10
 
-        self._data[self._next] = (priority, item)
+        self._data[self._next] = self._make_entry(priority, item)
         self._index_of_item[item] = self._next
         self._next += 1
         self._sift_up(self._next - 1)
 
+    def replace_min(self, priority: int,
+                    item: str) -> Optional[tuple[int, str]]:
+        """
+        Removes the minimum element and inserts a new element
+        in its place. This is faster than calling remove_min and
+        then insert, since the new element is sifted down from
+        the root once (and the array never grows or shrinks).
+        The new element may have the same value as the removed
+        one.
+
+        Args:
+            priority: Priority of element to insert
+            item: Value of element to insert
+
+        Raises:
+            ValueError: If the item is already in the minheap
+              (and it is not the minimum element)
+
+        Returns: If the heap was not empty, returns the priority
+         and value of the removed element. Otherwise, the new
+         element is just inserted, and returns None.
+        """
+        if self.empty:
+            self.insert(priority, item)
+            return None
+
+        self._discard_tombstones()
+        entry = self._data[0]
+        assert entry is not None
+        if item in self._index_of_item and item != entry[-1]:
+            raise ValueError(f"item '{item}' already in minheap")
+
+        del self._index_of_item[entry[-1]]
+        self._data[0] = self._make_entry(priority, item)
+        self._index_of_item[item] = 0
+        self._sift_down(0)
+        return self._public(entry)
+
     def change_priority(self, item: str, new_prio: int) -> None:
         """
         Changes the priority of an item in the minheap.
@@ -193,28 +781,268 @@ class MinHeap:
         entry = self._data[at]
         assert entry is not None
 
-        old_prio, _ = entry
-        self._data[at] = (new_prio, item)
+        old_prio = entry[0]
+        # With "fifo", the element keeps its sequence number
+        self._data[at] = (new_prio,) + entry[1:]
         if new_prio < old_prio:
             self._sift_up(at)
         elif new_prio > old_prio:
             self._sift_down(at)
 
-    def __str__(self) -> str:
+    def _rebuild_is_cheaper(self, k: int, sift_cost: float) -> bool:
         """
-        Returns: String representation of min heap.
+        Decides whether a batch operation that touches k
+        elements should rebuild the whole array (which takes
+        O(n) time) instead of sifting each of the k elements
+        individually. sift_cost is the (rough) cost of sifting
+        a single element, relative to the cost of moving one
+        element while rebuilding the heap.
         """
-        if self.empty:
-            return "[empty]"
+        return k * sift_cost > self._next
 
-        linebreak = 1
-        row_count = 0
-        rv = ""
-        for i in range(self._next):
-            rv += str(self._data[i]) + " "
-            row_count += 1
-            if row_count == linebreak or i == self._next - 1:
-                rv += "\n"
-                linebreak *= 2
-                row_count = 0
+    def insert_many(self, items: Iterable[tuple[int, str]]) -> None:
+        """
+        Inserts several (priority, item) pairs into the min heap.
+        If the batch is large compared to the heap, the items are
+        appended to the array and the whole heap is rebuilt in
+        linear time. Otherwise, each item is sifted up.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If any of the items is already in the
+              minheap (or appears twice in the batch). In that
+              case, none of the items are inserted.
+
+        Returns: Nothing
+        """
+        batch = [self._make_entry(priority, item) for priority, item in items]
+
+        seen = set()
+        for entry in batch:
+            item = entry[-1]
+            if item in self._index_of_item or item in seen:
+                raise ValueError(f"item '{item}' already in minheap")
+            seen.add(item)
+        self._append_entries(batch)
+
+    def _append_entries(self, batch: list[tuple]) -> None:
+        """
+        Adds entries (whose items are not in the minheap) to the
+        end of the array, and restores the heap property, either
+        by sifting each of them up or by rebuilding the heap.
+        """
+        needed = self._next + len(batch) - self._capacity
+        if needed > 0:
+            self._data += [None] * needed
+            self._capacity += needed
+
+        # A new element with a random priority is sifted up only
+        # a couple of levels on average, so we only rebuild the
+        # heap if the batch is larger than the heap itself.
+        rebuild = self._rebuild_is_cheaper(len(batch), 1)
+        for entry in batch:
+            self._data[self._next] = entry
+            self._next += 1
+            if not rebuild:
+                self._index_of_item[entry[-1]] = self._next - 1
+                self._sift_up(self._next - 1)
+        if rebuild:
+            self._heapify()
+
+    def meld(self, other: "MinHeap") -> None:
+        """
+        Moves all the elements of another min heap into this
+        one, leaving the other heap empty. Like insert_many, if
+        the other heap is large compared to this one, the two
+        arrays are concatenated and heapified in O(n + m) time.
+        Otherwise, each new element is sifted up.
+
+        Args:
+            other: Min heap to meld into this one (it may have a
+              different arity or tie-break policy)
+
+        Raises:
+            ValueError: If both heaps contain the same item (or
+              if other is this heap). In that case, neither heap
+              is modified.
+
+        Returns: Nothing
+        """
+        if other is self:
+            raise ValueError("can't meld a minheap with itself")
+
+        entries = [entry for entry in other._data[:other._next]
+                   if entry is not None
+                   and not isinstance(entry[-1], _Tombstone)]
+        if other._tie_break == "fifo":
+            # Keep the insertion order of the other heap's elements
+            entries.sort(key=operator.itemgetter(1))
+        # The items of the other heap are all different, so we
+        # only have to check them against this heap's items
+        for entry in entries:
+            if entry[-1] in self._index_of_item:
+                raise ValueError(f"item '{entry[-1]}' already in minheap")
+        self._append_entries([self._make_entry(entry[0], entry[-1])
+                              for entry in entries])
+
+        other._data = [None] * other._capacity
+        other._index_of_item = {}
+        other._next = 0
+        other._dead = 0
+
+    def remove_min_many(self, k: int) -> list[tuple[int, str]]:
+        """
+        Removes the k minimum elements from the minheap. If k is
+        large compared to the heap, the array is sorted instead
+        of removing the minimum element k times (a sorted array
+        is also a valid heap, so the remaining elements don't
+        have to be sifted at all)
+
+        Args:
+            k: Number of elements to remove
+
+        Returns: List with (up to) k (priority, value) pairs,
+         in the order in which remove_min would return them.
+        """
+        # Every removal sifts an element all the way down
+        # the tree, comparing it with its children at each level.
+        k = min(k, self.size)
+        if not self._rebuild_is_cheaper(k, 2 * math.log2(self._next + 2)):
+            rv = []
+            for _ in range(k):
+                entry = self.remove_min()
+                assert entry is not None
+                rv.append(entry)
+            return rv
+
+        live = [entry for entry in self._data[:self._next]
+                if entry is not None
+                and not isinstance(entry[-1], _Tombstone)]
+        if self._tie_break == "none":
+            live.sort(key=operator.itemgetter(0))
+        else:
+            live.sort()
+        rv = [self._public(entry) for entry in live[:k]]
+        self._data[:len(live) - k] = live[k:]
+        self._next = len(live) - k
+        self._dead = 0
+        if self._sorted_is_heap:
+            self._rebuild_index()
+        else:
+            self._heapify()
         return rv
+
+    def change_priority_many(self, updates: Iterable[tuple[str, int]]) -> None:
+        """
+        Changes the priority of several items in the minheap.
+        If the batch is large compared to the heap, the heap
+        is rebuilt after updating all the priorities. Otherwise,
+        each updated item is sifted up or down.
+
+        Args:
+            updates: Iterable of (item, new priority) pairs
+
+        Raises:
+            ValueError: If any of the items is not in the minheap.
+              In that case, no priorities are changed.
+
+        Returns: Nothing
+        """
+        batch = [(item, new_prio) for item, new_prio in updates]
+        for item, _ in batch:
+            if item not in self._index_of_item:
+                raise ValueError(f"item '{item}' not in minheap")
+
+        if not self._rebuild_is_cheaper(len(batch), 4):
+            for item, new_prio in batch:
+                self.change_priority(item, new_prio)
+            return
+
+        for item, new_prio in batch:
+            at = self._index_of_item[item]
+            entry = self._data[at]
+            assert entry is not None
+            self._data[at] = (new_prio,) + entry[1:]
+        self._heapify()
+
+    def iter_sorted(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the elements of the minheap in the order
+        in which remove_min would return them, without modifying
+        the heap. The heap must not be modified while iterating.
+
+        The minimum of the elements that haven't been returned
+        yet is always the parent of some element that has been
+        returned (or the root), so we keep those candidates in a
+        small auxiliary heap (the "frontier") of positions in
+        the array. Returning k elements takes O(k log k) time
+        (times the arity), no matter how large the heap is.
+
+        Returns: Iterator over (priority, item) pairs
+        """
+        data = self._data
+        arity = self._arity
+        n = self._next
+        if n == 0:
+            return
+
+        # The frontier contains (key, position) pairs. With
+        # "none", elements are only compared by priority, and
+        # ties are broken by position.
+        if self._tie_break == "none":
+            def key(entry):
+                return entry[0]
+        else:
+            def key(entry):
+                return entry
+
+        frontier = [(key(data[0]), 0)]
+        while frontier:
+            _, pos = heapq.heappop(frontier)
+            entry = data[pos]
+            assert entry is not None
+            if not isinstance(entry[-1], _Tombstone):
+                yield self._public(entry)
+
+            first = _first_child_index(pos, arity)
+            for ci in range(first, min(first + arity, n)):
+                heapq.heappush(frontier, (key(data[ci]), ci))
+
+    def peek(self, k: int) -> list[tuple[int, str]]:
+        """
+        Returns: List with (up to) the k minimum (priority, value)
+         pairs, in the order in which remove_min would return
+         them, without removing them from the minheap.
+        """
+        return list(itertools.islice(self.iter_sorted(), max(k, 0)))
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Yields the string representation of the minheap one
+        line (one level of the tree) at a time, so that a very
+        large heap can be written out without building the
+        whole string in memory.
+        """
+        if self.empty:
+            yield "[empty]"
+            return
+
+        start = 0
+        width = 1
+        while start < self._next:
+            end = min(start + width, self._next)
+            row = []
+            for entry in self._data[start:end]:
+                assert entry is not None
+                row.append(str(self._public(entry)) + " ")
+            yield "".join(row) + "\n"
+            start = end
+            width *= self._arity
+
+    def __str__(self) -> str:
+        """
+        Returns: String representation of min heap.
+        """
+        return "".join(self.iter_lines())
@@ -0,0 +1,229 @@
+import heapq
+from typing import Iterator, Optional
+
+from minheap import MinHeap, _Tombstone
+
+
+def _is_min_level(i: int) -> bool:
+    """
+    Returns: Whether position i is on a min level of a
+     min-max heap (the root is on level 0, which is a min
+     level, and levels alternate from there)
+    """
+    return (i + 1).bit_length() % 2 == 1
+
+
+class MinMaxHeap(MinHeap):
+    """
+    Double-ended priority queue implemented as a min-max heap,
+    with the same interface as MinHeap plus max and remove_max.
+
+    A min-max heap is a binary heap whose levels alternate
+    between "min levels" (starting with the root) and "max
+    levels". An element on a min level is smaller than all of
+    its descendants, and an element on a max level is larger
+    than all of its descendants. So the minimum is at the root,
+    and the maximum is one of the root's children, and both
+    can be removed in O(log n) time.
+
+    Min-max heaps are always binary, so the arity can't be
+    changed, and they have their own sifts, so the engine
+    option of MinHeap has no effect.
+    """
+
+    _sorted_is_heap = False
+    _snapshot_kind = 1
+
+    def __init__(self, initial_capacity=10, arity=2, **options):
+        """
+        Constructor. Takes the same arguments as MinHeap.
+
+        Raises:
+            ValueError: If the arity is not 2, or if any of the
+              other arguments is not valid (see MinHeap)
+        """
+        if arity != 2:
+            raise ValueError(f"a min-max heap must have arity 2 (got {arity})")
+        super().__init__(initial_capacity, arity, **options)
+
+    def _better(self, level: int, i: int, j: int) -> bool:
+        """
+        Returns: Whether the element in position i should be
+         closer to the root than the element in position j,
+         according to the kind of level of position `level`
+         (i.e., whether it is smaller on a min level, or larger
+         on a max level)
+        """
+        if _is_min_level(level):
+            return self._lt(self._data[i], self._data[j])
+        return self._lt(self._data[j], self._data[i])
+
+    def _push_up(self, pos: int) -> int:
+        """
+        Moves the element in the given position up the levels
+        of the same kind (i.e., swapping it with its grandparent)
+        for as long as it is better than its grandparent.
+
+        Returns: The final position of the element
+        """
+        while pos > 2:
+            grandparent = (pos - 3) // 4
+            if self._better(pos, pos, grandparent):
+                self._swap(pos, grandparent)
+                pos = grandparent
+            else:
+                break
+        return pos
+
+    def _trickle_down(self, pos: int) -> None:
+        """
+        Moves the element in the given position down, for as
+        long as one of its children or grandchildren is better
+        than it (according to the kind of level of pos).
+        """
+        n = self._next
+        while True:
+            first = 2 * pos + 1
+            if first >= n:
+                return
+
+            # Best of the children and grandchildren, which are
+            # in positions 2i+1, 2i+2 and 4i+3 to 4i+6
+            best = first
+            for c in (first + 1, 2 * first + 1, 2 * first + 2,
+                      2 * first + 3, 2 * first + 4):
+                if c < n and self._better(pos, c, best):
+                    best = c
+
+            if not self._better(pos, best, pos):
+                return
+            self._swap(best, pos)
+            if best <= first + 1:
+                # A child is on the other kind of level, and
+                # has no descendants that can be out of order
+                return
+
+            # The element that moved down to a grandchild may
+            # now be out of order with its new parent
+            parent = (best - 1) // 2
+            if self._better(pos, parent, best):
+                self._swap(best, parent)
+            pos = best
+
+    def _fix(self, pos: int) -> None:
+        """
+        Moves the element in the given position (which may
+        be out of order with its ancestors or descendants)
+        to a valid position.
+        """
+        if pos > 0:
+            parent = (pos - 1) // 2
+            # If the element belongs on the other kind of level
+            # (e.g., it is on a min level, but it is larger than
+            # its parent), it swaps places with its parent and
+            # moves up the levels of that kind. The parent is
+            # then moved down from the element's old position.
+            if self._better(parent, pos, parent):
+                self._swap(pos, parent)
+                self._push_up(parent)
+                self._trickle_down(pos)
+                return
+
+        if self._push_up(pos) == pos:
+            self._trickle_down(pos)
+
+    def _sift_up(self, pos: int) -> None:
+        self._fix(pos)
+
+    def _sift_down(self, pos: int) -> None:
+        self._fix(pos)
+
+    def _heapify(self) -> None:
+        """
+        Rearranges the first _next elements of the array into
+        a valid min-max heap, by trickling down every internal
+        node, starting from the last one.
+        """
+        for pos in range((self._next - 2) // 2, -1, -1):
+            self._trickle_down(pos)
+        self._rebuild_index()
+
+    def _max_position(self) -> int:
+        """
+        Returns: Position of the maximum element (the heap
+         must not be empty)
+        """
+        if self._next <= 2:
+            return self._next - 1
+        return 1 if self._better(1, 1, 2) else 2
+
+    def _discard_max_tombstones(self) -> None:
+        """
+        With lazy removal, removes the tombstones that are
+        in the position of the maximum element.
+        """
+        while self._dead > 0:
+            pos = self._max_position()
+            entry = self._data[pos]
+            assert entry is not None
+            if not isinstance(entry[-1], _Tombstone):
+                break
+            self._remove_at(pos)
+            self._dead -= 1
+
+    def max(self) -> Optional[tuple[int, str]]:
+        """
+        Returns: If the heap is not empty, returns the
+         priority and value of the maximum element.
+         Otherwise, returns None.
+        """
+        if self.empty:
+            return None
+        self._discard_max_tombstones()
+        entry = self._data[self._max_position()]
+        assert entry is not None
+        return self._public(entry)
+
+    def remove_max(self) -> Optional[tuple[int, str]]:
+        """
+        Removes the maximum element from the heap.
+
+        Returns: If the heap is not empty, returns the
+         priority and value of the maximum element.
+         Otherwise, returns None.
+        """
+        if self.empty:
+            return None
+        self._discard_max_tombstones()
+        return self._public(self._remove_at(self._max_position()))
+
+    def iter_sorted(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the elements of the heap in the order
+        in which remove_min would return them, without modifying
+        the heap. The heap must not be modified while iterating.
+
+        Unlike in a MinHeap, the elements on max levels are
+        larger than their children, so we can't walk the tree
+        from the root. Instead, we copy the elements into a
+        separate heap in O(n) time, and remove them from it
+        one at a time (returning k elements takes O(n + k log n)
+        time).
+
+        Returns: Iterator over (priority, item) pairs
+        """
+        # As in MinHeap.iter_sorted, with "none" the elements
+        # are only compared by priority, and ties are broken
+        # by position.
+        if self._tie_break == "none":
+            copy = [(entry[0], pos, entry)
+                    for pos, entry in enumerate(self._data[:self._next])]
+        else:
+            copy = [(entry, pos, entry)
+                    for pos, entry in enumerate(self._data[:self._next])]
+        heapq.heapify(copy)
+        while copy:
+            _, _, entry = heapq.heappop(copy)
+            assert entry is not None
+            if not isinstance(entry[-1], _Tombstone):
+                yield self._public(entry)
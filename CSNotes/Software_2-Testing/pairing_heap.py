@@ -0,0 +1,432 @@
+import heapq
+import itertools
+from typing import Iterable, Iterator, Optional
+
+
+class _Node:
+    """
+    Node of a pairing heap. Each node points to its leftmost
+    child and to its next sibling. The prev attribute points
+    to the previous sibling or, for the leftmost child, to
+    the parent (this allows us to cut a node from the tree
+    in constant time)
+    """
+
+    __slots__ = ("entry", "child", "sibling", "prev")
+
+    entry: tuple[int, str]
+    child: Optional["_Node"]
+    sibling: Optional["_Node"]
+    prev: Optional["_Node"]
+
+    def __init__(self, entry: tuple[int, str]):
+        self.entry = entry
+        self.child = None
+        self.sibling = None
+        self.prev = None
+
+
+def _link(a: _Node, b: _Node) -> _Node:
+    """
+    Links two (detached) trees by making the root with
+    the larger entry the leftmost child of the other one.
+
+    Returns: Root of the linked tree
+    """
+    if b.entry < a.entry:
+        a, b = b, a
+    b.sibling = a.child
+    if a.child is not None:
+        a.child.prev = b
+    b.prev = a
+    a.child = b
+    return a
+
+
+def _merge_pairs(first: Optional[_Node]) -> Optional[_Node]:
+    """
+    Merges a list of sibling trees into a single tree using
+    the standard two-pass strategy: first link the trees in
+    pairs from left to right, and then link the resulting
+    trees from right to left.
+
+    Returns: Root of the merged tree (or None if there
+     were no trees to merge)
+    """
+    pairs = []
+    node = first
+    while node is not None:
+        a = node
+        b = a.sibling
+        a.prev = a.sibling = None
+        if b is None:
+            pairs.append(a)
+            break
+        node = b.sibling
+        b.prev = b.sibling = None
+        pairs.append(_link(a, b))
+
+    if not pairs:
+        return None
+    root = pairs.pop()
+    while pairs:
+        root = _link(pairs.pop(), root)
+    return root
+
+
+class PairingHeap:
+    """
+    Class implementing a min heap as a pairing heap, with
+    the same interface as MinHeap.
+
+    A pairing heap is a tree where each node can have any
+    number of children. Inserting an element or decreasing
+    its priority just links a single-node tree with the root,
+    which takes O(1) time, and all the work of restructuring
+    the tree is deferred until the minimum is removed (which
+    takes O(log n) amortized time). This makes pairing heaps
+    a good fit for algorithms like Dijkstra's algorithm,
+    which decrease priorities much more often than they
+    remove elements.
+    """
+
+    _root: Optional[_Node]
+    _node_of_item: dict[str, _Node]
+
+    def __init__(self, initial_capacity=10):
+        """
+        Constructor. Creates an empty pairing heap.
+
+        Args:
+            initial_capacity: Ignored. Accepted only so that
+              this class can be used in place of a MinHeap.
+        """
+        self._root = None
+        self._node_of_item = {}
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[int, str]]) -> "PairingHeap":
+        """
+        Builds a pairing heap from (priority, item) pairs.
+        Since insertions take O(1) time, this takes O(n) time.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If the same item appears more than once.
+
+        Returns: A new pairing heap containing the items
+        """
+        ph = cls()
+        for priority, item in items:
+            ph.insert(priority, item)
+        return ph
+
+    @property
+    def size(self) -> int:
+        """
+        Returns: Number of elements in the heap
+        """
+        return len(self._node_of_item)
+
+    @property
+    def empty(self) -> bool:
+        """
+        Returns: whether the heap is empty or not
+        """
+        return self._root is None
+
+    def min(self) -> Optional[tuple[int, str]]:
+        """
+        Returns: If the heap is not empty, returns the
+         priority and value of the minimum element.
+         Otherwise, returns None.
+        """
+        if self._root is None:
+            return None
+        return self._root.entry
+
+    def _cut(self, node: _Node) -> None:
+        """
+        Detaches a (non-root) node, along with its subtree,
+        from its parent and siblings.
+        """
+        prev = node.prev
+        assert prev is not None
+        if prev.child is node:
+            prev.child = node.sibling
+        else:
+            prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = prev
+        node.prev = node.sibling = None
+
+    def remove_min(self) -> Optional[tuple[int, str]]:
+        """
+        Removes the minimum element from the heap.
+
+        Returns: If the heap is not empty, returns the
+         priority and value of the minimum element.
+         Otherwise, returns None.
+        """
+        root = self._root
+        if root is None:
+            return None
+
+        self._root = _merge_pairs(root.child)
+        root.child = None
+        del self._node_of_item[root.entry[1]]
+        return root.entry
+
+    def remove(self, item: str) -> tuple[int, str]:
+        """
+        Removes an item from the heap (wherever it is), by
+        cutting it from the tree and linking its children
+        with the root.
+
+        Args:
+            item: Value of the item to remove.
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the heap.
+
+        Returns: Priority and value of the removed item
+        """
+        if item not in self._node_of_item:
+            raise ValueError(f"item '{item}' not in minheap")
+
+        node = self._node_of_item.pop(item)
+        children = _merge_pairs(node.child)
+        node.child = None
+        if node is self._root:
+            self._root = children
+        else:
+            self._cut(node)
+            assert self._root is not None
+            if children is not None:
+                self._root = _link(self._root, children)
+        return node.entry
+
+    def insert(self, priority: int, item: str) -> None:
+        """
+        Inserts a new element into the heap
+
+        Args:
+            priority: Priority of element to insert
+            item: Value of element to insert
+
+        Returns: Nothing
+        """
+        if item in self._node_of_item:
+            raise ValueError(f"item '{item}' already in minheap")
+
+        node = _Node((priority, item))
+        self._node_of_item[item] = node
+        if self._root is None:
+            self._root = node
+        else:
+            self._root = _link(self._root, node)
+
+    def change_priority(self, item: str, new_prio: int) -> None:
+        """
+        Changes the priority of an item in the heap. Decreasing
+        the priority takes O(1) time, while increasing it takes
+        O(log n) amortized time.
+
+        Args:
+            item: Value of the item to update.
+            new_prio: New priority
+
+        Raises:
+            ValueError: If there is no item with value `item`
+              in the heap.
+
+        Returns: Nothing
+        """
+        if item not in self._node_of_item:
+            raise ValueError(f"item '{item}' not in minheap")
+
+        node = self._node_of_item[item]
+        root = self._root
+        assert root is not None
+        old_entry = node.entry
+        node.entry = (new_prio, item)
+
+        if node.entry < old_entry:
+            # The node can only be smaller than its parent, so we
+            # cut it (along with its subtree) and link it with
+            # the root.
+            if node is not root:
+                self._cut(node)
+                self._root = _link(root, node)
+        elif old_entry < node.entry:
+            # The node can now be larger than its children, so we
+            # merge its children into a separate tree, and link
+            # that tree and the (now childless) node with the root.
+            children = _merge_pairs(node.child)
+            node.child = None
+            if node is root:
+                new_root = children
+            else:
+                self._cut(node)
+                new_root = root
+                if children is not None:
+                    new_root = _link(new_root, children)
+            self._root = node if new_root is None else _link(new_root, node)
+
+    def meld(self, other: "PairingHeap") -> None:
+        """
+        Moves all the elements of another pairing heap into this
+        one, leaving the other heap empty. The two trees are
+        linked in O(1) time. Checking for duplicates and merging
+        the item dictionaries takes time proportional to the
+        size of the smaller heap.
+
+        Args:
+            other: Pairing heap to meld into this one
+
+        Raises:
+            ValueError: If both heaps contain the same item (or
+              if other is this heap). In that case, neither heap
+              is modified.
+
+        Returns: Nothing
+        """
+        if other is self:
+            raise ValueError("can't meld a minheap with itself")
+
+        small, large = self._node_of_item, other._node_of_item
+        if len(small) > len(large):
+            small, large = large, small
+        for item in small:
+            if item in large:
+                raise ValueError(f"item '{item}' already in minheap")
+
+        large.update(small)
+        self._node_of_item = large
+        other._node_of_item = {}
+        if self._root is None:
+            self._root = other._root
+        elif other._root is not None:
+            self._root = _link(self._root, other._root)
+        other._root = None
+
+    def insert_many(self, items: Iterable[tuple[int, str]]) -> None:
+        """
+        Inserts several (priority, item) pairs into the heap.
+
+        Args:
+            items: Iterable of (priority, item) pairs
+
+        Raises:
+            ValueError: If any of the items is already in the
+              heap (or appears twice in the batch). In that
+              case, none of the items are inserted.
+
+        Returns: Nothing
+        """
+        batch = [(priority, item) for priority, item in items]
+        seen = set()
+        for _, item in batch:
+            if item in self._node_of_item or item in seen:
+                raise ValueError(f"item '{item}' already in minheap")
+            seen.add(item)
+
+        for priority, item in batch:
+            self.insert(priority, item)
+
+    def remove_min_many(self, k: int) -> list[tuple[int, str]]:
+        """
+        Removes the k minimum elements from the heap.
+
+        Args:
+            k: Number of elements to remove
+
+        Returns: List with (up to) k (priority, value) pairs,
+         in the order in which remove_min would return them.
+        """
+        rv = []
+        for _ in range(min(k, self.size)):
+            entry = self.remove_min()
+            assert entry is not None
+            rv.append(entry)
+        return rv
+
+    def change_priority_many(self, updates: Iterable[tuple[str, int]]) -> None:
+        """
+        Changes the priority of several items in the heap.
+
+        Args:
+            updates: Iterable of (item, new priority) pairs
+
+        Raises:
+            ValueError: If any of the items is not in the heap.
+              In that case, no priorities are changed.
+
+        Returns: Nothing
+        """
+        batch = [(item, new_prio) for item, new_prio in updates]
+        for item, _ in batch:
+            if item not in self._node_of_item:
+                raise ValueError(f"item '{item}' not in minheap")
+
+        for item, new_prio in batch:
+            self.change_priority(item, new_prio)
+
+    def iter_sorted(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the elements of the heap in the order in
+        which remove_min would return them, without modifying
+        the heap. The heap must not be modified while iterating.
+
+        Every child of a node is larger than the node, so we
+        keep the children of the nodes that have already been
+        returned in an auxiliary heap (the "frontier"), and
+        return the smallest one at each step.
+
+        Returns: Iterator over (priority, item) pairs
+        """
+        if self._root is None:
+            return
+
+        # Nodes are not comparable, so the frontier contains
+        # (entry, counter, node) triples
+        counter = itertools.count()
+        frontier = [(self._root.entry, next(counter), self._root)]
+        while frontier:
+            entry, _, node = heapq.heappop(frontier)
+            yield entry
+            child = node.child
+            while child is not None:
+                heapq.heappush(frontier, (child.entry, next(counter), child))
+                child = child.sibling
+
+    def peek(self, k: int) -> list[tuple[int, str]]:
+        """
+        Returns: List with (up to) the k minimum (priority, value)
+         pairs, in the order in which remove_min would return
+         them, without removing them from the heap.
+        """
+        return list(itertools.islice(self.iter_sorted(), max(k, 0)))
+
+    def __str__(self) -> str:
+        """
+        Returns: String representation of the heap, with one
+         line per node (children are indented below their
+         parent)
+        """
+        if self._root is None:
+            return "[empty]"
+
+        lines = []
+        stack: list[tuple[_Node, int]] = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            lines.append("  " * depth + str(node.entry))
+            if node.sibling is not None and depth > 0:
+                stack.append((node.sibling, depth))
+            if node.child is not None:
+                stack.append((node.child, depth + 1))
+        return "\n".join(lines) + "\n"
@@ -1,17 +1,179 @@
+import math
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+from bucket_queue import BucketQueue
+from compact_minheap import CompactMinHeap
+from instrumented_minheap import HeapStats, InstrumentedMinHeap
 from minheap import MinHeap
+from minmax_heap import MinMaxHeap
+from pairing_heap import PairingHeap
+from sortedruns import SortedRuns
+
+# Heap implementations that can be used by the priority
+# queue. All of them have the same interface as MinHeap.
+Heap = Union[MinHeap, CompactMinHeap, PairingHeap, BucketQueue]
+
+_BACKENDS = {
+    "heap": MinHeap,
+    "compact": CompactMinHeap,
+    "pairing": PairingHeap,
+    "bucket": BucketQueue,
+    "instrumented": InstrumentedMinHeap,
+    "minmax": MinMaxHeap,
+}
 
 class PriorityQueue:
     """
-    Priority queue implemented with a min heap
+    Priority queue implemented with a min heap. By default,
+    the queue uses a MinHeap, but other heap implementations
+    (backends) can be selected when creating the queue:
+
+    - "heap": MinHeap (array-based binary heap)
+    - "compact": CompactMinHeap (MinHeap stored in typed arrays)
+    - "pairing": PairingHeap (O(1) enqueue and priority decreases)
+    - "bucket": BucketQueue (for monotone integer priorities, which
+      must be non-negative and never lower than the priority of the
+      last dequeued element; enqueue and update_priority raise
+      ValueError if this is not the case)
+    - "instrumented": InstrumentedMinHeap (MinHeap that counts
+      comparisons, swaps, sift depths, regrowths and latencies,
+      which are available in the stats attribute)
+    - "minmax": MinMaxHeap (also supports dequeue_max, to remove
+      the lowest-priority element)
+
+    With order_stats=True, the queue also keeps its elements in
+    a SortedRuns, which is updated by every operation (in O(sqrt n)
+    time), and which answers count_below, rank, quantile and range
+    queries without scanning the heap.
+
+    shift_all adds the same number to every priority in O(1) time,
+    without touching the heap: the heap stores every priority minus
+    an offset, and the offset is added back whenever a priority is
+    read. An aging policy is built on top of it: with aging=k, every
+    call to advance_epoch lowers the priority of every element that
+    is already in the queue by k, so elements that have been waiting
+    for longer get ahead of newer elements.
     """
 
-    _mh: MinHeap
+    _mh: Heap
+
+    # Order-statistics index (None unless order_stats=True). Like
+    # the heap, it stores the priorities minus _offset.
+    _index: Optional[SortedRuns]
+
+    # Number added to the priorities stored in the heap to obtain
+    # the actual priorities, and the amount by which advance_epoch
+    # lowers every priority
+    _offset: int
+    _aging: int
 
-    def __init__(self):
+    # Backend used when no backend is given to the constructor
+    default_backend = "heap"
+
+    def __init__(self, backend: Optional[str] = None,
+                 order_stats: bool = False, aging: int = 0, **options):
         """
         Constructor. Creates an empty priority queue.
+
+        Args:
+          backend: Name of the heap implementation to use
+            (if None, default_backend is used)
+          order_stats: Whether to keep an index for order
+            statistics queries (see count_below)
+          aging: How much advance_epoch lowers the priority of the
+            elements in the queue
+          options: Arguments for the constructor of the heap
+            (e.g., arity=4, lazy_removal=True or tie_break="fifo"
+            with a MinHeap)
+
+        Raises:
+          ValueError: If there is no backend with that name
+        """
+        if backend is None:
+            backend = self.default_backend
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self._mh = _BACKENDS[backend](**options)
+        self._index = SortedRuns() if order_stats else None
+        self._offset = 0
+        self._aging = aging
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[str, int]],
+                   backend: Optional[str] = None,
+                   order_stats: bool = False,
+                   **options) -> "PriorityQueue":
+        """
+        Creates a priority queue from (value, priority) pairs
+        in O(n) time, which is much faster than enqueueing
+        the values one at a time.
+
+        Args:
+          items: Iterable of (value, priority) pairs
+          backend: Name of the heap implementation to use
+          order_stats: Whether to keep an order statistics index
+          options: Arguments for the constructor of the heap
+
+        Raises:
+          ValueError: If a value appears more than once
+
+        Returns: A new priority queue containing the values
+        """
+        q = cls(backend, order_stats, **options)
+        q.enqueue_many(items)
+        return q
+
+    def dump(self, fileobj: BinaryIO) -> None:
+        """
+        Writes a binary snapshot of the priority queue to a
+        file (see MinHeap.dump)
+
+        Args:
+          fileobj: File opened in binary mode
+
+        Raises:
+          ValueError: If the queue's backend is not based on
+            MinHeap, or if its contents can't be saved (see
+            MinHeap.dump)
+
+        Returns: Nothing
         """
-        self._mh = MinHeap()
+        if not isinstance(self._mh, MinHeap):
+            raise ValueError("this backend does not support snapshots")
+        self._mh.dump(fileobj, self._offset)
+
+    @classmethod
+    def load(cls, fileobj: BinaryIO, backend: str = "heap",
+             order_stats: bool = False, **options) -> "PriorityQueue":
+        """
+        Restores a priority queue from a snapshot written by
+        dump, without re-enqueueing every value.
+
+        Args:
+          fileobj: File opened in binary mode
+          backend: Name of the heap implementation that was used
+            by the queue that was saved
+          order_stats: Whether to keep an order statistics index
+            (which is rebuilt from the restored heap)
+          options: Arguments for the constructor of the heap
+            (see MinHeap.load)
+
+        Raises:
+          ValueError: If the file does not contain a valid
+            snapshot for that backend (or if the backend does not
+            support snapshots)
+
+        Returns: The restored priority queue
+        """
+        heap_class = _BACKENDS.get(backend)
+        if heap_class is None or not issubclass(heap_class, MinHeap):
+            raise ValueError(f"backend {backend!r} does not support snapshots")
+        q = cls(backend, order_stats)
+        q._mh = heap_class.load(fileobj, **options)
+        if q._index is not None:
+            for prio, val in q._mh.iter_sorted():
+                q._index.add(prio, val)
+        return q
 
     def enqueue(self, value: str, priority: int) -> None:
         """
@@ -27,14 +189,17 @@ class PriorityQueue:
 
         Returns: Nothing
         """
-
+        priority -= self._offset
         self._mh.insert(priority, value)
+        if self._index is not None:
+            self._index.add(priority, value)
 
     def dequeue(self) -> tuple[str, int]:
         """
         Dequeue the highest-priority element from the queue.
         If multiple elements have the same priority, those
-        elements are dequeued in lexicographical order.
+        elements are dequeued in lexicographical order (unless
+        the heap was created with a different tie_break policy)
 
         Args: None
 
@@ -44,8 +209,32 @@ class PriorityQueue:
         elem = self._mh.remove_min()
         assert elem is not None
         prio, val = elem
+        if self._index is not None:
+            self._index.remove(val)
 
-        return val, prio
+        return val, prio + self._offset
+
+    def dequeue_max(self) -> tuple[str, int]:
+        """
+        Dequeue the lowest-priority element from the queue
+        (e.g., to evict it when the queue is full). Only the
+        "minmax" backend supports this operation.
+
+        Raises:
+          ValueError: If the backend does not support it
+
+        Returns: Tuple with the lowest-priority element
+        and its priority.
+        """
+        if not isinstance(self._mh, MinMaxHeap):
+            raise ValueError("only the 'minmax' backend supports dequeue_max")
+        elem = self._mh.remove_max()
+        assert elem is not None
+        prio, val = elem
+        if self._index is not None:
+            self._index.remove(val)
+
+        return val, prio + self._offset
 
     def update_priority(self, value: str, new_priority: int) -> None:
         """
@@ -60,7 +249,302 @@ class PriorityQueue:
 
         Returns: Nothing
         """
+        new_priority -= self._offset
         self._mh.change_priority(value, new_priority)
+        if self._index is not None:
+            self._index.remove(value)
+            self._index.add(new_priority, value)
+
+    def cancel(self, value: str) -> int:
+        """
+        Removes an element from the priority queue without
+        dequeuing it.
+
+        Args:
+          value: Value to remove
+
+        Raises:
+          ValueError: If `value` does not exist in the priority queue.
+
+        Returns: The priority that the element had
+        """
+        prio, _ = self._mh.remove(value)
+        if self._index is not None:
+            self._index.remove(value)
+        return prio + self._offset
+
+    def merge(self, other: "PriorityQueue") -> None:
+        """
+        Moves all the elements of another priority queue into
+        this one, leaving the other queue empty.
+
+        If both queues use the same backend (and their priorities
+        have been shifted by the same amount), their heaps are
+        melded (see the meld method of each heap), which is
+        much faster than enqueueing every element of the other
+        queue. Otherwise, the elements of the other queue are
+        enqueued in a single batch (see enqueue_many).
+
+        Args:
+          other: Priority queue to merge into this one
+
+        Raises:
+          ValueError: If both queues contain the same value (or
+            if other is this queue), or if the other queue's
+            priorities are not valid for this queue's backend.
+            In that case, neither queue is modified.
+
+        Returns: Nothing
+        """
+        if other is self:
+            raise ValueError("can't merge a priority queue with itself")
+        meld = type(self._mh) is type(other._mh) and \
+            self._offset == other._offset
+        if other._index is not None:
+            items = [(prio, val) for prio, val in other._index]
+        elif self._index is not None or not meld:
+            items = list(other._mh.iter_sorted())
+        else:
+            items = []
+        # Priorities stored in the other queue's heap, relative
+        # to this queue's offset
+        delta = other._offset - self._offset
+        if delta:
+            items = [(prio + delta, val) for prio, val in items]
+
+        if meld:
+            self._mh.meld(other._mh)  # type: ignore
+        else:
+            self._mh.insert_many(items)
+            other._mh.remove_min_many(len(items))
+
+        if self._index is not None:
+            for prio, val in items:
+                self._index.add(prio, val)
+        if other._index is not None:
+            other._index = SortedRuns()
+
+    def enqueue_many(self, items: Iterable[tuple[str, int]]) -> None:
+        """
+        Enqueues several elements at once. This is faster than
+        calling enqueue repeatedly, specially when the batch is
+        large compared to the size of the queue.
+
+        Args:
+          items: Iterable of (value, priority) pairs
+
+        Raises:
+          ValueError: If any of the values is already in the
+            priority queue (in which case nothing is enqueued)
+
+        Returns: Nothing
+        """
+        offset = self._offset
+        if self._index is None:
+            self._mh.insert_many((priority - offset, value)
+                                 for value, priority in items)
+            return
+        batch = [(priority - offset, value) for value, priority in items]
+        self._mh.insert_many(batch)
+        for priority, value in batch:
+            self._index.add(priority, value)
+
+    def dequeue_many(self, k: int) -> list[tuple[str, int]]:
+        """
+        Dequeues the k highest-priority elements from the queue.
+
+        Args:
+          k: Number of elements to dequeue
+
+        Returns: List with (up to) k (value, priority) pairs,
+        in the same order in which dequeue would return them.
+        """
+        offset = self._offset
+        rv = [(val, prio + offset) for prio, val in self._mh.remove_min_many(k)]
+        if self._index is not None:
+            for val, _ in rv:
+                self._index.remove(val)
+        return rv
+
+    def update_priority_many(self, updates: Iterable[tuple[str, int]]) -> None:
+        """
+        Updates the priorities of several elements at once
+
+        Args:
+          updates: Iterable of (value, new priority) pairs
+
+        Raises:
+          ValueError: If any of the values does not exist in the
+            priority queue (in which case nothing is updated)
+
+        Returns: Nothing
+        """
+        offset = self._offset
+        updates = [(value, new_priority - offset)
+                   for value, new_priority in updates]
+        self._mh.change_priority_many(updates)
+        if self._index is None:
+            return
+        for value, new_priority in updates:
+            self._index.remove(value)
+            self._index.add(new_priority, value)
+
+    def peek(self, k: int) -> list[tuple[str, int]]:
+        """
+        Returns the k highest-priority elements, without
+        dequeueing them.
+
+        Args:
+          k: Maximum number of elements to return
+
+        Returns: List with up to k (value, priority) pairs,
+        in the order in which they would be dequeued.
+        """
+        return [(val, prio + self._offset) for prio, val in self._mh.peek(k)]
+
+    def iter_sorted(self) -> Iterator[tuple[str, int]]:
+        """
+        Iterates over the elements of the queue in the order in
+        which they would be dequeued, without dequeueing them.
+        The queue must not be modified while iterating.
+
+        Returns: Iterator over (value, priority) pairs
+        """
+        for prio, val in self._mh.iter_sorted():
+            yield val, prio + self._offset
+
+    def _order_stats(self) -> SortedRuns:
+        """
+        Returns: The order statistics index
+
+        Raises:
+          ValueError: If the queue was created without
+            order_stats=True
+        """
+        if self._index is None:
+            raise ValueError("the queue was created without order_stats=True")
+        return self._index
+
+    def count_below(self, priority: int) -> int:
+        """
+        Returns the number of elements whose priority is lower
+        (i.e., better) than the given priority, in O(sqrt(n)) time.
+
+        Raises:
+          ValueError: If the queue was created without
+            order_stats=True
+
+        Returns: Number of elements
+        """
+        return self._order_stats().count_below(priority - self._offset)
+
+    def rank(self, value: str) -> int:
+        """
+        Returns the number of elements whose priority is lower
+        than the priority of a value (so the first element to be
+        dequeued has rank 0, and elements with the same priority
+        have the same rank).
+
+        Args:
+          value: Value in the priority queue
+
+        Raises:
+          ValueError: If `value` does not exist in the priority
+            queue, or if the queue was created without
+            order_stats=True
+
+        Returns: The rank of the value
+        """
+        index = self._order_stats()
+        return index.count_below(index.priority(value))
+
+    def quantile(self, q: float) -> int:
+        """
+        Returns the q-quantile of the priorities, using the
+        nearest-rank method (e.g., quantile(0.95) is the smallest
+        priority such that at least 95% of the elements have
+        that priority or a lower one).
+
+        Args:
+          q: Number between 0 and 1
+
+        Raises:
+          ValueError: If q is not between 0 and 1, if the queue
+            is empty, or if the queue was created without
+            order_stats=True
+
+        Returns: A priority
+        """
+        index = self._order_stats()
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if len(index) == 0:
+            raise ValueError("quantile of an empty priority queue")
+        k = max(1, math.ceil(q * len(index)))
+        return index.at(k - 1)[0] + self._offset
+
+    def range(self, lo: int, hi: int) -> list[tuple[str, int]]:
+        """
+        Returns the elements whose priority is at least lo and
+        lower than hi, without dequeueing them.
+
+        Args:
+          lo: Lowest priority to include
+          hi: Lowest priority to exclude
+
+        Raises:
+          ValueError: If the queue was created without
+            order_stats=True
+
+        Returns: List of (value, priority) pairs, in order of
+        priority (ties are in lexicographical order of value)
+        """
+        offset = self._offset
+        return [(val, prio + offset) for prio, val in
+                self._order_stats().irange(lo - offset, hi - offset)]
+
+    def shift_all(self, delta: int) -> None:
+        """
+        Adds delta to the priority of every element in the queue,
+        in O(1) time (this doesn't change the order in which the
+        elements are dequeued, so the heap is not modified).
+
+        With the "bucket" backend, the priorities stored in the heap
+        are the actual priorities minus the sum of all the shifts,
+        so they must still be non-negative and monotone.
+
+        Args:
+          delta: Number to add to every priority (a negative delta
+            makes every element more urgent)
+
+        Returns: Nothing
+        """
+        self._offset += delta
+
+    def advance_epoch(self, epochs: int = 1) -> None:
+        """
+        Ages the elements in the queue: the priority of every
+        element that is in the queue is lowered by the queue's
+        aging amount for every epoch (the elements enqueued after
+        this call, or whose priority is updated after it, are not
+        affected until the next epoch). Takes O(1) time.
+
+        Args:
+          epochs: Number of epochs that have passed
+
+        Returns: Nothing
+        """
+        self.shift_all(-self._aging * epochs)
+
+    @property
+    def stats(self) -> Optional[HeapStats]:
+        """
+        Returns the instrumentation counters of the heap (or
+        None if the queue doesn't use the "instrumented" backend)
+        """
+        if isinstance(self._mh, InstrumentedMinHeap):
+            return self._mh.stats
+        return None
 
     @property
     def size(self) -> int:
@@ -72,5 +556,7 @@ class PriorityQueue:
     def __str__(self) -> str:
         """
         Returns a string representation of the priority queue
+        (i.e., of its heap, whose priorities don't include the
+        shifts made with shift_all)
         """
         return str(self._mh)
\ No newline at end of file
@@ -1,17 +1,26 @@
+from typing import Iterator
+
+from sortedruns import SortedRuns
+
+
 class PriorityQueue:
     """
-    Priority queue implemented with a list that gets
-    re-sorted every time a new element is inserted
-    (or whenever a priority is updated)
+    Priority queue implemented with a sorted list of
+    (priority, value) pairs. Originally, the list was
+    re-sorted every time a new element was inserted (or
+    whenever a priority was updated). Now it is stored as
+    a SortedRuns, so every operation takes O(sqrt(n)) time
+    or less, and the elements can be read in sorted order
+    without removing them.
     """
 
-    _queue: list[tuple[int, str]]
+    _queue: SortedRuns
 
     def __init__(self):
         """
         Constructor. Creates an empty priority queue.
         """
-        self._queue = []
+        self._queue = SortedRuns()
 
     def enqueue(self, value: str, priority: int) -> None:
         """
@@ -27,11 +36,9 @@ class PriorityQueue:
 
         Returns: Nothing
         """
-        for _, val in self._queue:
-            if val == value:
-                raise ValueError(f"Value is already in queue: {value}")
-        self._queue.append((priority, value))
-        self._queue.sort()
+        if value in self._queue:
+            raise ValueError(f"Value is already in queue: {value}")
+        self._queue.add(priority, value)
 
     def dequeue(self) -> tuple[str, int]:
         """
@@ -44,7 +51,7 @@ class PriorityQueue:
         Returns: Tuple with the highest-priority element
         and its priority.
         """
-        prio, val = self._queue.pop(0)
+        prio, val = self._queue.pop_min()
         return val, prio
 
     def update_priority(self, value: str, new_priority: int) -> None:
@@ -60,21 +67,22 @@ class PriorityQueue:
 
         Returns: Nothing
         """
-        # Find the element to update
-        to_update = None
-        for prio, val in self._queue:
-            if val == value:
-                to_update = (prio, val)
-                break
-
-        # Raise exception if the value is not in the list
-        if to_update is None:
+        if value not in self._queue:
             raise ValueError(f"No such value in queue: {value}")
 
-        # Remove, re-add, and re-sort
-        self._queue.remove((prio, val))
-        self._queue.append((new_priority, value))
-        self._queue.sort()
+        self._queue.remove(value)
+        self._queue.add(new_priority, value)
+
+    def iter_sorted(self) -> Iterator[tuple[str, int]]:
+        """
+        Iterates over the elements in the order in which
+        dequeue would return them, without removing them.
+        The queue must not be modified while iterating.
+
+        Returns: Iterator over (value, priority) pairs
+        """
+        for prio, val in self._queue:
+            yield val, prio
 
     @property
     def size(self) -> int:
@@ -0,0 +1,310 @@
+import itertools
+import math
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from pqueue import PriorityQueue
+from timing_wheel import TimingWheel
+
+
+class Scheduler:
+    """
+    Runs callbacks at given times. The pending timers are kept
+    in a PriorityQueue whose priorities are the deadlines (in
+    nanoseconds, according to the clock), so that rescheduling
+    a timer is just an update_priority. Alternatively, they can
+    be kept in a TimingWheel, which makes adding, cancelling and
+    rescheduling timers take O(1) time, at the cost of rounding
+    every deadline up to a multiple of the wheel's resolution.
+
+    Timers can be added, rescheduled and cancelled from any
+    thread. The callbacks are run by the thread that calls
+    run_pending or run, without holding the scheduler's lock
+    (so a callback can schedule more timers, or reschedule
+    itself). Timers with the same deadline run in the order in
+    which they were scheduled.
+    """
+
+    _clock: Callable[[], float]
+    _lock: threading.Lock
+    _wakeup: threading.Condition
+
+    # Pending timers: exactly one of _pq and _wheel is not None.
+    # With a wheel, the deadlines are in ticks of _resolution_ns
+    # nanoseconds, and otherwise they are in nanoseconds.
+    _pq: Optional[PriorityQueue]
+    _wheel: Optional[TimingWheel]
+    _resolution_ns: int
+
+    # Callback and arguments of every pending timer
+    _callbacks: dict[str, tuple[Callable[..., Any], tuple]]
+    _names: Iterator[int]
+
+    # Deadline (in ns) until which the run loop is sleeping,
+    # if it is sleeping, and whether stop has been called
+    _sleeping_until: Optional[float]
+    _stopped: bool
+
+    def __init__(self, wheel_resolution: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Constructor. Creates a scheduler with no timers.
+
+        Args:
+            wheel_resolution: If not None, the timers are kept in
+              a TimingWheel with ticks of this many seconds (e.g.,
+              0.001), instead of in a PriorityQueue
+            clock: Function that returns the current time, in
+              seconds (all the times given to the scheduler are
+              according to this clock)
+
+        Raises:
+            ValueError: If wheel_resolution is not positive
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._callbacks = {}
+        self._names = itertools.count()
+        self._sleeping_until = None
+        self._stopped = False
+
+        if wheel_resolution is None:
+            self._pq = PriorityQueue("heap", tie_break="fifo")
+            self._wheel = None
+            self._resolution_ns = 1
+        else:
+            if wheel_resolution <= 0:
+                raise ValueError("wheel_resolution must be a positive number")
+            self._pq = None
+            self._resolution_ns = max(1, round(wheel_resolution * 1e9))
+            self._wheel = TimingWheel(self._now_ns() // self._resolution_ns)
+
+    def _now_ns(self) -> int:
+        return round(self._clock() * 1e9)
+
+    def _ticks(self, when: float) -> int:
+        """
+        Returns: Priority in the timer queue of a timer that
+         expires at the given time (with a wheel, the deadline is
+         rounded up, so that the timer never runs early)
+        """
+        ns = round(when * 1e9)
+        if self._wheel is None:
+            return ns
+        return -(-ns // self._resolution_ns)
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of pending timers
+        """
+        return len(self._callbacks)
+
+    def schedule_at(self, when: float, callback: Callable[..., Any], *args,
+                    name: Optional[str] = None) -> str:
+        """
+        Schedules a callback to run at a given time.
+
+        Args:
+            when: Time (according to the scheduler's clock) at
+              which to run the callback
+            callback: Function to call
+            *args: Arguments to pass to the callback
+            name: Name of the timer (if None, a unique name is
+              generated)
+
+        Raises:
+            ValueError: If there is already a pending timer with
+              the given name
+
+        Returns: The name of the timer, which can be passed to
+         reschedule and cancel
+        """
+        if name is None:
+            name = f"timer-{next(self._names)}"
+        deadline = self._ticks(when)
+        with self._lock:
+            if name in self._callbacks:
+                raise ValueError(f"timer '{name}' is already scheduled")
+            if self._wheel is not None:
+                self._wheel.enqueue(name, deadline)
+            else:
+                assert self._pq is not None
+                self._pq.enqueue(name, deadline)
+            self._callbacks[name] = (callback, args)
+            self._notify(deadline)
+        return name
+
+    def schedule_after(self, delay: float, callback: Callable[..., Any],
+                       *args, name: Optional[str] = None) -> str:
+        """
+        Schedules a callback to run after a delay. Takes the
+        same arguments as schedule_at, except for `delay`, which
+        is the number of seconds from now.
+        """
+        return self.schedule_at(self._clock() + delay, callback, *args,
+                                name=name)
+
+    def reschedule(self, name: str, when: float) -> None:
+        """
+        Changes the time at which a pending timer runs.
+
+        Args:
+            name: Name of the timer
+            when: New time at which to run the callback
+
+        Raises:
+            ValueError: If there is no pending timer with that name
+
+        Returns: Nothing
+        """
+        deadline = self._ticks(when)
+        with self._lock:
+            if name not in self._callbacks:
+                raise ValueError(f"timer '{name}' is not scheduled")
+            if self._wheel is not None:
+                self._wheel.update_priority(name, deadline)
+            else:
+                assert self._pq is not None
+                self._pq.update_priority(name, deadline)
+            self._notify(deadline)
+
+    def cancel(self, name: str) -> None:
+        """
+        Cancels a pending timer, so that its callback never runs.
+
+        Args:
+            name: Name of the timer
+
+        Raises:
+            ValueError: If there is no pending timer with that name
+
+        Returns: Nothing
+        """
+        with self._lock:
+            if name not in self._callbacks:
+                raise ValueError(f"timer '{name}' is not scheduled")
+            if self._wheel is not None:
+                self._wheel.cancel(name)
+            else:
+                assert self._pq is not None
+                self._pq.cancel(name)
+            del self._callbacks[name]
+
+    def _notify(self, deadline: int) -> None:
+        """
+        Wakes up the run loop if the given deadline (in the units
+        of the timer queue) is earlier than the time until which
+        it is sleeping (the lock must be held)
+        """
+        if self._sleeping_until is not None and \
+                deadline * self._resolution_ns < self._sleeping_until:
+            self._wakeup.notify()
+
+    def _next_deadline_ns(self) -> Optional[int]:
+        """
+        Returns: The earliest deadline (in nanoseconds) of the
+         pending timers (with a wheel, it may be a lower bound),
+         or None if there are none (the lock must be held)
+        """
+        if self._wheel is not None:
+            deadline = self._wheel.next_deadline()
+        else:
+            assert self._pq is not None
+            first = self._pq.peek(1)
+            deadline = first[0][1] if first else None
+        if deadline is None:
+            return None
+        return deadline * self._resolution_ns
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Returns: The time at which the next timer will run (with
+         a timing wheel, this may be a bit earlier than the actual
+         time), or None if there are no pending timers
+        """
+        with self._lock:
+            deadline = self._next_deadline_ns()
+        return None if deadline is None else deadline / 1e9
+
+    def _pop_due(self) -> list[tuple[Callable[..., Any], tuple]]:
+        """
+        Removes the timers whose deadline has passed
+
+        Returns: Callbacks and arguments of those timers, in
+         the order in which they have to run
+        """
+        now = self._now_ns()
+        with self._lock:
+            if self._wheel is not None:
+                names = [name for name, _ in
+                         self._wheel.advance(now // self._resolution_ns)]
+            else:
+                assert self._pq is not None
+                names = []
+                while True:
+                    first = self._pq.peek(1)
+                    if not first or first[0][1] > now:
+                        break
+                    names.append(self._pq.dequeue()[0])
+            return [self._callbacks.pop(name) for name in names]
+
+    def run_pending(self) -> int:
+        """
+        Runs the callbacks of every timer whose deadline has
+        passed. If a callback raises an exception, the exception
+        is propagated (and the timers that were due after it are
+        not run, and are lost).
+
+        Returns: Number of callbacks that were run
+        """
+        due = self._pop_due()
+        for callback, args in due:
+            callback(*args)
+        return len(due)
+
+    def run(self, until_empty: bool = False) -> None:
+        """
+        Runs the timers as they expire, sleeping until the next
+        deadline in between (the sleep is interrupted if a timer
+        with an earlier deadline is scheduled from another thread,
+        or if stop is called).
+
+        Args:
+            until_empty: If True, returns once there are no
+              pending timers. Otherwise, keeps waiting for new
+              timers until stop is called.
+
+        Returns: Nothing
+        """
+        while True:
+            self.run_pending()
+            with self._lock:
+                if self._stopped:
+                    self._stopped = False
+                    return
+                if until_empty and not self._callbacks:
+                    return
+                deadline = self._next_deadline_ns()
+                if deadline is None:
+                    self._sleeping_until = math.inf
+                    self._wakeup.wait()
+                else:
+                    remaining = deadline - self._now_ns()
+                    if remaining > 0:
+                        self._sleeping_until = deadline
+                        self._wakeup.wait(remaining / 1e9)
+                self._sleeping_until = None
+
+    def stop(self) -> None:
+        """
+        Makes run return (after the callbacks that it is running,
+        if any, have finished). If run is not running, the next
+        call to run returns after running the pending callbacks
+        that are already due.
+        """
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
@@ -0,0 +1,375 @@
+from array import array
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+import random
+import struct
+import zlib
+from typing import Any, Optional
+
+# Layout of a shard's shared memory block: a header with the
+# number of elements in the shard and the number of free value
+# slots, followed by three arrays of `capacity` 64-bit integers
+# (the priorities and value slots of the heap, in heap order,
+# and a stack of free value slots) and by the value slots (each
+# of them a 2-byte length followed by up to value_size bytes)
+_HEADER_INTS = 2
+_LENGTH = struct.Struct("<H")
+
+
+class _Shard:
+    """
+    Binary min heap of (priority, value) pairs stored in a
+    shared memory block, so that any process can use it (while
+    holding the shard's lock). The heap arrays only contain
+    integers: each value is stored once, in a fixed-size slot,
+    and the heap refers to it by the slot's number (its handle).
+    """
+
+    shm: shared_memory.SharedMemory
+    lock: Any
+    capacity: int
+    value_size: int
+
+    # Views of the shared memory block (see the layout above)
+    header: memoryview
+    prios: memoryview
+    handles: memoryview
+    free: memoryview
+    values: memoryview
+
+    def __init__(self, shm: shared_memory.SharedMemory, lock: Any,
+                 capacity: int, value_size: int):
+        self.shm = shm
+        self.lock = lock
+        self.capacity = capacity
+        self.value_size = value_size
+
+        ints = shm.buf[:8 * (_HEADER_INTS + 3 * capacity)].cast("q")
+        self.header = ints[:_HEADER_INTS]
+        self.prios = ints[_HEADER_INTS:_HEADER_INTS + capacity]
+        self.handles = ints[_HEADER_INTS + capacity:_HEADER_INTS + 2 * capacity]
+        self.free = ints[_HEADER_INTS + 2 * capacity:]
+        self.values = shm.buf[8 * (_HEADER_INTS + 3 * capacity):]
+
+    @staticmethod
+    def nbytes(capacity: int, value_size: int) -> int:
+        """
+        Returns: Size of the shared memory block of a shard
+        """
+        return 8 * (_HEADER_INTS + 3 * capacity) + \
+            capacity * (_LENGTH.size + value_size)
+
+    def init(self) -> None:
+        """
+        Initializes the shared memory block of an empty shard
+        """
+        self.header[0] = 0
+        self.header[1] = self.capacity
+        self.free[:] = array("q", range(self.capacity))
+
+    def release(self) -> None:
+        """
+        Releases the views of the shared memory block (which
+        must be done before closing it)
+        """
+        for view in (self.header, self.prios, self.handles, self.free,
+                     self.values):
+            view.release()
+
+    def push(self, priority: int, encoded: bytes) -> None:
+        """
+        Adds an element to the heap (the lock must be held)
+
+        Raises:
+            ValueError: If the shard is full
+        """
+        n = self.header[0]
+        if n == self.capacity:
+            raise ValueError("shard is full")
+        prios, handles = self.prios, self.handles
+
+        # The priority is first written past the end of the heap,
+        # so if it doesn't fit in the array the shard is unchanged
+        prios[n] = priority
+
+        # The value goes in the slot at the top of the free stack
+        # (which is only popped once nothing else can fail)
+        handle = self.free[self.header[1] - 1]
+        start = handle * (_LENGTH.size + self.value_size)
+        _LENGTH.pack_into(self.values, start, len(encoded))
+        self.values[start + _LENGTH.size:start + _LENGTH.size + len(encoded)] = \
+            encoded
+
+        # Hole-based sift up (see MinHeap._sift_up)
+        pos = n
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if prios[parent] <= priority:
+                break
+            prios[pos] = prios[parent]
+            handles[pos] = handles[parent]
+            pos = parent
+        prios[pos] = priority
+        handles[pos] = handle
+        self.header[1] -= 1
+        self.header[0] = n + 1
+
+    def pop(self) -> tuple[str, int]:
+        """
+        Removes the minimum element of the heap (which must not
+        be empty, and the lock must be held)
+
+        Returns: (value, priority) pair
+        """
+        prios, handles = self.prios, self.handles
+        priority, handle = prios[0], handles[0]
+        stride = _LENGTH.size + self.value_size
+        start = handle * stride
+        (length,) = _LENGTH.unpack_from(self.values, start)
+        value = bytes(self.values[start + _LENGTH.size:
+                                  start + _LENGTH.size + length]).decode("utf-8")
+        self.free[self.header[1]] = handle
+        self.header[1] += 1
+
+        # Move the last element to the root, and sift it down
+        n = self.header[0] - 1
+        self.header[0] = n
+        if n > 0:
+            last_prio, last_handle = prios[n], handles[n]
+            pos = 0
+            while True:
+                child = 2 * pos + 1
+                if child >= n:
+                    break
+                if child + 1 < n and prios[child + 1] < prios[child]:
+                    child += 1
+                if prios[child] >= last_prio:
+                    break
+                prios[pos] = prios[child]
+                handles[pos] = handles[child]
+                pos = child
+            prios[pos] = last_prio
+            handles[pos] = last_handle
+        return value, priority
+
+
+class ShardedPriorityQueue:
+    """
+    Priority queue that can be shared by several processes, so
+    that enqueues and dequeues can run in parallel (which is not
+    possible with threads in a single process, because of the GIL).
+
+    The queue is split into shards, each of which is a binary heap
+    stored in its own shared memory block and protected by its own
+    lock. A value is always enqueued in the same shard (chosen by
+    hashing it), so processes that enqueue different values rarely
+    wait for each other.
+
+    dequeue is relaxed, as in a MultiQueue: it looks at the minimum
+    element of a random sample of shards, and dequeues the best of
+    them. So it doesn't always return the element with the highest
+    priority in the whole queue, but one that is close to it. The
+    size of the sample sets the trade-off: sampling every shard
+    always returns the best element (if no other process is
+    modifying the queue at the same time), and sampling fewer
+    shards makes contention less likely.
+
+    Unlike PriorityQueue, the queue doesn't check whether a value
+    is already in the queue, and it doesn't support
+    update_priority. Values must be strings of at most value_size
+    bytes (in UTF-8), and priorities must fit in 64 bits.
+
+    The process that creates the queue must call unlink once no
+    process is using it anymore. The queue can be passed to other
+    processes as an argument of multiprocessing.Process.
+    """
+
+    _shards: list[_Shard]
+    _sample: int
+
+    # Process that created the queue (the only one that can
+    # unlink it, even if other processes were created with fork)
+    _creator: int
+
+    # Random number generator used to pick shards, and the process
+    # that created it (each process needs its own generator, or
+    # processes created with fork would all pick the same shards)
+    _rng: random.Random
+    _pid: int
+
+    def __init__(self, shards: int = 4, capacity: int = 100_000,
+                 value_size: int = 64, sample: Optional[int] = 2,
+                 context: Optional[Any] = None):
+        """
+        Constructor. Creates an empty queue, with a shared memory
+        block for each shard.
+
+        Args:
+            shards: Number of shards
+            capacity: Maximum number of elements in each shard
+            value_size: Maximum length of a value (in bytes)
+            sample: Number of shards that dequeue looks at (if
+              None, it looks at every shard)
+            context: multiprocessing context used to create the
+              locks, which must be the same as the context of the
+              processes that use the queue (if None, the default
+              context)
+
+        Raises:
+            ValueError: If any of the arguments is not positive,
+              or if sample is larger than the number of shards
+        """
+        if shards < 1 or capacity < 1 or value_size < 1:
+            raise ValueError("shards, capacity and value_size must be positive")
+        if value_size >= 1 << (8 * _LENGTH.size):
+            raise ValueError(f"value_size must be less than "
+                             f"{1 << (8 * _LENGTH.size)}")
+        if sample is None:
+            sample = shards
+        if not 1 <= sample <= shards:
+            raise ValueError("sample must be between 1 and the number of shards")
+        self._sample = sample
+        self._creator = os.getpid()
+        if context is None:
+            context = multiprocessing.get_context()
+        self._shards = []
+        for _ in range(shards):
+            shm = shared_memory.SharedMemory(
+                create=True, size=_Shard.nbytes(capacity, value_size))
+            shard = _Shard(shm, context.Lock(), capacity, value_size)
+            shard.init()
+            self._shards.append(shard)
+        self._rng = random.Random()
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Processes created with spawn re-attach to the shared
+        # memory blocks by name (they share the resource tracker
+        # of the process that created the queue, so attaching
+        # doesn't make the blocks be unlinked when they exit)
+        shard = self._shards[0]
+        return {
+            "names": [s.shm.name for s in self._shards],
+            "locks": [s.lock for s in self._shards],
+            "capacity": shard.capacity,
+            "value_size": shard.value_size,
+            "sample": self._sample,
+            "creator": self._creator,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._shards = [_Shard(shared_memory.SharedMemory(name=name), lock,
+                               state["capacity"], state["value_size"])
+                        for name, lock in zip(state["names"], state["locks"])]
+        self._sample = state["sample"]
+        self._creator = state["creator"]
+        self._rng = random.Random()
+        self._pid = os.getpid()
+
+    def enqueue(self, value: str, priority: int) -> None:
+        """
+        Enqueues an element with a priority.
+
+        Args:
+          value: Value to enqueue
+          priority: Priority (lower values mean higher priority)
+
+        Raises:
+          ValueError: If the value is too long, if the priority
+            doesn't fit in 64 bits, or if the value's shard is full
+
+        Returns: Nothing
+        """
+        # The shard must be the same in every process, so we
+        # can't use Python's hash (which is randomized)
+        encoded = value.encode("utf-8")
+        shard = self._shards[zlib.crc32(encoded) % len(self._shards)]
+        if len(encoded) > shard.value_size:
+            raise ValueError(f"value is longer than {shard.value_size} bytes")
+        if not isinstance(priority, int) or not -2**63 <= priority < 2**63:
+            raise ValueError("priorities must be 64-bit integers "
+                             f"(got {priority!r})")
+        with shard.lock:
+            shard.push(priority, encoded)
+
+    def dequeue(self) -> tuple[str, int]:
+        """
+        Dequeues a high-priority element: the one with the highest
+        priority among the first elements of a random sample of
+        shards (see the class docstring).
+
+        Raises:
+          IndexError: If every shard is empty
+
+        Returns: Tuple with the element and its priority.
+        """
+        if self._pid != os.getpid():
+            self._rng = random.Random()
+            self._pid = os.getpid()
+
+        while True:
+            # The heads are read without holding the locks, so
+            # they may change before we lock the best shard (in
+            # which case we just try again)
+            best = None
+            best_prio = 0
+            for shard in self._rng.sample(self._shards, self._sample):
+                if shard.header[0] > 0:
+                    prio = shard.prios[0]
+                    if best is None or prio < best_prio:
+                        best, best_prio = shard, prio
+
+            if best is None:
+                # Every sampled shard is empty, but the others
+                # may not be
+                best = next((shard for shard in self._shards
+                             if shard.header[0] > 0), None)
+                if best is None:
+                    raise IndexError("dequeue from an empty priority queue")
+
+            with best.lock:
+                if best.header[0] > 0:
+                    return best.pop()
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of elements in the queue (which may
+        have changed by the time the caller uses it)
+        """
+        return sum(shard.header[0] for shard in self._shards)
+
+    def close(self) -> None:
+        """
+        Detaches this process from the queue's shared memory.
+        The queue can't be used after calling this method.
+        """
+        for shard in self._shards:
+            shard.release()
+            shard.shm.close()
+
+    def unlink(self) -> None:
+        """
+        Closes the queue and frees its shared memory (only the
+        process that created the queue can do this, once no
+        other process is using it)
+
+        Raises:
+          ValueError: If this process didn't create the queue
+        """
+        if os.getpid() != self._creator:
+            raise ValueError("only the process that created the queue "
+                             "can unlink it")
+        self.close()
+        for shard in self._shards:
+            shard.shm.unlink()
+
+    def __enter__(self) -> "ShardedPriorityQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if os.getpid() == self._creator:
+            self.unlink()
+        else:
+            self.close()
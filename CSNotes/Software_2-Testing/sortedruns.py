@@ -0,0 +1,265 @@
+import bisect
+import math
+from typing import Iterator, Optional
+
+# Runs are split once they are longer than twice the load,
+# where the load is the square root of the number of elements
+# (but at least _MIN_LOAD, so small lists have a single run),
+# and merged with a neighbour once they are shorter than half
+# the load, so there are always O(sqrt(n)) runs
+_MIN_LOAD = 64
+
+
+class SortedRuns:
+    """
+    Sorted list of (priority, item) pairs, stored as a list of
+    sorted "runs" of about sqrt(n) elements each. Every item can
+    only appear once.
+
+    To insert or remove a pair, we find its run by binary search
+    over the last pair of each run, and then insert it into (or
+    remove it from) that run, which moves O(sqrt(n)) elements.
+    The first run is consumed from the front by advancing an
+    offset, so removing the minimum takes O(1) amortized time.
+    A dictionary maps each item to its priority, so finding an
+    item takes O(1) time.
+    """
+
+    # Sorted runs, such that every pair in a run is smaller than
+    # every pair in the next run, and the last pair of each run
+    _runs: list[list[tuple[int, str]]]
+    _maxes: list[tuple[int, str]]
+
+    # The pairs in _runs[0][:_head] have already been removed
+    _head: int
+
+    # Priority of each item
+    _prio_of: dict[str, int]
+
+    def __init__(self):
+        """
+        Constructor. Creates an empty list.
+        """
+        self._runs = []
+        self._maxes = []
+        self._head = 0
+        self._prio_of = {}
+
+    def __len__(self) -> int:
+        return len(self._prio_of)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._prio_of
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        """
+        Returns: Iterator over the (priority, item) pairs, in
+         order (the list must not be modified while iterating)
+        """
+        for i, run in enumerate(self._runs):
+            yield from (run[self._head:] if i == 0 else run)
+
+    def priority(self, item: str) -> int:
+        """
+        Returns: The priority of an item
+
+        Raises:
+            ValueError: If the item is not in the list
+        """
+        prio = self._prio_of.get(item)
+        if prio is None:
+            raise ValueError(f"item '{item}' not in sorted runs")
+        return prio
+
+    def _trim_head(self) -> None:
+        """
+        Deletes the removed pairs from the front of the first
+        run (before modifying it in any other way)
+        """
+        if self._head:
+            del self._runs[0][:self._head]
+            self._head = 0
+
+    def add(self, priority: int, item: str) -> None:
+        """
+        Inserts a (priority, item) pair.
+
+        Raises:
+            ValueError: If the item is already in the list
+
+        Returns: Nothing
+        """
+        if item in self._prio_of:
+            raise ValueError(f"item '{item}' already in sorted runs")
+        self._prio_of[item] = priority
+        pair = (priority, item)
+
+        if not self._runs:
+            self._runs.append([pair])
+            self._maxes.append(pair)
+            return
+
+        i = bisect.bisect_left(self._maxes, pair)
+        if i == len(self._runs):
+            # Larger than everything: append it to the last run
+            i -= 1
+            self._maxes[i] = pair
+        if i == 0:
+            self._trim_head()
+        run = self._runs[i]
+        bisect.insort(run, pair)
+        self._split(i)
+
+    def _load(self) -> int:
+        """
+        Returns: Target length of a run
+        """
+        return max(_MIN_LOAD, math.isqrt(len(self._prio_of)))
+
+    def _split(self, i: int) -> None:
+        """
+        Splits the i-th run in two halves if it is too long
+        (the run must not have removed pairs at its front)
+        """
+        run = self._runs[i]
+        if len(run) > 2 * self._load():
+            half = len(run) // 2
+            self._runs.insert(i + 1, run[half:])
+            del run[half:]
+            self._maxes.insert(i, run[-1])
+
+    def _merge(self, i: int) -> None:
+        """
+        Merges the i-th run with one of its neighbours if it is
+        too short (and splits the merged run again if it ends up
+        too long). Each merge moves O(sqrt(n)) pairs, and happens
+        after at least O(sqrt(n)) removals from the run.
+        """
+        run = self._runs[i]
+        if len(self._runs) == 1 or \
+                len(run) - (self._head if i == 0 else 0) >= self._load() // 2:
+            return
+
+        # Merge runs j and j + 1
+        j = i if i + 1 < len(self._runs) else i - 1
+        if j == 0:
+            self._trim_head()
+        self._runs[j] += self._runs[j + 1]
+        self._maxes[j] = self._maxes[j + 1]
+        del self._runs[j + 1]
+        del self._maxes[j + 1]
+        self._split(j)
+
+    def remove(self, item: str) -> int:
+        """
+        Removes an item.
+
+        Raises:
+            ValueError: If the item is not in the list
+
+        Returns: The priority that the item had
+        """
+        priority = self.priority(item)
+        del self._prio_of[item]
+        pair = (priority, item)
+
+        i = bisect.bisect_left(self._maxes, pair)
+        if i == 0:
+            self._trim_head()
+        run = self._runs[i]
+        del run[bisect.bisect_left(run, pair)]
+        if not run:
+            del self._runs[i]
+            del self._maxes[i]
+        else:
+            if self._maxes[i] == pair:
+                self._maxes[i] = run[-1]
+            self._merge(i)
+        return priority
+
+    def min(self) -> Optional[tuple[int, str]]:
+        """
+        Returns: The smallest (priority, item) pair, or None
+         if the list is empty
+        """
+        if not self._runs:
+            return None
+        return self._runs[0][self._head]
+
+    def pop_min(self) -> tuple[int, str]:
+        """
+        Removes the smallest (priority, item) pair.
+
+        Raises:
+            IndexError: If the list is empty
+
+        Returns: The (priority, item) pair
+        """
+        if not self._runs:
+            raise IndexError("pop from empty sorted runs")
+        first = self._runs[0]
+        pair = first[self._head]
+        self._head += 1
+        if self._head == len(first):
+            # Deleting the run takes O(sqrt(n)) time, but it
+            # only happens once every O(sqrt(n)) pops
+            del self._runs[0]
+            del self._maxes[0]
+            self._head = 0
+        del self._prio_of[pair[1]]
+        return pair
+
+    def _position(self, pair: tuple[int, str]) -> int:
+        """
+        Returns: Number of pairs in the list that are smaller
+         than the given pair (which doesn't have to be in the
+         list). Takes O(sqrt(n)) time.
+        """
+        i = bisect.bisect_left(self._maxes, pair)
+        before = sum(len(run) for run in self._runs[:i]) - self._head
+        if i == len(self._runs):
+            return before
+        lo = self._head if i == 0 else 0
+        return before + bisect.bisect_left(self._runs[i], pair, lo)
+
+    def count_below(self, priority: int) -> int:
+        """
+        Returns: Number of pairs whose priority is lower than
+         the given priority
+        """
+        # Every item is a string, so (priority, "") is smaller
+        # than every pair with that priority
+        return self._position((priority, ""))
+
+    def at(self, k: int) -> tuple[int, str]:
+        """
+        Returns: The k-th smallest pair (starting from 0)
+
+        Raises:
+            IndexError: If k is not between 0 and len - 1
+        """
+        if not 0 <= k < len(self):
+            raise IndexError("sorted runs index out of range")
+        k += self._head
+        for run in self._runs:
+            if k < len(run):
+                return run[k]
+            k -= len(run)
+        raise AssertionError("run lengths don't add up")
+
+    def irange(self, lo: int, hi: int) -> Iterator[tuple[int, str]]:
+        """
+        Returns: Iterator over the pairs whose priority is at
+         least lo and lower than hi, in order (the list must not
+         be modified while iterating)
+        """
+        start = (lo, "")
+        i = bisect.bisect_left(self._maxes, start)
+        for j in range(i, len(self._runs)):
+            run = self._runs[j]
+            k = bisect.bisect_left(run, start, self._head if j == 0 else 0)
+            while k < len(run):
+                if run[k][0] >= hi:
+                    return
+                yield run[k]
+                k += 1
@@ -0,0 +1,122 @@
+import asyncio
+
+from async_pqueue import AsyncPriorityQueue
+import pytest
+
+# These tests don't require any pytest plugins: each test
+# defines a coroutine and runs it with asyncio.run
+
+
+def test_put_get() -> None:
+    async def main() -> None:
+        q = AsyncPriorityQueue()
+
+        await q.put("abc", 100)
+        await q.put("def", 50)
+        q.put_nowait("ghi", 20)
+        q.update_priority("abc", 10)
+
+        assert q.size == 3
+        assert await q.get() == ("abc", 10)
+        assert await q.get() == ("ghi", 20)
+        assert q.get_nowait() == ("def", 50)
+        assert q.empty()
+
+    asyncio.run(main())
+
+
+def test_put_repeated() -> None:
+    async def main() -> None:
+        q = AsyncPriorityQueue()
+
+        await q.put("abc", 20)
+        with pytest.raises(ValueError):
+            await q.put("abc", 50)
+
+    asyncio.run(main())
+
+
+def test_get_nowait_empty() -> None:
+    q = AsyncPriorityQueue()
+
+    with pytest.raises(asyncio.QueueEmpty):
+        q.get_nowait()
+
+
+def test_get_waits() -> None:
+    async def main() -> None:
+        q = AsyncPriorityQueue()
+
+        getter = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+
+        await q.put("abc", 20)
+        assert await getter == ("abc", 20)
+
+    asyncio.run(main())
+
+
+def test_put_waits_when_full() -> None:
+    async def main() -> None:
+        q = AsyncPriorityQueue(maxsize=1)
+
+        await q.put("abc", 20)
+        assert q.full()
+        with pytest.raises(asyncio.QueueFull):
+            q.put_nowait("def", 10)
+
+        putter = asyncio.create_task(q.put("def", 10))
+        await asyncio.sleep(0)
+        assert not putter.done()
+
+        assert await q.get() == ("abc", 20)
+        await putter
+        assert await q.get() == ("def", 10)
+
+    asyncio.run(main())
+
+
+def test_cancelled_getter() -> None:
+    """
+    Checks that cancelling a waiting getter doesn't prevent
+    other getters from receiving elements.
+    """
+    async def main() -> None:
+        q = AsyncPriorityQueue()
+
+        getter1 = asyncio.create_task(q.get())
+        getter2 = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        getter1.cancel()
+        await q.put("abc", 20)
+
+        assert await getter2 == ("abc", 20)
+        assert getter1.cancelled()
+
+    asyncio.run(main())
+
+
+def test_join() -> None:
+    async def main() -> None:
+        q = AsyncPriorityQueue()
+        processed = []
+
+        async def worker() -> None:
+            while True:
+                val, _ = await q.get()
+                processed.append(val)
+                q.task_done()
+
+        for i in range(10):
+            await q.put(f"item{i}", i)
+        workers = [asyncio.create_task(worker()) for _ in range(3)]
+        await asyncio.wait_for(q.join(), timeout=5)
+        for w in workers:
+            w.cancel()
+
+        assert sorted(processed) == sorted(f"item{i}" for i in range(10))
+        with pytest.raises(ValueError):
+            q.task_done()
+
+    asyncio.run(main())
@@ -0,0 +1,212 @@
+import random
+
+from bucket_queue import BucketQueue
+from minheap import MinHeap
+import pytest
+
+#
+# BLACK-BOX TESTS
+#
+
+
+def test_init() -> None:
+    bq = BucketQueue()
+
+    assert bq.size == 0
+    assert bq.empty
+    assert bq.min() is None
+    assert bq.remove_min() is None
+
+
+def test_remove_min_repeated() -> None:
+    bq = BucketQueue()
+
+    items = [(30, "abc"), (20, "mno"), (20, "def"), (10, "jkl"), (75, "ghi")]
+    for prio, val in items:
+        bq.insert(prio, val)
+
+    for expected in sorted(items):
+        assert bq.min() == expected
+        assert bq.remove_min() == expected
+
+    assert bq.empty
+
+
+def test_invalid_priority() -> None:
+    bq = BucketQueue()
+
+    with pytest.raises(ValueError):
+        bq.insert(-1, "abc")
+    with pytest.raises(ValueError):
+        bq.insert(2.5, "abc")  # type: ignore
+
+    assert bq.empty
+
+
+def test_priority_below_last_removed() -> None:
+    bq = BucketQueue()
+
+    bq.insert(10, "abc")
+    bq.insert(20, "def")
+    assert bq.remove_min() == (10, "abc")
+
+    # Priorities can be equal to the last removed priority,
+    # but not lower than it
+    bq.insert(10, "ghi")
+    with pytest.raises(ValueError):
+        bq.insert(9, "jkl")
+    with pytest.raises(ValueError):
+        bq.change_priority("def", 5)
+
+    bq.change_priority("def", 10)
+    assert bq.remove_min_many(2) == [(10, "def"), (10, "ghi")]
+
+
+def test_change_priority_same_bucket() -> None:
+    bq = BucketQueue()
+
+    bq.insert(5, "abc")
+    bq.insert(5, "def")
+    bq.insert(7, "ghi")
+    assert bq.min() == (5, "abc")
+
+    # "abc" is in bucket 0 (its priority is the current minimum)
+    bq.change_priority("abc", 6)
+    assert bq.remove_min_many(3) == [(5, "def"), (6, "abc"), (7, "ghi")]
+
+#
+# WHITE-BOX TESTS
+#
+
+
+def test_same_order_as_minheap() -> None:
+    """
+    Performs the same random sequence of (monotone) operations
+    on a MinHeap and a BucketQueue, with priorities spread over
+    many buckets, and checks that both return the same elements.
+    """
+
+    rng = random.Random(2)
+    mh = MinHeap()
+    bq = BucketQueue()
+    live: list[str] = []
+    last = 0
+
+    for i in range(3000):
+        op = rng.random()
+        if op < 0.45 or not live:
+            item = f"item{i}"
+            prio = last + rng.randrange(1 << rng.randrange(12))
+            mh.insert(prio, item)
+            bq.insert(prio, item)
+            live.append(item)
+        elif op < 0.8:
+            item = rng.choice(live)
+            prio = last + rng.randrange(1 << rng.randrange(12))
+            mh.change_priority(item, prio)
+            bq.change_priority(item, prio)
+        else:
+            rv = mh.remove_min()
+            assert rv is not None
+            assert bq.remove_min() == rv
+            live.remove(rv[1])
+            last = rv[0]
+
+        assert bq.size == mh.size
+        assert bq.min() == mh.min()
+
+
+def test_remove_from_bucket0() -> None:
+    """
+    Removes items from bucket 0 (the items with the current
+    minimum priority), and adds some of them back, with both
+    remove and change_priority, and checks that the queue stays
+    consistent with a MinHeap and that the stale entries of
+    bucket 0 don't pile up.
+    """
+    rng = random.Random(6)
+    mh = MinHeap()
+    bq = BucketQueue()
+    names = [f"item{i}" for i in range(200)]
+    for name in names:
+        mh.insert(10, name)
+        bq.insert(10, name)
+    rv = mh.remove_min()
+    assert bq.remove_min() == rv
+
+    for _ in range(5000):
+        name = rng.choice(names)
+        op = rng.random()
+        if name not in bq._prio_of_item:
+            mh.insert(10, name)
+            bq.insert(10, name)
+        elif op < 0.4:
+            assert bq.remove(name) == mh.remove(name)
+        elif op < 0.8:
+            prio = rng.choice((10, 11, 20))
+            mh.change_priority(name, prio)
+            bq.change_priority(name, prio)
+        else:
+            mh.change_priority(name, 10)
+            bq.change_priority(name, 10)
+
+        assert bq.size == mh.size
+        assert bq.min() == mh.min()
+        assert len(bq._buckets[0]) <= 2 * bq._size0 + 1
+
+    assert list(bq.iter_sorted()) == list(mh.iter_sorted())
+    assert bq.remove_min_many(bq.size) == mh.remove_min_many(mh.size)
+
+
+def test_iter_sorted() -> None:
+    rng = random.Random(16)
+    items = [(rng.randrange(50), f"item{i}") for i in range(300)]
+    h = BucketQueue.from_items(items)
+
+    assert h.peek(0) == []
+    top = h.peek(10)
+    everything = list(h.iter_sorted())
+
+    assert top == everything[:10]
+    assert everything == sorted(items)
+    assert everything == h.remove_min_many(300)
+
+
+@pytest.mark.parametrize("sizes", [(100, 5), (5, 100), (0, 10), (10, 0)])
+def test_meld(sizes: tuple[int, int]) -> None:
+    rng = random.Random(19)
+    a_items = [(rng.randrange(50), f"a{i}") for i in range(sizes[0])]
+    b_items = [(rng.randrange(50), f"b{i}") for i in range(sizes[1])]
+    a = BucketQueue.from_items(a_items)
+    b = BucketQueue.from_items(b_items)
+
+    a.meld(b)
+
+    assert b.empty
+    assert a.size == sizes[0] + sizes[1]
+    assert a.remove_min_many(a.size) == sorted(a_items + b_items)
+
+    b.insert(1, "abc")
+    assert b.min() == (1, "abc")
+
+
+def test_meld_duplicates() -> None:
+    a = BucketQueue.from_items([(1, "abc"), (2, "def")])
+    b = BucketQueue.from_items([(3, "ghi"), (4, "def")])
+
+    with pytest.raises(ValueError):
+        a.meld(b)
+    with pytest.raises(ValueError):
+        a.meld(a)
+    assert a.size == 2
+    assert b.size == 2
+
+
+def test_meld_lower_priority() -> None:
+    a = BucketQueue.from_items([(10, "abc"), (20, "def")])
+    a.remove_min()
+    b = BucketQueue.from_items([(5, "ghi")])
+
+    with pytest.raises(ValueError):
+        a.meld(b)
+    assert b.size == 1
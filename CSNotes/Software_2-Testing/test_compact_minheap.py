@@ -0,0 +1,245 @@
+import random
+
+from compact_minheap import CompactMinHeap
+from minheap import MinHeap
+import pytest
+
+#
+# BLACK-BOX TESTS
+#
+# CompactMinHeap has the same interface as MinHeap, so these
+# tests mirror the ones in test_minheap.py
+#
+
+
+def test_init() -> None:
+    mh = CompactMinHeap()
+
+    assert mh.size == 0
+    assert mh.empty
+    assert mh.min() is None
+    assert mh.remove_min() is None
+
+
+def test_insert_repeated() -> None:
+    mh = CompactMinHeap()
+
+    mh.insert(20, "abc")
+
+    with pytest.raises(ValueError):
+        mh.insert(40, "abc")
+
+
+def test_remove_min_repeated() -> None:
+    mh = CompactMinHeap()
+
+    items = [(30, "abc"), (20, "mno"), (20, "def"), (10, "jkl"), (75, "ghi")]
+    for prio, val in items:
+        mh.insert(prio, val)
+
+    assert mh.min() == (10, "jkl")
+    for expected in sorted(items):
+        assert mh.remove_min() == expected
+
+    assert mh.empty
+
+
+def test_change_priority_multiple() -> None:
+    mh = CompactMinHeap()
+
+    mh.insert(100, "abc")
+    mh.insert(50, "def")
+    mh.insert(20, "ghi")
+    mh.insert(75, "jkl")
+    mh.change_priority("jkl", 30)
+    mh.change_priority("ghi", 200)
+
+    assert mh.remove_min() == (30, "jkl")
+    assert mh.remove_min() == (50, "def")
+    assert mh.remove_min() == (100, "abc")
+    assert mh.remove_min() == (200, "ghi")
+
+
+def test_change_priority_nonexistent() -> None:
+    mh = CompactMinHeap()
+
+    mh.insert(20, "abc")
+
+    with pytest.raises(ValueError):
+        mh.change_priority("def", 10)
+
+
+def test_reinsert_after_remove() -> None:
+    mh = CompactMinHeap()
+
+    mh.insert(20, "abc")
+    mh.remove_min()
+    mh.insert(10, "abc")
+
+    assert mh.min() == (10, "abc")
+
+
+@pytest.mark.parametrize("priority", [2**63, -2**63 - 1, "abc", 1.5])
+def test_invalid_priority(priority) -> None:
+    """
+    A priority that doesn't fit in the priority array is
+    rejected without modifying the heap (in particular, the item
+    doesn't get a handle, so it can be inserted later).
+    """
+    mh = CompactMinHeap()
+    mh.insert(30, "def")
+    h = mh.insert(20, "abc")
+    mh.remove("abc")  # Leaves a free handle
+
+    with pytest.raises(ValueError):
+        mh.insert(priority, "abc")
+    with pytest.raises(ValueError):
+        mh.insert_many([(10, "ghi"), (priority, "abc")])
+    with pytest.raises(ValueError):
+        mh.change_priority("def", priority)
+    with pytest.raises(ValueError):
+        CompactMinHeap.from_items([(10, "ghi"), (priority, "abc")])
+
+    assert mh.size == 1
+    assert "abc" not in mh._handle_of_item
+    assert mh.insert(10, "abc") == h
+    assert mh.remove_min_many(3) == [(10, "abc"), (30, "def")]
+
+#
+# WHITE-BOX TESTS
+#
+
+
+def test_same_order_as_minheap() -> None:
+    """
+    Performs the same random sequence of operations on a
+    MinHeap and a CompactMinHeap and checks that both return
+    the same elements, and that handles are being reused.
+    """
+
+    rng = random.Random(0)
+    mh = MinHeap()
+    cmh = CompactMinHeap()
+    live: list[str] = []
+
+    for i in range(2000):
+        op = rng.random()
+        if op < 0.5 or not live:
+            item = f"item{i}"
+            prio = rng.randrange(100)
+            mh.insert(prio, item)
+            cmh.insert(prio, item)
+            live.append(item)
+        elif op < 0.8:
+            item = rng.choice(live)
+            prio = rng.randrange(100)
+            mh.change_priority(item, prio)
+            cmh.change_priority(item, prio)
+        else:
+            rv = mh.remove_min()
+            assert rv is not None
+            assert cmh.remove_min() == rv
+            live.remove(rv[1])
+
+        assert cmh.size == mh.size
+        assert cmh.min() == mh.min()
+
+    assert len(cmh._items) < 2000
+    for item, handle in cmh._handle_of_item.items():
+        assert cmh._items[handle] == item
+        assert cmh._handle[cmh._pos[handle]] == handle
+
+
+def test_iter_sorted() -> None:
+    rng = random.Random(16)
+    items = [(rng.randrange(50), f"item{i}") for i in range(300)]
+    h = CompactMinHeap.from_items(items)
+
+    assert h.peek(0) == []
+    top = h.peek(10)
+    everything = list(h.iter_sorted())
+
+    assert top == everything[:10]
+    assert everything == sorted(items)
+    assert everything == h.remove_min_many(300)
+
+
+def test_handles() -> None:
+    mh = CompactMinHeap()
+    h_abc = mh.insert(20, "abc")
+    h_def = mh.insert(10, "def")
+    h_ghi = mh.insert(30, "ghi")
+
+    assert len({h_abc, h_def, h_ghi}) == 3
+    assert mh.handle_of("def") == h_def
+
+    mh.change_priority_by_handle(h_ghi, 5)
+    assert mh.min() == (5, "ghi")
+    assert mh.remove_by_handle(h_def) == (10, "def")
+    assert mh.size == 2
+
+    # The handle of a removed element is no longer valid
+    with pytest.raises(ValueError):
+        mh.change_priority_by_handle(h_def, 1)
+    with pytest.raises(ValueError):
+        mh.remove_by_handle(h_def)
+    with pytest.raises(ValueError):
+        mh.remove_by_handle(100)
+    with pytest.raises(ValueError):
+        mh.handle_of("def")
+
+    assert mh.remove_min_many(2) == [(5, "ghi"), (20, "abc")]
+
+
+def test_handles_random_operations() -> None:
+    rng = random.Random(17)
+    mh = CompactMinHeap()
+    reference = MinHeap()
+    handles = {}
+
+    for i in range(500):
+        op = rng.random()
+        if op < 0.5 or mh.empty:
+            prio = rng.randrange(100)
+            handles[f"item{i}"] = mh.insert(prio, f"item{i}")
+            reference.insert(prio, f"item{i}")
+        elif op < 0.8:
+            item = rng.choice(sorted(handles))
+            prio = rng.randrange(100)
+            mh.change_priority_by_handle(handles[item], prio)
+            reference.change_priority(item, prio)
+        else:
+            item = rng.choice(sorted(handles))
+            assert mh.remove_by_handle(handles.pop(item)) == \
+                reference.remove(item)
+        assert mh.min() == reference.min()
+
+
+@pytest.mark.parametrize("sizes", [(100, 5), (5, 100), (0, 10), (10, 0)])
+def test_meld(sizes: tuple[int, int]) -> None:
+    rng = random.Random(19)
+    a_items = [(rng.randrange(50), f"a{i}") for i in range(sizes[0])]
+    b_items = [(rng.randrange(50), f"b{i}") for i in range(sizes[1])]
+    a = CompactMinHeap.from_items(a_items)
+    b = CompactMinHeap.from_items(b_items)
+
+    a.meld(b)
+
+    assert b.empty
+    assert a.size == sizes[0] + sizes[1]
+    assert a.remove_min_many(a.size) == sorted(a_items + b_items)
+
+    b.insert(1, "abc")
+    assert b.min() == (1, "abc")
+
+
+def test_meld_duplicates() -> None:
+    a = CompactMinHeap.from_items([(1, "abc"), (2, "def")])
+    b = CompactMinHeap.from_items([(3, "ghi"), (4, "def")])
+
+    with pytest.raises(ValueError):
+        a.meld(b)
+    with pytest.raises(ValueError):
+        a.meld(a)
+    assert a.size == 2
+    assert b.size == 2
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from concurrent_pqueue import ConcurrentPriorityQueue, Empty, Full
+import pytest
+
+
+def test_enqueue_dequeue() -> None:
+    q = ConcurrentPriorityQueue()
+
+    q.enqueue("abc", priority=100)
+    q.enqueue("def", priority=50)
+    q.enqueue("ghi", priority=20)
+    q.update_priority("abc", new_priority=10)
+
+    assert q.size == 3
+    assert q.dequeue() == ("abc", 10)
+    assert q.dequeue_many(5) == [("ghi", 20), ("def", 50)]
+    assert q.size == 0
+
+
+def test_enqueue_repeated() -> None:
+    q = ConcurrentPriorityQueue()
+
+    q.enqueue("abc", priority=20)
+
+    with pytest.raises(ValueError):
+        q.enqueue("abc", priority=50)
+
+
+def test_invalid_element() -> None:
+    """
+    Invalid elements are rejected before taking the lock, so
+    they don't count as lock acquisitions.
+    """
+    q = ConcurrentPriorityQueue()
+    q.enqueue("abc", priority=20)
+    acquisitions = q.lock_acquisitions
+
+    with pytest.raises(ValueError):
+        q.enqueue("def", priority=1.5)  # type: ignore
+    with pytest.raises(ValueError):
+        q.enqueue(3, priority=10)  # type: ignore
+    with pytest.raises(ValueError):
+        q.update_priority("abc", new_priority="10")  # type: ignore
+
+    assert q.lock_acquisitions == acquisitions
+    assert q.dequeue() == ("abc", 20)
+
+
+def test_dequeue_empty() -> None:
+    q = ConcurrentPriorityQueue()
+
+    with pytest.raises(Empty):
+        q.dequeue(block=False)
+    with pytest.raises(Empty):
+        q.dequeue(timeout=0.01)
+    with pytest.raises(ValueError):
+        q.dequeue(timeout=-1)
+
+
+def test_enqueue_full() -> None:
+    q = ConcurrentPriorityQueue(maxsize=2)
+
+    q.enqueue("abc", priority=20)
+    q.enqueue("def", priority=30)
+
+    with pytest.raises(Full):
+        q.enqueue("ghi", priority=10, block=False)
+    with pytest.raises(Full):
+        q.enqueue("ghi", priority=10, timeout=0.01)
+    assert q.size == 2
+
+
+def test_blocking_dequeue() -> None:
+    """
+    Checks that a consumer waiting on an empty queue is woken
+    up when a producer enqueues an element.
+    """
+    q = ConcurrentPriorityQueue()
+    results = []
+
+    consumer = threading.Thread(target=lambda: results.append(q.dequeue(timeout=5)))
+    consumer.start()
+    time.sleep(0.05)
+    q.enqueue("abc", priority=20)
+    consumer.join()
+
+    assert results == [("abc", 20)]
+
+
+def test_blocking_enqueue() -> None:
+    """
+    Checks that a producer waiting on a full queue is woken
+    up when a consumer dequeues an element.
+    """
+    q = ConcurrentPriorityQueue(maxsize=1)
+    q.enqueue("abc", priority=20)
+
+    producer = threading.Thread(target=lambda: q.enqueue("def", 10, timeout=5))
+    producer.start()
+    time.sleep(0.05)
+    assert q.dequeue() == ("abc", 20)
+    producer.join()
+
+    assert q.dequeue() == ("def", 10)
+
+
+def test_multiple_producers_consumers() -> None:
+    """
+    Checks that every element enqueued by several producers is
+    dequeued exactly once by several consumers.
+    """
+    q = ConcurrentPriorityQueue(maxsize=50)
+    n_producers, n_items = 4, 500
+    results: list[tuple[str, int]] = []
+    results_lock = threading.Lock()
+
+    def produce(p: int) -> None:
+        for i in range(n_items):
+            q.enqueue(f"{p}-{i}", priority=i)
+
+    def consume() -> None:
+        while True:
+            try:
+                elem = q.dequeue(timeout=0.5)
+            except Empty:
+                return
+            with results_lock:
+                results.append(elem)
+
+    threads = [threading.Thread(target=produce, args=(p,))
+               for p in range(n_producers)]
+    threads += [threading.Thread(target=consume) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == n_producers * n_items
+    assert {val for val, _ in results} == \
+        {f"{p}-{i}" for p in range(n_producers) for i in range(n_items)}
+    assert q.lock_acquisitions >= 2 * n_producers * n_items
@@ -0,0 +1,81 @@
+from instrumented_minheap import InstrumentedMinHeap
+from minheap import MinHeap
+import pytest
+
+
+def test_init() -> None:
+    mh = InstrumentedMinHeap()
+
+    assert mh.empty
+    assert mh.stats.comparisons == 0
+    assert mh.stats.swaps == 0
+    assert mh.stats.calls["insert"] == 0
+    assert mh.stats.mean_latency_ns("insert") == 0.0
+
+
+def test_same_results_as_minheap() -> None:
+    items = [(1, "A"), (4, "B"), (8, "C"), (18, "D"), (8, "E"),
+             (99, "F"), (12, "G"), (21, "H")]
+    mh = MinHeap(arity=3)
+    imh = InstrumentedMinHeap(arity=3)
+    for prio, item in items:
+        mh.insert(prio, item)
+        imh.insert(prio, item)
+
+    mh.change_priority("F", 0)
+    imh.change_priority("F", 0)
+    assert [imh.remove_min() for _ in range(8)] == \
+        [mh.remove_min() for _ in range(8)]
+
+
+def test_counters() -> None:
+    mh = InstrumentedMinHeap(initial_capacity=2)
+
+    # Inserting in decreasing order sifts every element
+    # all the way up to the root
+    for i in range(7, 0, -1):
+        mh.insert(i, f"item{i}")
+
+    stats = mh.stats
+    assert stats.calls["insert"] == 7
+    assert stats.sift_up_depths == {0: 1, 1: 2, 2: 4}
+    assert stats.swaps == 10
+    assert stats.comparisons == 10
+    assert stats.regrowths == 1
+    assert sum(stats.latencies["insert"].values()) == 7
+    assert stats.mean_latency_ns("insert") > 0
+
+    mh.remove_min()
+    mh.change_priority("item7", 0)
+    assert stats.calls["remove_min"] == 1
+    assert stats.calls["change_priority"] == 1
+    assert sum(stats.sift_down_depths.values()) == 1
+
+    assert stats.as_dict()["calls"] == {"insert": 7, "remove_min": 1,
+                                        "change_priority": 1}
+    stats.reset()
+    assert stats.swaps == 0
+    assert stats.calls["insert"] == 0
+
+
+def test_from_items_counts_comparisons() -> None:
+    mh = InstrumentedMinHeap.from_items([(i, f"item{i}")
+                                         for i in range(100, 0, -1)])
+
+    assert mh.stats.comparisons > 0
+    assert mh.stats.swaps == 0
+    assert mh.min() == (1, "item1")
+
+
+def test_errors_are_not_counted() -> None:
+    mh = InstrumentedMinHeap()
+    mh.insert(1, "abc")
+
+    with pytest.raises(ValueError):
+        mh.insert(2, "abc")
+    assert mh.stats.calls["insert"] == 1
+
+
+def test_engine() -> None:
+    with pytest.raises(ValueError):
+        InstrumentedMinHeap(engine="hole")
@@ -0,0 +1,75 @@
+import heapq
+import random
+
+from kmerge import merge_sorted
+
+
+def test_no_iterables() -> None:
+    assert list(merge_sorted()) == []
+
+
+def test_empty_iterables() -> None:
+    assert list(merge_sorted([], [], [])) == []
+    assert list(merge_sorted([], [1, 2], [])) == [1, 2]
+
+
+def test_merge() -> None:
+    assert list(merge_sorted([1, 4, 7], [2, 5, 8], [3, 6, 9])) == \
+        [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_uneven_lengths() -> None:
+    assert list(merge_sorted([5], [1, 2, 3, 4, 6, 7], [0, 8])) == \
+        [0, 1, 2, 3, 4, 5, 6, 7, 8]
+
+
+def test_key() -> None:
+    logs_a = [("2024-01-01", "a1"), ("2024-01-03", "a2")]
+    logs_b = [("2024-01-02", "b1"), ("2024-01-04", "b2")]
+
+    merged = merge_sorted(logs_a, logs_b, key=lambda line: line[0])
+    assert [name for _, name in merged] == ["a1", "b1", "a2", "b2"]
+
+
+def test_ties_are_stable() -> None:
+    """
+    Elements with the same priority come out in the order of
+    their iterables, and in their original order within each
+    iterable.
+    """
+    a = [(1, "a1"), (1, "a2"), (2, "a3")]
+    b = [(1, "b1"), (2, "b2")]
+    c = [(0, "c1"), (1, "c2")]
+
+    merged = merge_sorted(a, b, c, key=lambda pair: pair[0])
+    assert [name for _, name in merged] == \
+        ["c1", "a1", "a2", "b1", "c2", "a3", "b2"]
+
+
+def test_lazy() -> None:
+    """
+    Checks that the iterables are consumed only as far as
+    needed, holding one element from each of them.
+    """
+    pulled = []
+
+    def stream(name: str, values: list[int]):
+        for value in values:
+            pulled.append((name, value))
+            yield value
+
+    merged = merge_sorted(stream("a", [1, 3, 5]), stream("b", [2, 4, 6]))
+    assert pulled == []
+
+    assert next(merged) == 1
+    assert pulled == [("a", 1), ("b", 2)]
+    assert next(merged) == 2
+    assert pulled == [("a", 1), ("b", 2), ("a", 3)]
+
+
+def test_random_streams() -> None:
+    rng = random.Random(12)
+    streams = [sorted(rng.randrange(100) for _ in range(rng.randrange(50)))
+               for _ in range(30)]
+
+    assert list(merge_sorted(*streams)) == list(heapq.merge(*streams))
@@ -1,9 +1,22 @@
+import gzip
+import io
+import os
+import random
 import sys
 from typing import Optional
 
 from minheap import MinHeap
 import pytest
 
+# Every test in this file is run with both sift engines (the
+# white-box tests below check that they handle every sifting
+# scenario in the same way)
+
+@pytest.fixture(autouse=True, params=["hole", "swap"])
+def engine(request, monkeypatch) -> str:
+    monkeypatch.setattr(MinHeap, "default_engine", request.param)
+    return request.param
+
 #
 # BLACK-BOX TESTS
 #
@@ -183,6 +196,416 @@ def test_change_priority_multiple() -> None:
     assert val == "jkl"
 
 
+def test_from_items() -> None:
+    items = [(30, "abc"), (20, "mno"), (20, "def"), (10, "jkl"), (75, "ghi")]
+
+    mh = MinHeap.from_items(items)
+    assert mh.size == 5
+
+    for prio_expected, val_expected in sorted(items):
+        rv = mh.remove_min()
+        assert rv is not None
+        assert rv == (prio_expected, val_expected)
+
+    assert mh.empty
+
+
+def test_from_items_empty() -> None:
+    mh = MinHeap.from_items([])
+
+    assert mh.empty
+    mh.insert(20, "abc")
+    assert mh.min() == (20, "abc")
+
+
+def test_from_items_repeated() -> None:
+    with pytest.raises(ValueError):
+        MinHeap.from_items([(20, "abc"), (10, "def"), (40, "abc")])
+
+
+def test_from_items_then_change_priority() -> None:
+    mh = MinHeap.from_items([(100, "abc"), (50, "def"), (20, "ghi"), (75, "jkl")])
+    mh.change_priority("jkl", 10)
+    mh.insert(15, "mno")
+
+    expected = [(10, "jkl"), (15, "mno"), (20, "ghi"), (50, "def"), (100, "abc")]
+    for entry in expected:
+        assert mh.remove_min() == entry
+    assert mh.empty
+
+
+def test_insert_many() -> None:
+    mh = MinHeap()
+
+    mh.insert(50, "def")
+    mh.insert_many([(100, "abc"), (20, "ghi"), (75, "jkl")])
+
+    assert mh.size == 4
+    assert mh.remove_min_many(2) == [(20, "ghi"), (50, "def")]
+    assert mh.remove_min_many(5) == [(75, "jkl"), (100, "abc")]
+    assert mh.empty
+
+
+def test_insert_many_repeated() -> None:
+    mh = MinHeap()
+
+    mh.insert(50, "def")
+
+    with pytest.raises(ValueError):
+        mh.insert_many([(100, "abc"), (20, "def")])
+    with pytest.raises(ValueError):
+        mh.insert_many([(100, "abc"), (20, "abc")])
+
+    # Nothing should have been inserted
+    assert mh.size == 1
+
+
+def test_change_priority_many() -> None:
+    mh = MinHeap()
+
+    mh.insert_many([(100, "abc"), (50, "def"), (20, "ghi"), (75, "jkl")])
+    mh.change_priority_many([("jkl", 10), ("ghi", 200)])
+
+    assert mh.remove_min_many(4) == [(10, "jkl"), (50, "def"),
+                                     (100, "abc"), (200, "ghi")]
+
+
+def test_change_priority_many_nonexistent() -> None:
+    mh = MinHeap()
+
+    mh.insert_many([(100, "abc"), (50, "def")])
+
+    with pytest.raises(ValueError):
+        mh.change_priority_many([("abc", 10), ("foobar", 20)])
+
+    # No priorities should have been changed
+    assert mh.min() == (50, "def")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_remove(lazy: bool) -> None:
+    mh = MinHeap(lazy_removal=lazy)
+
+    mh.insert(100, "abc")
+    mh.insert(50, "def")
+    mh.insert(20, "ghi")
+    mh.insert(75, "jkl")
+
+    assert mh.remove("ghi") == (20, "ghi")
+    assert mh.remove("abc") == (100, "abc")
+    assert mh.size == 2
+
+    with pytest.raises(ValueError):
+        mh.remove("abc")
+    with pytest.raises(ValueError):
+        mh.change_priority("ghi", 10)
+
+    # Removed items can be inserted again
+    mh.insert(10, "abc")
+
+    assert mh.min() == (10, "abc")
+    assert mh.remove_min() == (10, "abc")
+    assert mh.remove_min() == (50, "def")
+    assert mh.remove_min() == (75, "jkl")
+    assert mh.remove_min() is None
+    assert mh.empty
+
+
+def test_invalid_compact_ratio() -> None:
+    with pytest.raises(ValueError):
+        MinHeap(lazy_removal=True, compact_ratio=0)
+
+
+def test_tie_break_fifo() -> None:
+    mh = MinHeap(tie_break="fifo")
+    for item in ["delta", "alpha", "charlie", "bravo"]:
+        mh.insert(10, item)
+    mh.insert(5, "zulu")
+
+    assert mh.min() == (5, "zulu")
+    assert mh.remove_min_many(5) == [(5, "zulu"), (10, "delta"),
+                                     (10, "alpha"), (10, "charlie"),
+                                     (10, "bravo")]
+
+
+def test_tie_break_fifo_change_priority() -> None:
+    """
+    An item keeps its place in line among the items with
+    the same priority when its priority changes.
+    """
+    mh = MinHeap(tie_break="fifo")
+    mh.insert(10, "b")
+    mh.insert(20, "a")
+    mh.insert(10, "c")
+
+    mh.change_priority("a", 10)
+    assert mh.remove_min() == (10, "b")
+    assert mh.remove_min() == (10, "a")
+    assert mh.remove_min() == (10, "c")
+
+
+def test_tie_break_none() -> None:
+    mh = MinHeap.from_items([(3, "x"), (1, "y"), (2, "z"), (1, "w")],
+                            tie_break="none")
+
+    assert [mh.remove_min() for _ in range(4)] in (
+        [(1, "y"), (1, "w"), (2, "z"), (3, "x")],
+        [(1, "w"), (1, "y"), (2, "z"), (3, "x")],
+    )
+    assert mh.empty
+
+
+class NoCompare(str):
+    """
+    Item that can't be compared with other items
+    """
+
+    def __lt__(self, other):
+        raise AssertionError("items should not be compared")
+
+    __gt__ = __le__ = __ge__ = __lt__
+
+
+@pytest.mark.parametrize("tie_break", ["fifo", "none"])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_tie_break_never_compares_items(tie_break: str, lazy: bool) -> None:
+    items = [(i % 3, NoCompare(f"job-{i:08d}")) for i in range(200)]
+    mh = MinHeap.from_items(items[:100], tie_break=tie_break,
+                            lazy_removal=lazy)
+    mh.insert_many(items[100:110])
+    mh.insert_many(items[110:])
+    for _, item in items[::7]:
+        mh.change_priority(item, 1)
+    mh.change_priority_many([(item, 2) for _, item in items[::2]])
+    for _, item in items[::5]:
+        mh.remove(item)
+
+    removed = mh.remove_min_many(10) + mh.remove_min_many(150)
+    while not mh.empty:
+        removed.append(mh.remove_min())
+    assert len(removed) == 160
+    assert [prio for prio, _ in removed] == \
+        sorted(prio for prio, _ in removed)
+
+
+def test_replace_min() -> None:
+    mh = MinHeap()
+
+    assert mh.replace_min(5, "abc") is None
+    mh.insert(10, "def")
+    mh.insert(7, "ghi")
+
+    assert mh.replace_min(20, "jkl") == (5, "abc")
+    assert mh.replace_min(1, "ghi") == (7, "ghi")
+    with pytest.raises(ValueError):
+        mh.replace_min(3, "def")
+
+    assert mh.remove_min_many(3) == [(1, "ghi"), (10, "def"), (20, "jkl")]
+
+
+def test_invalid_tie_break() -> None:
+    with pytest.raises(ValueError):
+        MinHeap(tie_break="random")
+
+
+@pytest.mark.parametrize("tie_break", ["lexicographic", "fifo", "none"])
+def test_iter_sorted(tie_break: str) -> None:
+    rng = random.Random(16)
+    items = [(rng.randrange(20), f"item{i}") for i in range(200)]
+    mh = MinHeap.from_items(items, arity=3, tie_break=tie_break)
+    data_before = list(mh._data)
+
+    assert mh.peek(0) == []
+    top = mh.peek(10)
+    everything = list(mh.iter_sorted())
+
+    assert mh._data == data_before
+    assert top == everything[:10]
+    assert [prio for prio, _ in everything] == sorted(p for p, _ in items)
+    assert everything == mh.remove_min_many(200)
+    assert mh.peek(10) == []
+
+
+def test_iter_sorted_lazy_removal() -> None:
+    mh = MinHeap.from_items([(i, f"item{i}") for i in range(10)],
+                            lazy_removal=True, compact_ratio=1.0)
+    mh.remove("item0")
+    mh.remove("item3")
+
+    assert mh.peek(3) == [(1, "item1"), (2, "item2"), (4, "item4")]
+    assert len(list(mh.iter_sorted())) == 8
+
+
+def test_str() -> None:
+    assert str(MinHeap()) == "[empty]"
+
+    mh = MinHeap.from_items([(1, "a"), (2, "b"), (3, "c"), (4, "d")])
+    assert str(mh) == "(1, 'a') \n(2, 'b') (3, 'c') \n(4, 'd') \n"
+    assert list(mh.iter_lines()) == ["(1, 'a') \n", "(2, 'b') (3, 'c') \n",
+                                     "(4, 'd') \n"]
+
+
+@pytest.mark.parametrize("sizes", [(100, 5), (5, 100), (0, 10), (10, 0)])
+def test_meld(sizes: tuple[int, int]) -> None:
+    rng = random.Random(19)
+    a_items = [(rng.randrange(50), f"a{i}") for i in range(sizes[0])]
+    b_items = [(rng.randrange(50), f"b{i}") for i in range(sizes[1])]
+    a = MinHeap.from_items(a_items)
+    b = MinHeap.from_items(b_items, arity=4)
+
+    a.meld(b)
+
+    assert b.empty
+    assert a.size == sizes[0] + sizes[1]
+    assert a.remove_min_many(a.size) == sorted(a_items + b_items)
+
+    b.insert(1, "abc")
+    assert b.min() == (1, "abc")
+
+
+def test_meld_duplicates() -> None:
+    a = MinHeap.from_items([(1, "abc"), (2, "def")])
+    b = MinHeap.from_items([(3, "ghi"), (4, "def")])
+
+    with pytest.raises(ValueError):
+        a.meld(b)
+    with pytest.raises(ValueError):
+        a.meld(a)
+    assert a.size == 2
+    assert b.size == 2
+
+
+def test_meld_fifo_and_lazy() -> None:
+    a = MinHeap(tie_break="fifo")
+    b = MinHeap(tie_break="fifo", lazy_removal=True, compact_ratio=1.0)
+    for item in ["z", "y"]:
+        a.insert(1, item)
+    for item in ["x", "w", "v"]:
+        b.insert(1, item)
+    b.remove("w")
+
+    a.meld(b)
+    assert a.remove_min_many(4) == [(1, "z"), (1, "y"), (1, "x"), (1, "v")]
+
+
+@pytest.mark.parametrize("source", ["memory", "disk", "pipe", "gzip"])
+def test_dump_load(tmp_path, source: str) -> None:
+    """
+    Saves a snapshot to a file on disk (which is read with a
+    memory map), to an in-memory buffer, to a pipe or to a gzip
+    file (which have a file descriptor, but can't be read with
+    a memory map), and checks that the restored heap behaves
+    like the original one.
+    """
+    items = [(20, "abc"), (-5, "déf"), (10**12, "ghi"), (7, ""), (7, "jkl")]
+    mh = MinHeap.from_items(items, arity=3)
+
+    if source == "memory":
+        f = io.BytesIO()
+        mh.dump(f)
+        mh.dump(f)
+        f.seek(0)
+    elif source == "disk":
+        with open(tmp_path / "heap.bin", "wb") as f:
+            f.write(b"prefix")
+            mh.dump(f)
+            mh.dump(f)
+        f = open(tmp_path / "heap.bin", "rb")
+        f.read(6)
+    elif source == "pipe":
+        # The snapshots are small enough to fit in the pipe's
+        # buffer, so we can write them before reading
+        r, w = os.pipe()
+        with os.fdopen(w, "wb") as out:
+            mh.dump(out)
+            mh.dump(out)
+        f = os.fdopen(r, "rb")
+    else:
+        with gzip.open(tmp_path / "heap.bin.gz", "wb") as out:
+            mh.dump(out)
+            mh.dump(out)
+        f = gzip.open(tmp_path / "heap.bin.gz", "rb")
+
+    with f:
+        restored = MinHeap.load(f)
+        again = MinHeap.load(f)
+        assert f.read() == b""
+
+    assert restored.size == 5
+    assert restored.min() == (-5, "déf")
+    restored.change_priority("ghi", 0)
+    restored.insert(1, "mno")
+    assert restored.remove_min_many(6) == [(-5, "déf"), (0, "ghi"), (1, "mno"),
+                                           (7, ""), (7, "jkl"), (20, "abc")]
+    assert again.remove_min_many(5) == sorted(items)
+
+
+def test_dump_load_empty() -> None:
+    f = io.BytesIO()
+    MinHeap().dump(f)
+    f.seek(0)
+
+    mh = MinHeap.load(f)
+    assert mh.empty
+    mh.insert(1, "abc")
+    assert mh.min() == (1, "abc")
+
+
+def test_dump_load_fifo() -> None:
+    mh = MinHeap(tie_break="fifo")
+    for item in ["c", "a", "b"]:
+        mh.insert(1, item)
+
+    f = io.BytesIO()
+    mh.dump(f)
+    f.seek(0)
+    restored = MinHeap.load(f)
+    restored.insert(1, "0")
+
+    assert restored.remove_min_many(4) == [(1, "c"), (1, "a"), (1, "b"),
+                                           (1, "0")]
+
+
+def test_dump_lazy_removal() -> None:
+    mh = MinHeap.from_items([(i, f"item{i}") for i in range(10)],
+                            lazy_removal=True)
+    mh.remove("item0")
+    mh.remove("item5")
+
+    f = io.BytesIO()
+    mh.dump(f)
+    f.seek(0)
+    restored = MinHeap.load(f, lazy_removal=True)
+
+    assert restored.size == 8
+    assert [item for _, item in restored.remove_min_many(8)] == \
+        ["item1", "item2", "item3", "item4", "item6", "item7", "item8", "item9"]
+
+
+def test_dump_invalid() -> None:
+    mh = MinHeap()
+    mh.insert(2**64, "abc")
+    with pytest.raises(ValueError):
+        mh.dump(io.BytesIO())
+
+    mh = MinHeap()
+    mh.insert(1, 123)  # type: ignore
+    with pytest.raises(ValueError):
+        mh.dump(io.BytesIO())
+
+
+def test_load_invalid() -> None:
+    with pytest.raises(ValueError):
+        MinHeap.load(io.BytesIO(b""))
+    with pytest.raises(ValueError):
+        MinHeap.load(io.BytesIO(b"not a heap, just some bytes" * 2))
+
+    f = io.BytesIO()
+    MinHeap.from_items([(1, "abc"), (2, "def")]).dump(f)
+    with pytest.raises(ValueError):
+        MinHeap.load(io.BytesIO(f.getvalue()[:-2]))
+
+
 #
 # WHITE-BOX TESTS
 #
@@ -192,17 +615,21 @@ def test_change_priority_multiple() -> None:
 # by the tests
 
 # The following list of items will result in the min heap
-# we described in class.
+# we described in class (when the heap is a binary heap).
+# The white-box tests are run on heaps with different
+# numbers of children per node.
+
+ARITIES = [2, 3, 4]
 
 
-def sample_heap() -> MinHeap:
+def sample_heap(arity: int = 2) -> MinHeap:
     """
     This fixture returns the heap we described in class
     """
     items = [(1, "A"), (4, "B"), (8, "C"), (18, "D"), (8,"E"),
              (99, "F"), (12, "G"), (21, "H")]
 
-    mh = MinHeap()
+    mh = MinHeap(arity=arity)
 
     for prio, val in items:
         mh.insert(prio, val)
@@ -229,6 +656,22 @@ def check_remove_in_order(mh: MinHeap) -> None:
             (f"After removing element with priority {cur_priority} "
              f"the next element returned a higher priority ({prio})")
 
+def check_heap_property(mh: MinHeap) -> None:
+    """
+    Helper function that verifies that every node is smaller
+    than its parent, and that _index_of_item agrees with the
+    contents of the data array.
+    """
+
+    for i in range(1, mh._next):
+        assert not mh._lt(mh._data[i], mh._data[(i - 1) // mh._arity])
+
+    for item, i in mh._index_of_item.items():
+        elem = mh._data[i]
+        assert elem is not None
+        assert elem[-1] == item
+    assert len(mh._index_of_item) == mh.size
+
 
 # The following are examples of white-box test where we've set up the
 # tests to insert values in a way that will result in different sifting
@@ -236,35 +679,38 @@ def check_remove_in_order(mh: MinHeap) -> None:
 # take place but, at the very least, we are ensuring that we're checking
 # that our code works correctly in these scenarios.
 
-def test_insert_no_sift() -> None:
+@pytest.mark.parametrize("arity", ARITIES)
+def test_insert_no_sift(arity: int) -> None:
     """
     Performs an insertion that will not result in sifting any nodes.
     """
 
-    mh = sample_heap()
+    mh = sample_heap(arity)
     mh.insert(37, "I")
     assert mh.size == 9
     check_remove_in_order(mh)
 
-def test_insert_sift_up_mid_tree() -> None:
+@pytest.mark.parametrize("arity", ARITIES)
+def test_insert_sift_up_mid_tree(arity: int) -> None:
     """
     Performs an insertion that will result in the node being
     sifted up two levels (not all the way to the tree).
     """
 
-    mh = sample_heap()
+    mh = sample_heap(arity)
     mh.insert(2, "I")
     assert mh.size == 9
     check_remove_in_order(mh)
 
 
-def test_insert_sift_up_root() -> None:
+@pytest.mark.parametrize("arity", ARITIES)
+def test_insert_sift_up_root(arity: int) -> None:
     """
     Performs an insertion that will result in the node being
     sifted up all the way to the root.
     """
 
-    mh = sample_heap()
+    mh = sample_heap(arity)
     mh.insert(-10, "I")
     assert mh.size == 9
 
@@ -283,12 +729,13 @@ def test_insert_sift_up_root() -> None:
 # they will have to be updated if the internal implementation of a class
 # changes.
 
-def test_insert_no_sift_alt() -> None:
+@pytest.mark.parametrize("arity", ARITIES)
+def test_insert_no_sift_alt(arity: int) -> None:
     """
     Performs an insertion that will not result in sifting any nodes.
     """
 
-    mh = sample_heap()
+    mh = sample_heap(arity)
     mh.insert(37, "I")
 
     # The new node should be in the last position of the data array
@@ -300,17 +747,24 @@ def test_insert_no_sift_alt() -> None:
     assert val == "I"
 
 
-def test_insert_sift_up_mid_tree_alt() -> None:
+@pytest.mark.parametrize("arity", ARITIES)
+def test_insert_sift_up_mid_tree_alt(arity: int) -> None:
     """
     Performs an insertion that will result in the node being
     sifted up two levels (not all the way to the tree).
     """
 
-    mh = sample_heap()
+    mh = sample_heap(arity)
     mh.insert(2, "I")
 
-    # The new node should be sifted up to the second position of the data array
-    elem = mh._data[1]
+    # The new node should be sifted up to the child of the root
+    # that is an ancestor of the last position of the data array
+    # (in a binary heap, this is the second position)
+    pos = mh._next - 1
+    while (pos - 1) // arity != 0:
+        pos = (pos - 1) // arity
+
+    elem = mh._data[pos]
     assert elem is not None
 
     prio, val = elem
@@ -318,13 +772,14 @@ def test_insert_sift_up_mid_tree_alt() -> None:
     assert val == "I"
 
 
-def test_insert_sift_up_root_alt() -> None:
+@pytest.mark.parametrize("arity", ARITIES)
+def test_insert_sift_up_root_alt(arity: int) -> None:
     """
     Performs an insertion that will result in the node being
     sifted up all the way to the root.
     """
 
-    mh = sample_heap()
+    mh = sample_heap(arity)
     mh.insert(-10, "I")
 
     # The new node should be sifted up to the first position of the data array
@@ -334,3 +789,219 @@ def test_insert_sift_up_root_alt() -> None:
     prio, val = elem
     assert prio == -10
     assert val == "I"
+
+
+@pytest.mark.parametrize("arity", ARITIES + [8])
+def test_from_items_heap_property(arity: int) -> None:
+    """
+    Builds a heap in bulk and checks that the heap property
+    holds and that the elements are removed in order.
+    """
+
+    prios = [21, 12, 99, 8, 18, 5, 4, 1, 37, 40, 3, 7, 66]
+    mh = MinHeap.from_items([(prio, f"item{prio}") for prio in prios],
+                            arity=arity)
+
+    check_heap_property(mh)
+    check_remove_in_order(mh)
+
+
+@pytest.mark.parametrize("arity", ARITIES + [8])
+@pytest.mark.parametrize("tie_break", ["lexicographic", "fifo", "none"])
+def test_random_operations(arity: int, tie_break: str) -> None:
+    """
+    Performs a random sequence of insertions, priority changes
+    and removals, and checks the heap property after each one.
+    """
+
+    rng = random.Random(arity)
+    mh = MinHeap(arity=arity, tie_break=tie_break)
+
+    for i in range(300):
+        op = rng.random()
+        if op < 0.5 or mh.empty:
+            mh.insert(rng.randrange(50), f"item{i}")
+        elif op < 0.8:
+            item = rng.choice(list(mh._index_of_item))
+            mh.change_priority(item, rng.randrange(50))
+        else:
+            mh.remove_min()
+        check_heap_property(mh)
+
+
+def test_invalid_arity() -> None:
+    with pytest.raises(ValueError):
+        MinHeap(arity=1)
+
+
+@pytest.mark.parametrize("batch_size", [1, 10, 1000])
+def test_batch_operations(batch_size: int) -> None:
+    """
+    Performs batches of insertions, priority changes and removals,
+    which will be done either by sifting each element or by
+    rebuilding the heap (depending on the size of the batch), and
+    checks that both strategies leave a valid heap.
+    """
+
+    rng = random.Random(batch_size)
+    mh = MinHeap.from_items([(rng.randrange(100), f"item{i}")
+                             for i in range(200)])
+    count = 200
+
+    for _ in range(5):
+        mh.insert_many([(rng.randrange(100), f"item{count + i}")
+                        for i in range(batch_size)])
+        count += batch_size
+        check_heap_property(mh)
+
+        items = rng.sample(list(mh._index_of_item), min(batch_size, mh.size))
+        mh.change_priority_many([(item, rng.randrange(100)) for item in items])
+        check_heap_property(mh)
+
+        expected = sorted(e for e in mh._data[:mh._next] if e is not None)
+        assert mh.remove_min_many(batch_size) == expected[:batch_size]
+        check_heap_property(mh)
+
+
+def check_index(mh: MinHeap) -> None:
+    """
+    Helper function that verifies that _index_of_item maps
+    every item that is still in the heap (and no other item)
+    to its position in the data array.
+    """
+
+    live = {}
+    for i in range(mh._next):
+        elem = mh._data[i]
+        assert elem is not None
+        if isinstance(elem[-1], str):
+            live[elem[-1]] = i
+
+    assert len(live) == mh.size
+    for item, i in live.items():
+        assert mh._index_of_item[item] == i
+
+
+@pytest.mark.parametrize("arity", ARITIES)
+def test_remove_positions(arity: int) -> None:
+    """
+    Removes items from the middle of the heap we described in
+    class, which will require sifting the last element of the
+    array either up or down.
+    """
+
+    for item in "ABCDEFGH":
+        mh = sample_heap(arity)
+        mh.remove(item)
+        assert mh.size == 7
+        check_heap_property(mh)
+        check_remove_in_order(mh)
+
+
+def test_lazy_remove_leaves_tombstones() -> None:
+    """
+    Checks that lazy removal doesn't move anything in the
+    array, and that the tombstones are discarded when they
+    reach the root.
+    """
+
+    mh = sample_heap()
+    mh._compact_ratio = 1.0  # Never compact
+    data_before = mh._data[:mh._next]
+
+    mh.remove("A")
+    mh.remove("D")
+
+    assert mh._next == 8
+    assert mh._dead == 2
+    assert mh.size == 6
+    for before, after in zip(data_before, mh._data):
+        assert before is not None and after is not None
+        assert before[0] == after[0]
+    check_index(mh)
+
+    # The root is a tombstone, so min() has to discard it (either
+    # on its own, or by rebuilding the heap without tombstones)
+    assert mh.min() == (4, "B")
+    assert mh._data[0] == (4, "B")
+    check_index(mh)
+
+    assert [mh.remove_min() for _ in range(6)] == \
+        [(4, "B"), (8, "C"), (8, "E"), (12, "G"), (21, "H"), (99, "F")]
+    assert mh.empty
+
+
+def test_lazy_remove_compaction() -> None:
+    """
+    Removes many items from a heap with lazy removal, and checks
+    that the tombstones are cleared out once they take up half
+    of the array.
+    """
+
+    mh = MinHeap.from_items([(i, f"item{i}") for i in range(100)],
+                            lazy_removal=True)
+
+    for i in range(0, 100, 2):
+        mh.remove(f"item{i}")
+        assert mh._dead <= mh._next // 2
+        check_index(mh)
+
+    assert mh.size == 50
+    mh.remove("item1")
+    assert mh._dead < 50
+    for i in range(1, mh._next):
+        assert mh._data[(i - 1) // 2] < mh._data[i]
+
+    mh.insert(-1, "item0")
+    assert mh.remove_min_many(3) == [(-1, "item0"), (3, "item3"), (5, "item5")]
+    assert mh._dead == 0
+    check_index(mh)
+
+
+def test_load_keeps_heap_order() -> None:
+    """
+    Checks that a restored heap has exactly the same array
+    (so it was not heapified again) and a consistent index.
+    """
+
+    mh = sample_heap(arity=3)
+    f = io.BytesIO()
+    mh.dump(f)
+    f.seek(0)
+    restored = MinHeap.load(f)
+
+    assert restored._arity == 3
+    assert restored._data == mh._data[:mh._next]
+    check_heap_property(restored)
+
+
+def test_unknown_engine() -> None:
+    with pytest.raises(ValueError):
+        MinHeap(engine="foobar")
+
+
+@pytest.mark.parametrize("arity", ARITIES)
+def test_engines_agree(arity: int) -> None:
+    """
+    Checks that both engines leave the array (and the index)
+    in exactly the same state after every operation.
+    """
+    rng = random.Random(24)
+    hole = MinHeap(arity=arity, engine="hole")
+    swap = MinHeap(arity=arity, engine="swap")
+
+    for i in range(2000):
+        r = rng.random()
+        if r < 0.5 or hole.empty:
+            prio = rng.randrange(100)
+            hole.insert(prio, f"item{i}")
+            swap.insert(prio, f"item{i}")
+        elif r < 0.75:
+            assert hole.remove_min() == swap.remove_min()
+        else:
+            item = rng.choice(list(hole._index_of_item))
+            prio = rng.randrange(100)
+            hole.change_priority(item, prio)
+            swap.change_priority(item, prio)
+        assert hole._data[:hole._next] == swap._data[:swap._next]
+        assert hole._index_of_item == swap._index_of_item
@@ -0,0 +1,194 @@
+import io
+import random
+
+from minheap import MinHeap
+from minmax_heap import MinMaxHeap, _is_min_level
+import pytest
+
+#
+# BLACK-BOX TESTS
+#
+
+
+def test_init() -> None:
+    mh = MinMaxHeap()
+
+    assert mh.empty
+    assert mh.min() is None
+    assert mh.max() is None
+    assert mh.remove_min() is None
+    assert mh.remove_max() is None
+
+
+def test_invalid_arity() -> None:
+    with pytest.raises(ValueError):
+        MinMaxHeap(arity=3)
+
+
+def test_min_max() -> None:
+    mh = MinMaxHeap()
+
+    mh.insert(5, "abc")
+    assert mh.min() == (5, "abc")
+    assert mh.max() == (5, "abc")
+
+    mh.insert(10, "def")
+    mh.insert(1, "ghi")
+    mh.insert(7, "jkl")
+    assert mh.min() == (1, "ghi")
+    assert mh.max() == (10, "def")
+
+    assert mh.remove_max() == (10, "def")
+    assert mh.remove_min() == (1, "ghi")
+    assert mh.remove_max() == (7, "jkl")
+    assert mh.remove_max() == (5, "abc")
+    assert mh.empty
+
+
+def test_change_priority() -> None:
+    mh = MinMaxHeap.from_items([(i, f"item{i}") for i in range(20)])
+
+    mh.change_priority("item3", 100)
+    assert mh.max() == (100, "item3")
+    mh.change_priority("item19", -1)
+    assert mh.min() == (-1, "item19")
+    assert mh.remove_max() == (100, "item3")
+    assert mh.max() == (18, "item18")
+
+
+def test_evict_worst() -> None:
+    """
+    Keeps a queue at a fixed capacity by evicting the element
+    with the worst (highest) priority
+    """
+    mh = MinMaxHeap()
+    for i, prio in enumerate([50, 10, 90, 30, 70, 20, 80, 60, 40]):
+        mh.insert(prio, f"job{i}")
+        if mh.size > 4:
+            mh.remove_max()
+
+    assert mh.remove_min_many(4) == [(10, "job1"), (20, "job5"),
+                                     (30, "job3"), (40, "job8")]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_remove(lazy: bool) -> None:
+    mh = MinMaxHeap.from_items([(i, f"item{i}") for i in range(10)],
+                               lazy_removal=lazy, compact_ratio=1.0)
+    assert mh.remove("item9") == (9, "item9")
+    assert mh.remove("item0") == (0, "item0")
+
+    assert mh.max() == (8, "item8")
+    assert mh.min() == (1, "item1")
+    assert mh.remove_max() == (8, "item8")
+    assert mh.size == 7
+
+
+def test_iter_sorted() -> None:
+    items = [(i % 5, f"item{i}") for i in range(30)]
+    mh = MinMaxHeap.from_items(items)
+
+    assert mh.peek(3) == [(0, "item0"), (0, "item10"), (0, "item15")]
+    assert list(mh.iter_sorted()) == sorted(items)
+    assert mh.size == 30
+
+
+def test_dump_load() -> None:
+    mh = MinMaxHeap.from_items([(i, f"item{i}") for i in range(10)])
+    f = io.BytesIO()
+    mh.dump(f)
+
+    f.seek(0)
+    with pytest.raises(ValueError):
+        MinHeap.load(f)
+
+    f.seek(0)
+    restored = MinMaxHeap.load(f)
+    assert restored.remove_max() == (9, "item9")
+    assert restored.remove_min() == (0, "item0")
+
+
+#
+# WHITE-BOX TESTS
+#
+
+
+def check_minmax_property(mh: MinMaxHeap) -> None:
+    """
+    Helper function that verifies that every element on a min
+    level is smaller than its parent, every element on a max
+    level is larger than its parent, and (since a min-max heap
+    is only valid if this also holds for all of its ancestors)
+    every element is between its closest min and max ancestors.
+    Also checks that _index_of_item agrees with the array.
+    """
+    data = mh._data
+    for i in range(1, mh._next):
+        ancestor = (i - 1) // 2
+        while True:
+            if _is_min_level(ancestor):
+                assert not mh._lt(data[i], data[ancestor])
+            else:
+                assert not mh._lt(data[ancestor], data[i])
+            if ancestor == 0:
+                break
+            ancestor = (ancestor - 1) // 2
+
+    for item, i in mh._index_of_item.items():
+        assert data[i][-1] == item
+
+
+@pytest.mark.parametrize("tie_break", ["lexicographic", "fifo", "none"])
+def test_random_operations(tie_break: str) -> None:
+    rng = random.Random(18)
+    mh = MinMaxHeap(tie_break=tie_break)
+    reference = {}
+
+    for i in range(1000):
+        op = rng.random()
+        if op < 0.4 or not reference:
+            prio = rng.randrange(100)
+            mh.insert(prio, f"item{i}")
+            reference[f"item{i}"] = prio
+        elif op < 0.6:
+            item = rng.choice(sorted(reference))
+            prio = rng.randrange(100)
+            mh.change_priority(item, prio)
+            reference[item] = prio
+        elif op < 0.7:
+            item = rng.choice(sorted(reference))
+            assert mh.remove(item) == (reference.pop(item), item)
+        elif op < 0.85:
+            prio, item = mh.remove_min()
+            assert prio == min(reference.values())
+            assert reference.pop(item) == prio
+        else:
+            prio, item = mh.remove_max()
+            assert prio == max(reference.values())
+            assert reference.pop(item) == prio
+        check_minmax_property(mh)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 10, 100, 1000])
+def test_from_items(n: int) -> None:
+    rng = random.Random(n)
+    mh = MinMaxHeap.from_items([(rng.randrange(50), f"item{i}")
+                                for i in range(n)])
+    check_minmax_property(mh)
+
+
+def test_batch_operations() -> None:
+    rng = random.Random(3)
+    mh = MinMaxHeap.from_items([(rng.randrange(100), f"item{i}")
+                                for i in range(100)])
+
+    mh.insert_many([(rng.randrange(100), f"new{i}") for i in range(500)])
+    check_minmax_property(mh)
+    mh.change_priority_many([(f"new{i}", rng.randrange(100))
+                             for i in range(400)])
+    check_minmax_property(mh)
+
+    removed = mh.remove_min_many(300)
+    assert [prio for prio, _ in removed] == sorted(p for p, _ in removed)
+    check_minmax_property(mh)
+    assert removed[-1][0] <= mh.min()[0]
@@ -0,0 +1,146 @@
+import random
+
+from minheap import MinHeap
+from pairing_heap import PairingHeap
+import pytest
+
+#
+# BLACK-BOX TESTS
+#
+
+
+def test_init() -> None:
+    ph = PairingHeap()
+
+    assert ph.size == 0
+    assert ph.empty
+    assert ph.min() is None
+    assert ph.remove_min() is None
+    assert str(ph) == "[empty]"
+
+
+def test_insert_repeated() -> None:
+    ph = PairingHeap()
+
+    ph.insert(20, "abc")
+
+    with pytest.raises(ValueError):
+        ph.insert(40, "abc")
+
+
+def test_remove_min_repeated() -> None:
+    ph = PairingHeap()
+
+    items = [(30, "abc"), (20, "mno"), (20, "def"), (10, "jkl"), (75, "ghi")]
+    for prio, val in items:
+        ph.insert(prio, val)
+
+    for expected in sorted(items):
+        assert ph.remove_min() == expected
+
+    assert ph.empty
+
+
+def test_change_priority_root() -> None:
+    ph = PairingHeap.from_items([(100, "abc"), (50, "def"), (20, "ghi")])
+
+    # Increase the priority of the root, then decrease it again
+    ph.change_priority("ghi", 70)
+    assert ph.min() == (50, "def")
+    ph.change_priority("ghi", 10)
+    assert ph.min() == (10, "ghi")
+
+    assert ph.remove_min_many(3) == [(10, "ghi"), (50, "def"), (100, "abc")]
+
+
+def test_change_priority_nonexistent() -> None:
+    ph = PairingHeap()
+
+    ph.insert(20, "abc")
+
+    with pytest.raises(ValueError):
+        ph.change_priority("def", 10)
+
+#
+# WHITE-BOX TESTS
+#
+
+
+def test_same_order_as_minheap() -> None:
+    """
+    Performs the same random sequence of operations on a
+    MinHeap and a PairingHeap (increasing and decreasing the
+    priorities of nodes at every depth of the tree) and checks
+    that both return the same elements.
+    """
+
+    rng = random.Random(1)
+    mh = MinHeap()
+    ph = PairingHeap()
+    live: list[str] = []
+
+    for i in range(3000):
+        op = rng.random()
+        if op < 0.45 or not live:
+            item = f"item{i}"
+            prio = rng.randrange(100)
+            mh.insert(prio, item)
+            ph.insert(prio, item)
+            live.append(item)
+        elif op < 0.8:
+            item = rng.choice(live)
+            prio = rng.randrange(100)
+            mh.change_priority(item, prio)
+            ph.change_priority(item, prio)
+        else:
+            rv = mh.remove_min()
+            assert rv is not None
+            assert ph.remove_min() == rv
+            live.remove(rv[1])
+
+        assert ph.size == mh.size
+        assert ph.min() == mh.min()
+
+
+def test_iter_sorted() -> None:
+    rng = random.Random(16)
+    items = [(rng.randrange(50), f"item{i}") for i in range(300)]
+    h = PairingHeap.from_items(items)
+
+    assert h.peek(0) == []
+    top = h.peek(10)
+    everything = list(h.iter_sorted())
+
+    assert top == everything[:10]
+    assert everything == sorted(items)
+    assert everything == h.remove_min_many(300)
+
+
+@pytest.mark.parametrize("sizes", [(100, 5), (5, 100), (0, 10), (10, 0)])
+def test_meld(sizes: tuple[int, int]) -> None:
+    rng = random.Random(19)
+    a_items = [(rng.randrange(50), f"a{i}") for i in range(sizes[0])]
+    b_items = [(rng.randrange(50), f"b{i}") for i in range(sizes[1])]
+    a = PairingHeap.from_items(a_items)
+    b = PairingHeap.from_items(b_items)
+
+    a.meld(b)
+
+    assert b.empty
+    assert a.size == sizes[0] + sizes[1]
+    assert a.remove_min_many(a.size) == sorted(a_items + b_items)
+
+    b.insert(1, "abc")
+    assert b.min() == (1, "abc")
+
+
+def test_meld_duplicates() -> None:
+    a = PairingHeap.from_items([(1, "abc"), (2, "def")])
+    b = PairingHeap.from_items([(3, "ghi"), (4, "def")])
+
+    with pytest.raises(ValueError):
+        a.meld(b)
+    with pytest.raises(ValueError):
+        a.meld(a)
+    assert a.size == 2
+    assert b.size == 2
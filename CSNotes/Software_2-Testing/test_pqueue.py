@@ -1,6 +1,22 @@
+import io
+import random
+
 from pqueue import PriorityQueue
 import pytest
 
+# Every test in this file is run with each of the heap
+# implementations that the priority queue supports
+
+@pytest.fixture(autouse=True, params=["heap", "compact", "pairing", "bucket",
+                                      "instrumented", "minmax"])
+def backend(request, monkeypatch) -> str:
+    monkeypatch.setattr(PriorityQueue, "default_backend", request.param)
+    return request.param
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        PriorityQueue(backend="foobar")
+
 def test_init() -> None:
     q = PriorityQueue()
     assert q.size == 0
@@ -145,3 +161,328 @@ def test_size() -> None:
     assert q.size == 3
 
 
+
+def test_from_items() -> None:
+    q = PriorityQueue.from_items([("abc", 100), ("def", 50), ("ghi", 20), ("jkl", 75)])
+
+    assert q.size == 4
+
+    q.update_priority("jkl", new_priority=30)
+
+    assert q.dequeue() == ("ghi", 20)
+    assert q.dequeue() == ("jkl", 30)
+    assert q.dequeue() == ("def", 50)
+    assert q.dequeue() == ("abc", 100)
+
+def test_from_items_repeated() -> None:
+    with pytest.raises(ValueError):
+        PriorityQueue.from_items([("abc", 20), ("abc", 50)])
+
+def test_batch_operations() -> None:
+    q = PriorityQueue()
+
+    q.enqueue("def", priority=50)
+    q.enqueue_many([("abc", 100), ("ghi", 20), ("jkl", 75)])
+    q.update_priority_many([("jkl", 30), ("abc", 10)])
+
+    assert q.size == 4
+    assert q.dequeue_many(3) == [("abc", 10), ("ghi", 20), ("jkl", 30)]
+    assert q.dequeue_many(3) == [("def", 50)]
+    assert q.size == 0
+
+def test_cancel() -> None:
+    q = PriorityQueue()
+
+    q.enqueue("abc", priority=100)
+    q.enqueue("def", priority=50)
+    q.enqueue("ghi", priority=20)
+    q.enqueue("jkl", priority=75)
+
+    assert q.cancel("ghi") == 20
+    assert q.cancel("abc") == 100
+    assert q.size == 2
+
+    with pytest.raises(ValueError):
+        q.cancel("abc")
+
+    val, prio = q.dequeue()
+    assert val == "def"
+    assert prio == 50
+
+    val, prio = q.dequeue()
+    assert val == "jkl"
+    assert prio == 75
+
+def test_cancel_lazy() -> None:
+    q = PriorityQueue(backend="heap", lazy_removal=True)
+
+    q.enqueue_many([(f"job{i}", i) for i in range(1000)])
+    for i in range(0, 1000, 3):
+        q.cancel(f"job{i}")
+
+    assert q.size == 666
+    assert q.dequeue_many(3) == [("job1", 1), ("job2", 2), ("job4", 4)]
+
+
+def test_tie_break_fifo() -> None:
+    q = PriorityQueue(backend="heap", tie_break="fifo")
+
+    q.enqueue_many([("job-c", 1), ("job-a", 1), ("job-b", 1), ("job-z", 0)])
+    assert q.dequeue_many(4) == [("job-z", 0), ("job-c", 1),
+                                 ("job-a", 1), ("job-b", 1)]
+
+
+def test_dump_load(backend: str) -> None:
+    q = PriorityQueue.from_items([("abc", 3), ("def", 1), ("ghi", 2)])
+    f = io.BytesIO()
+
+    if backend not in ("heap", "instrumented", "minmax"):
+        with pytest.raises(ValueError):
+            q.dump(f)
+        return
+
+    q.dump(f)
+    f.seek(0)
+    restored = PriorityQueue.load(f, backend=backend)
+    assert restored.dequeue_many(3) == [("def", 1), ("ghi", 2), ("abc", 3)]
+
+
+def test_stats(backend: str) -> None:
+    q = PriorityQueue()
+    q.enqueue_many([("abc", 3), ("def", 1), ("ghi", 2)])
+    q.dequeue()
+
+    if backend != "instrumented":
+        assert q.stats is None
+    else:
+        assert q.stats is not None
+        assert q.stats.calls["remove_min"] == 1
+
+
+def test_peek() -> None:
+    q = PriorityQueue.from_items([(f"job{i}", i % 7) for i in range(100)])
+
+    assert q.peek(3) == [("job0", 0), ("job14", 0), ("job21", 0)]
+    assert q.size == 100
+    assert list(q.iter_sorted()) == q.dequeue_many(100)
+    assert q.peek(5) == []
+
+
+def test_dequeue_max(backend: str) -> None:
+    q = PriorityQueue.from_items([("abc", 3), ("def", 1), ("ghi", 2)])
+
+    if backend != "minmax":
+        with pytest.raises(ValueError):
+            q.dequeue_max()
+        return
+
+    assert q.dequeue_max() == ("abc", 3)
+    assert q.dequeue() == ("def", 1)
+    assert q.dequeue_max() == ("ghi", 2)
+    assert q.size == 0
+
+
+def test_merge() -> None:
+    a = PriorityQueue.from_items([(f"a{i}", i * 2) for i in range(50)])
+    b = PriorityQueue.from_items([(f"b{i}", i * 2 + 1) for i in range(50)])
+
+    a.merge(b)
+
+    assert b.size == 0
+    assert a.size == 100
+    assert [prio for _, prio in a.dequeue_many(100)] == list(range(100))
+
+
+@pytest.mark.parametrize("other_backend", ["heap", "pairing"])
+def test_merge_other_backend(other_backend: str) -> None:
+    a = PriorityQueue.from_items([("abc", 1), ("def", 3)])
+    b = PriorityQueue.from_items([("ghi", 2), ("jkl", 4)],
+                                 backend=other_backend)
+
+    a.merge(b)
+    assert b.size == 0
+
+    c = PriorityQueue.from_items([("abc", 5)], backend=other_backend)
+    with pytest.raises(ValueError):
+        c.merge(a)
+    with pytest.raises(ValueError):
+        a.merge(a)
+
+    assert a.dequeue_many(4) == [("abc", 1), ("ghi", 2), ("def", 3), ("jkl", 4)]
+
+
+def test_order_stats() -> None:
+    q = PriorityQueue.from_items([(f"job{i}", i % 10) for i in range(100)],
+                                 order_stats=True)
+
+    assert q.count_below(0) == 0
+    assert q.count_below(3) == 30
+    assert q.count_below(100) == 100
+    assert q.rank("job0") == 0
+    assert q.rank("job13") == 30
+    assert q.quantile(0) == 0
+    assert q.quantile(0.5) == 4
+    assert q.quantile(0.95) == 9
+    assert q.quantile(1) == 9
+    assert q.range(2, 4) == sorted(
+        [(f"job{i}", i % 10) for i in range(100) if 2 <= i % 10 < 4],
+        key=lambda pair: (pair[1], pair[0]))
+
+    q.dequeue_many(10)
+    q.update_priority("job15", 1)
+    q.cancel("job99")
+    assert q.count_below(2) == 11
+    assert q.rank("job15") == 0
+    assert q.range(9, 10) == sorted((f"job{i}", 9) for i in range(9, 99, 10))
+
+    with pytest.raises(ValueError):
+        q.rank("job99")
+    with pytest.raises(ValueError):
+        q.quantile(1.5)
+
+
+def test_order_stats_disabled() -> None:
+    q = PriorityQueue.from_items([("abc", 1)])
+
+    with pytest.raises(ValueError):
+        q.count_below(1)
+    with pytest.raises(ValueError):
+        q.quantile(0.5)
+    with pytest.raises(ValueError):
+        PriorityQueue(order_stats=True).quantile(0.5)
+
+
+def test_order_stats_random(backend: str) -> None:
+    """
+    Checks that the index is kept up to date by every operation,
+    comparing it with the contents of the queue.
+    """
+    rng = random.Random(22)
+    q = PriorityQueue(order_stats=True)
+    other = PriorityQueue(order_stats=True)
+    contents: dict[str, int] = {}
+
+    # Priorities never go below the last dequeued priority,
+    # so that the test also works with the "bucket" backend
+    floor = 0
+    for i in range(400):
+        r = rng.random()
+        if r < 0.3 or not contents:
+            value, prio = f"v{i}", floor + rng.randrange(50)
+            q.enqueue(value, prio)
+            contents[value] = prio
+        elif r < 0.4:
+            batch = [(f"v{i}-{j}", floor + rng.randrange(50)) for j in range(5)]
+            q.enqueue_many(batch)
+            contents.update(batch)
+        elif r < 0.5:
+            for value, prio in q.dequeue_many(3):
+                assert contents.pop(value) == prio
+                floor = prio
+        elif r < 0.65:
+            value, prio = q.dequeue()
+            assert contents.pop(value) == prio
+            floor = prio
+        elif r < 0.8:
+            value = rng.choice(list(contents))
+            contents[value] = floor + rng.randrange(50)
+            q.update_priority(value, contents[value])
+        elif r < 0.85:
+            value = rng.choice(list(contents))
+            contents[value] = floor + rng.randrange(50)
+            q.update_priority_many([(value, contents[value])])
+        elif r < 0.9:
+            value = rng.choice(list(contents))
+            assert q.cancel(value) == contents.pop(value)
+        else:
+            batch = [(f"o{i}-{j}", floor + rng.randrange(50)) for j in range(3)]
+            other.enqueue_many(batch)
+            q.merge(other)
+            contents.update(batch)
+            assert other.count_below(10**9) == 0
+
+        prios = sorted(contents.values())
+        threshold = floor + rng.randrange(50)
+        assert q.count_below(threshold) == sum(p < threshold for p in prios)
+        if prios:
+            value = rng.choice(list(contents))
+            assert q.rank(value) == sum(p < contents[value] for p in prios)
+            assert q.quantile(0.5) == prios[max(1, -(-len(prios) // 2)) - 1]
+        lo = floor + rng.randrange(50)
+        assert [prio for _, prio in q.range(lo, lo + 10)] == \
+            [p for p in prios if lo <= p < lo + 10]
+
+
+def test_shift_all() -> None:
+    q = PriorityQueue.from_items([("abc", 30), ("def", 10), ("ghi", 20)])
+
+    q.shift_all(-5)
+    assert q.peek(3) == [("def", 5), ("ghi", 15), ("abc", 25)]
+
+    q.enqueue("jkl", 12)
+    q.update_priority("abc", 13)
+    assert q.cancel("ghi") == 15
+    assert q.dequeue() == ("def", 5)
+    assert list(q.iter_sorted()) == [("jkl", 12), ("abc", 13)]
+
+    q.shift_all(-2)
+    q.enqueue_many([("mno", 11)])
+    q.update_priority_many([("jkl", 12)])
+    assert q.dequeue_many(3) == [("abc", 11), ("mno", 11), ("jkl", 12)]
+
+
+def test_aging() -> None:
+    """
+    Every epoch, the elements that are waiting get ahead of the
+    elements that are enqueued later with the same priority.
+    """
+    q = PriorityQueue(aging=3)
+
+    q.enqueue("old", 10)
+    q.advance_epoch()
+    q.enqueue("new", 8)
+    assert q.peek(2) == [("old", 7), ("new", 8)]
+
+    q.advance_epoch(2)
+    assert q.peek(2) == [("old", 1), ("new", 2)]
+
+    # Updating a priority resets the element's aging
+    q.update_priority("old", 10)
+    q.advance_epoch()
+    assert q.dequeue_many(2) == [("new", -1), ("old", 7)]
+
+
+def test_shift_all_order_stats() -> None:
+    q = PriorityQueue.from_items([(f"job{i}", i) for i in range(10)],
+                                 order_stats=True)
+
+    q.shift_all(-100)
+    assert q.count_below(-95) == 5
+    assert q.quantile(1) == -91
+    assert q.range(-92, -90) == [("job8", -92), ("job9", -91)]
+    assert q.rank("job3") == 3
+
+
+def test_shift_all_merge(backend: str) -> None:
+    a = PriorityQueue.from_items([("abc", 1), ("def", 3)])
+    b = PriorityQueue.from_items([("ghi", 21), ("jkl", 40)])
+    a.shift_all(-1)
+    b.shift_all(-18)
+
+    a.merge(b)
+    assert b.size == 0
+    assert a.dequeue_many(4) == [("abc", 0), ("def", 2), ("ghi", 3),
+                                 ("jkl", 22)]
+
+
+def test_shift_all_dump_load(backend: str) -> None:
+    if backend not in ("heap", "instrumented", "minmax"):
+        return
+    q = PriorityQueue.from_items([("abc", 3), ("def", 1), ("ghi", 2)])
+    q.shift_all(-1)
+    f = io.BytesIO()
+
+    q.dump(f)
+    f.seek(0)
+    restored = PriorityQueue.load(f, backend=backend)
+    assert restored.dequeue_many(3) == [("def", 0), ("ghi", 1), ("abc", 2)]
@@ -0,0 +1,40 @@
+from pqueue_naive import PriorityQueue
+import pytest
+
+
+def test_enqueue_dequeue() -> None:
+    pq = PriorityQueue()
+
+    pq.enqueue("abc", priority=100)
+    pq.enqueue("def", priority=50)
+    pq.enqueue("ghi", priority=50)
+    pq.update_priority("abc", new_priority=10)
+
+    assert pq.size == 3
+    assert list(pq.iter_sorted()) == [("abc", 10), ("def", 50), ("ghi", 50)]
+    assert pq.dequeue() == ("abc", 10)
+    assert pq.dequeue() == ("def", 50)
+    assert pq.dequeue() == ("ghi", 50)
+    assert pq.size == 0
+
+
+def test_enqueue_repeated() -> None:
+    pq = PriorityQueue()
+
+    pq.enqueue("abc", priority=20)
+    with pytest.raises(ValueError):
+        pq.enqueue("abc", priority=50)
+
+
+def test_update_missing() -> None:
+    pq = PriorityQueue()
+
+    with pytest.raises(ValueError):
+        pq.update_priority("abc", 10)
+
+
+def test_dequeue_empty() -> None:
+    pq = PriorityQueue()
+
+    with pytest.raises(IndexError):
+        pq.dequeue()
@@ -0,0 +1,240 @@
+import threading
+import time
+
+from scheduler import Scheduler
+import pytest
+
+
+class FakeClock:
+    """
+    Clock that only moves when a test tells it to
+    """
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=[None, 0.001], ids=["heap", "wheel"])
+def wheel_resolution(request):
+    return request.param
+
+
+def test_schedule_at(wheel_resolution) -> None:
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    s.schedule_at(102.0, fired.append, "b")
+    s.schedule_at(101.0, fired.append, "a")
+    s.schedule_at(103.0, fired.append, "c")
+    assert s.size == 3
+    # With a wheel, a far deadline is only known approximately
+    deadline = s.next_deadline()
+    assert deadline is not None and 100.0 < deadline <= 101.0
+    if wheel_resolution is None:
+        assert deadline == pytest.approx(101.0)
+
+    assert s.run_pending() == 0
+    clock.now = 102.0
+    assert s.run_pending() == 2
+    assert fired == ["a", "b"]
+    assert s.size == 1
+
+    clock.now = 110.0
+    assert s.run_pending() == 1
+    assert fired == ["a", "b", "c"]
+    assert s.next_deadline() is None
+
+
+def test_schedule_after(wheel_resolution) -> None:
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    name = s.schedule_after(5.0, fired.append, "a")
+    assert name.startswith("timer-")
+
+    clock.now = 104.9
+    assert s.run_pending() == 0
+    clock.now = 105.0
+    assert s.run_pending() == 1
+    assert fired == ["a"]
+
+
+def test_same_deadline(wheel_resolution) -> None:
+    """
+    Timers with the same deadline run in the order in which
+    they were scheduled.
+    """
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    for i in range(20):
+        s.schedule_at(101.0, fired.append, i)
+
+    clock.now = 101.0
+    s.run_pending()
+    assert fired == list(range(20))
+
+
+def test_names(wheel_resolution) -> None:
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+
+    assert s.schedule_after(1.0, print, name="job") == "job"
+    with pytest.raises(ValueError):
+        s.schedule_after(2.0, print, name="job")
+    assert s.schedule_after(1.0, print) != s.schedule_after(1.0, print)
+
+
+def test_reschedule(wheel_resolution) -> None:
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    s.schedule_at(101.0, fired.append, "a", name="a")
+    s.schedule_at(102.0, fired.append, "b", name="b")
+    s.reschedule("a", 103.0)
+
+    clock.now = 102.5
+    s.run_pending()
+    assert fired == ["b"]
+
+    s.reschedule("a", 102.0)
+    s.run_pending()
+    assert fired == ["b", "a"]
+
+    with pytest.raises(ValueError):
+        s.reschedule("a", 110.0)
+
+
+def test_cancel(wheel_resolution) -> None:
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    s.schedule_at(101.0, fired.append, "a", name="a")
+    s.schedule_at(101.0, fired.append, "b", name="b")
+    s.cancel("a")
+    assert s.size == 1
+
+    clock.now = 200.0
+    s.run_pending()
+    assert fired == ["b"]
+
+    with pytest.raises(ValueError):
+        s.cancel("a")
+    with pytest.raises(ValueError):
+        s.cancel("b")
+
+
+def test_past_deadline(wheel_resolution) -> None:
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    s.schedule_at(50.0, fired.append, "a")
+    assert s.run_pending() == 1
+    assert fired == ["a"]
+
+
+def test_callback_reschedules_itself(wheel_resolution) -> None:
+    """
+    A callback can schedule a timer with its own name (e.g.,
+    to run periodically)
+    """
+    clock = FakeClock()
+    s = Scheduler(wheel_resolution, clock=clock)
+    fired = []
+
+    def tick() -> None:
+        fired.append(clock.now)
+        if len(fired) < 3:
+            s.schedule_after(1.0, tick, name="tick")
+
+    s.schedule_after(1.0, tick, name="tick")
+    for now in (101.0, 102.0, 103.0, 104.0):
+        clock.now = now
+        s.run_pending()
+    assert fired == [101.0, 102.0, 103.0]
+
+
+def test_wheel_rounding() -> None:
+    """
+    With a timing wheel, deadlines are rounded up to a tick,
+    so a timer may run late but never early.
+    """
+    clock = FakeClock(0.0)
+    s = Scheduler(wheel_resolution=0.01, clock=clock)
+    fired = []
+
+    s.schedule_at(0.015, fired.append, "a")
+    assert s.next_deadline() == pytest.approx(0.02)
+
+    clock.now = 0.019
+    assert s.run_pending() == 0
+    clock.now = 0.02
+    assert s.run_pending() == 1
+    assert fired == ["a"]
+
+
+def test_wheel_resolution_invalid() -> None:
+    with pytest.raises(ValueError):
+        Scheduler(wheel_resolution=0)
+
+
+def test_run_until_empty(wheel_resolution) -> None:
+    """
+    The run loop sleeps until each deadline, and runs the
+    timers in order (this test uses the real clock).
+    """
+    s = Scheduler(wheel_resolution)
+    fired = []
+    start = time.monotonic()
+
+    s.schedule_after(0.06, lambda: fired.append(("b", time.monotonic())))
+    s.schedule_after(0.03, lambda: fired.append(("a", time.monotonic())))
+    s.run(until_empty=True)
+
+    assert [name for name, _ in fired] == ["a", "b"]
+    assert fired[0][1] - start >= 0.03
+    assert fired[1][1] - start >= 0.06
+
+
+def test_run_woken_by_earlier_timer(wheel_resolution) -> None:
+    """
+    A timer scheduled from another thread with an earlier
+    deadline interrupts the sleep of the run loop.
+    """
+    s = Scheduler(wheel_resolution)
+    fired = []
+
+    s.schedule_after(5.0, fired.append, "late", name="late")
+    runner = threading.Thread(target=s.run)
+    runner.start()
+    time.sleep(0.02)
+
+    start = time.monotonic()
+    s.schedule_after(0.02, fired.append, "early")
+    while not fired and time.monotonic() - start < 2:
+        time.sleep(0.005)
+    s.stop()
+    runner.join(timeout=2)
+
+    assert not runner.is_alive()
+    assert fired == ["early"]
+    assert time.monotonic() - start < 2
+    assert s.size == 1
+
+
+def test_stop_before_run() -> None:
+    s = Scheduler()
+
+    s.schedule_after(10.0, print)
+    s.stop()
+    s.run()
+    assert s.size == 1
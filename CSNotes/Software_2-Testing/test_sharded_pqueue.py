@@ -0,0 +1,183 @@
+import multiprocessing
+import random
+
+from sharded_pqueue import ShardedPriorityQueue
+import pytest
+
+
+def _producer(q: ShardedPriorityQueue, start: int, count: int) -> None:
+    for i in range(start, start + count):
+        q.enqueue(f"item{i}", i)
+    q.close()
+
+
+def _consumer(q: ShardedPriorityQueue, count: int, results) -> None:
+    for _ in range(count):
+        results.put(q.dequeue())
+    q.close()
+
+
+def test_enqueue_dequeue() -> None:
+    with ShardedPriorityQueue(shards=4, capacity=100, sample=None) as q:
+        q.enqueue("b", 20)
+        q.enqueue("a", 10)
+        q.enqueue("c", 30)
+        assert q.size == 3
+
+        assert q.dequeue() == ("a", 10)
+        assert q.dequeue() == ("b", 20)
+        assert q.dequeue() == ("c", 30)
+        assert q.size == 0
+
+        with pytest.raises(IndexError):
+            q.dequeue()
+
+
+def test_strict_order() -> None:
+    """
+    When dequeue samples every shard, the elements come out in
+    priority order, as in a PriorityQueue.
+    """
+    rng = random.Random(25)
+    prios = [rng.randrange(-1000, 1000) for _ in range(500)]
+
+    with ShardedPriorityQueue(shards=8, capacity=500, sample=None) as q:
+        for i, prio in enumerate(prios):
+            q.enqueue(f"item{i}", prio)
+        out = [q.dequeue()[1] for _ in range(len(prios))]
+
+    assert out == sorted(prios)
+
+
+def test_relaxed_dequeue() -> None:
+    """
+    With a smaller sample, dequeue may return elements out of
+    order, but every element comes out exactly once (even from
+    shards that are rarely sampled).
+    """
+    rng = random.Random(26)
+    items = {f"item{i}": rng.randrange(1000) for i in range(1000)}
+
+    with ShardedPriorityQueue(shards=8, capacity=1000, sample=2) as q:
+        for value, prio in items.items():
+            q.enqueue(value, prio)
+        out = dict(q.dequeue() for _ in range(len(items)))
+        assert q.size == 0
+        with pytest.raises(IndexError):
+            q.dequeue()
+
+    assert out == items
+
+
+def test_relaxed_dequeue_mostly_ordered() -> None:
+    """
+    Each dequeue returns the best of the sampled heads, so the
+    output is close to sorted order.
+    """
+    rng = random.Random(27)
+    prios = list(range(2000))
+    rng.shuffle(prios)
+
+    with ShardedPriorityQueue(shards=4, capacity=2000, sample=2) as q:
+        for prio in prios:
+            q.enqueue(f"item{prio}", prio)
+        out = [q.dequeue()[1] for _ in range(len(prios))]
+
+    # Average distance between an element's position and its rank
+    error = sum(abs(pos - prio) for pos, prio in enumerate(out)) / len(out)
+    assert error < 50
+
+
+def test_values() -> None:
+    with ShardedPriorityQueue(shards=2, capacity=10, value_size=8,
+                              sample=None) as q:
+        q.enqueue("", 2)
+        q.enqueue("héllo", 1)
+        q.enqueue("12345678", 3)
+
+        with pytest.raises(ValueError):
+            q.enqueue("123456789", 4)
+        with pytest.raises(ValueError):
+            q.enqueue("x", 2**63)
+
+        assert q.dequeue() == ("héllo", 1)
+        assert q.dequeue() == ("", 2)
+        assert q.dequeue() == ("12345678", 3)
+
+
+@pytest.mark.parametrize("priority", [0.5, "abc", 2**63, -2**63 - 1, None])
+def test_invalid_priority(priority) -> None:
+    """
+    A priority that can't be stored is rejected without
+    modifying the shard (so no element is lost or duplicated,
+    and no value slot leaks).
+    """
+    with ShardedPriorityQueue(shards=1, capacity=3, sample=None) as q:
+        q.enqueue("a", 1)
+        q.enqueue("b", 5)
+
+        with pytest.raises(ValueError):
+            q.enqueue("d", priority)
+        assert q.size == 2
+
+        # Every slot is still free
+        q.enqueue("c", 7)
+        assert q.size == 3
+        assert [q.dequeue() for _ in range(3)] == [("a", 1), ("b", 5),
+                                                   ("c", 7)]
+
+
+def test_full_shard() -> None:
+    with ShardedPriorityQueue(shards=1, capacity=3, sample=None) as q:
+        for i in range(3):
+            q.enqueue(f"item{i}", i)
+        with pytest.raises(ValueError):
+            q.enqueue("item3", 3)
+
+        # Dequeueing frees a slot
+        q.dequeue()
+        q.enqueue("item3", 3)
+        assert q.size == 3
+
+
+def test_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        ShardedPriorityQueue(shards=0)
+    with pytest.raises(ValueError):
+        ShardedPriorityQueue(shards=2, sample=3)
+    with pytest.raises(ValueError):
+        ShardedPriorityQueue(value_size=2**16)
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_multiple_processes(method) -> None:
+    """
+    Several processes enqueue elements, and then several other
+    processes dequeue them.
+    """
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{method} is not available")
+    ctx = multiprocessing.get_context(method)
+
+    with ShardedPriorityQueue(shards=4, capacity=1000, context=ctx) as q:
+        producers = [ctx.Process(target=_producer, args=(q, 250 * i, 250))
+                     for i in range(4)]
+        for p in producers:
+            p.start()
+        for p in producers:
+            p.join()
+            assert p.exitcode == 0
+        assert q.size == 1000
+
+        results = ctx.Queue()
+        consumers = [ctx.Process(target=_consumer, args=(q, 500, results))
+                     for i in range(2)]
+        for p in consumers:
+            p.start()
+        out = [results.get(timeout=30) for _ in range(1000)]
+        for p in consumers:
+            p.join()
+            assert p.exitcode == 0
+
+        assert q.size == 0
+        assert sorted(out) == sorted((f"item{i}", i) for i in range(1000))
@@ -0,0 +1,164 @@
+import random
+
+from sortedruns import SortedRuns
+import pytest
+
+
+def test_empty() -> None:
+    sr = SortedRuns()
+
+    assert len(sr) == 0
+    assert sr.min() is None
+    assert list(sr) == []
+    with pytest.raises(IndexError):
+        sr.pop_min()
+
+
+def test_add_pop() -> None:
+    sr = SortedRuns()
+
+    sr.add(30, "c")
+    sr.add(10, "a")
+    sr.add(20, "b")
+    sr.add(10, "aa")
+
+    assert len(sr) == 4
+    assert "a" in sr and "z" not in sr
+    assert sr.priority("b") == 20
+    assert list(sr) == [(10, "a"), (10, "aa"), (20, "b"), (30, "c")]
+    assert sr.min() == (10, "a")
+    assert [sr.pop_min() for _ in range(4)] == \
+        [(10, "a"), (10, "aa"), (20, "b"), (30, "c")]
+
+
+def test_add_repeated() -> None:
+    sr = SortedRuns()
+
+    sr.add(10, "a")
+    with pytest.raises(ValueError):
+        sr.add(20, "a")
+    assert len(sr) == 1
+
+
+def test_remove() -> None:
+    sr = SortedRuns()
+
+    sr.add(10, "a")
+    sr.add(20, "b")
+    assert sr.remove("a") == 10
+    assert list(sr) == [(20, "b")]
+
+    with pytest.raises(ValueError):
+        sr.remove("a")
+    with pytest.raises(ValueError):
+        sr.priority("a")
+
+
+def test_many_runs() -> None:
+    """
+    Checks that runs are split as the list grows, and that
+    popping and removing keep every run sorted.
+    """
+    sr = SortedRuns()
+    prios = list(range(10_000))
+    random.Random(21).shuffle(prios)
+    for prio in prios:
+        sr.add(prio, f"item{prio}")
+
+    assert len(sr._runs) > 1
+    assert all(len(run) <= 2 * max(64, 100) + 1 for run in sr._runs)
+    assert [prio for prio, _ in sr] == list(range(10_000))
+
+    for prio in range(0, 10_000, 3):
+        assert sr.remove(f"item{prio}") == prio
+    assert [sr.pop_min()[0] for _ in range(100)] == \
+        [p for p in range(10_000) if p % 3][:100]
+
+
+@pytest.mark.parametrize("pop", [False, True])
+def test_runs_merged(pop: bool) -> None:
+    """
+    Checks that runs that become short are merged with their
+    neighbours, so that the number of runs stays O(sqrt(n)) as
+    the list shrinks (removing items from anywhere in the list,
+    or mixing removals with pops).
+    """
+    rng = random.Random(210)
+    sr = SortedRuns()
+    n = 50_000
+    prios = list(range(n))
+    rng.shuffle(prios)
+    for prio in prios:
+        sr.add(prio, f"item{prio}")
+    peak = len(sr._runs)
+
+    while len(sr) > 1000:
+        if pop and rng.random() < 0.5:
+            sr.pop_min()
+        else:
+            sr.remove(sr.at(rng.randrange(len(sr)))[1])
+
+        if len(sr) % 1000 == 0:
+            # Every run but the first and the last has at least
+            # half the load
+            load = max(64, int(len(sr) ** 0.5))
+            assert all(len(run) >= load // 2 for run in sr._runs[1:-1])
+
+    # With 1000 items left the load is 64, so each run has at
+    # least 32 items, while there were many more runs at the peak
+    assert peak > 100
+    assert len(sr._runs) <= len(sr) // 32 + 1
+    remaining = [prio for prio, _ in sr]
+    assert remaining == sorted(remaining)
+    assert [sr.at(k)[0] for k in range(len(sr))] == remaining
+    assert sr.count_below(n // 2) == sum(1 for p in remaining if p < n // 2)
+
+
+def test_random() -> None:
+    """
+    Compares a SortedRuns with a sorted Python list, on a
+    random mix of additions, removals and pops.
+    """
+    rng = random.Random(42)
+    sr = SortedRuns()
+    expected: list[tuple[int, str]] = []
+
+    for i in range(5000):
+        r = rng.random()
+        if r < 0.5 or not expected:
+            pair = (rng.randrange(500), f"item{i}")
+            sr.add(*pair)
+            expected.append(pair)
+            expected.sort()
+        elif r < 0.75:
+            pair = expected.pop(rng.randrange(len(expected)))
+            assert sr.remove(pair[1]) == pair[0]
+        else:
+            assert sr.pop_min() == expected.pop(0)
+        assert len(sr) == len(expected)
+        assert sr.min() == (expected[0] if expected else None)
+
+    assert list(sr) == expected
+
+
+def test_order_statistics() -> None:
+    rng = random.Random(7)
+    sr = SortedRuns()
+    pairs = [(rng.randrange(1000), f"item{i}") for i in range(3000)]
+    for prio, item in pairs:
+        sr.add(prio, item)
+    for _ in range(500):
+        sr.pop_min()
+    expected = sorted(pairs)[500:]
+
+    for k in (0, 1, 700, len(expected) - 1):
+        assert sr.at(k) == expected[k]
+    with pytest.raises(IndexError):
+        sr.at(len(expected))
+
+    for threshold in (0, 150, 151, 500, 999, 5000):
+        assert sr.count_below(threshold) == \
+            sum(prio < threshold for prio, _ in expected)
+        assert list(sr.irange(threshold, threshold + 100)) == \
+            [pair for pair in expected
+             if threshold <= pair[0] < threshold + 100]
@@ -0,0 +1,157 @@
+import random
+
+from timing_wheel import TimingWheel
+import pytest
+
+
+def test_empty() -> None:
+    tw = TimingWheel()
+
+    assert tw.size == 0
+    assert tw.next_deadline() is None
+    assert tw.advance(1000) == []
+    assert tw.current == 1001
+
+
+def test_advance() -> None:
+    tw = TimingWheel()
+
+    tw.enqueue("c", 30)
+    tw.enqueue("a", 10)
+    tw.enqueue("b", 20)
+    assert tw.size == 3
+    assert tw.next_deadline() == 10
+
+    assert tw.advance(9) == []
+    assert tw.advance(20) == [("a", 10), ("b", 20)]
+    assert tw.size == 1
+    assert "c" in tw and "a" not in tw
+    assert tw.advance(100) == [("c", 30)]
+
+
+def test_same_deadline() -> None:
+    """
+    Timers with the same deadline expire in the order in
+    which they were added, even if they were added to
+    different levels of the wheel.
+    """
+    tw = TimingWheel()
+
+    tw.enqueue("a", 5000)
+    tw.advance(4990)
+    tw.enqueue("b", 5000)
+    tw.enqueue("c", 5000)
+
+    assert tw.advance(5000) == [("a", 5000), ("b", 5000), ("c", 5000)]
+
+
+def test_enqueue_repeated() -> None:
+    tw = TimingWheel()
+
+    tw.enqueue("a", 10)
+
+    with pytest.raises(ValueError):
+        tw.enqueue("a", 20)
+
+
+def test_past_deadline() -> None:
+    tw = TimingWheel(start=100)
+
+    tw.enqueue("a", 50)
+    assert tw.next_deadline() == 50
+    assert tw.advance(0) == [("a", 50)]
+
+
+def test_cancel() -> None:
+    tw = TimingWheel()
+
+    tw.enqueue("a", 10)
+    tw.enqueue("b", 100_000)
+    assert tw.cancel("b") == 100_000
+    assert tw.cancel("a") == 10
+    assert tw.size == 0
+    assert tw.advance(1_000_000) == []
+
+    with pytest.raises(ValueError):
+        tw.cancel("a")
+
+
+def test_update_priority() -> None:
+    tw = TimingWheel()
+
+    tw.enqueue("a", 10)
+    tw.enqueue("b", 20)
+    tw.update_priority("a", 30)
+
+    assert tw.advance(25) == [("b", 20)]
+    assert tw.advance(30) == [("a", 30)]
+
+    with pytest.raises(ValueError):
+        tw.update_priority("a", 40)
+
+
+def test_next_deadline_lower_bound() -> None:
+    """
+    A far deadline is only known approximately, but the
+    bound gets better as the wheel advances.
+    """
+    tw = TimingWheel()
+
+    tw.enqueue("a", 100_000)
+
+    bound = tw.next_deadline()
+    steps = 0
+    while True:
+        assert bound is not None and bound <= 100_000
+        expired = tw.advance(bound)
+        if expired:
+            break
+        new_bound = tw.next_deadline()
+        assert new_bound is not None and new_bound > bound
+        bound = new_bound
+        steps += 1
+
+    assert expired == [("a", 100_000)]
+    assert bound == 100_000
+    assert steps <= 3
+
+
+def test_random() -> None:
+    """
+    Compares the wheel with a sorted list of deadlines, adding,
+    cancelling and rescheduling timers at random while the
+    wheel advances in random steps.
+    """
+    rng = random.Random(20)
+    tw = TimingWheel(start=1234)
+    deadlines: dict[str, int] = {}
+    now = 1234
+
+    for i in range(3000):
+        r = rng.random()
+        if r < 0.5:
+            deadline = now + rng.choice((rng.randrange(100),
+                                         rng.randrange(1_000_000)))
+            tw.enqueue(f"t{i}", deadline)
+            deadlines[f"t{i}"] = deadline
+        elif r < 0.6 and deadlines:
+            name = rng.choice(list(deadlines))
+            assert tw.cancel(name) == deadlines.pop(name)
+        elif r < 0.7 and deadlines:
+            name = rng.choice(list(deadlines))
+            deadlines[name] = now + rng.randrange(10_000)
+            tw.update_priority(name, deadlines[name])
+        else:
+            bound = tw.next_deadline()
+            if deadlines:
+                assert bound is not None
+                assert bound <= min(deadlines.values())
+            now += rng.choice((rng.randrange(10), rng.randrange(100_000)))
+            expired = tw.advance(now)
+            expected = sorted((d, name) for name, d in deadlines.items()
+                              if d <= now)
+            assert sorted((d, name) for name, d in expired) == expected
+            assert [d for _, d in expired] == sorted(d for _, d in expired)
+            for _, name in expected:
+                del deadlines[name]
+        assert tw.size == len(deadlines)
@@ -0,0 +1,97 @@
+import random
+
+from topk import TopK
+import pytest
+
+
+def test_init() -> None:
+    top = TopK(3)
+
+    assert top.k == 3
+    assert top.size == 0
+    assert top.threshold is None
+    assert top.result() == []
+
+
+def test_invalid_k() -> None:
+    with pytest.raises(ValueError):
+        TopK(0)
+
+
+def test_push() -> None:
+    top = TopK(3)
+
+    for score in [5, 1, 9, 3, 7, 2]:
+        top.push(score)
+
+    assert top.size == 3
+    assert top.threshold == 5
+    assert top.result() == [(9, 9), (7, 7), (5, 5)]
+
+
+def test_fewer_than_k() -> None:
+    top = TopK(10)
+    top.push_many([4, 2, 8])
+
+    assert top.size == 3
+    assert top.threshold is None
+    assert top.result() == [(8, 8), (4, 4), (2, 2)]
+
+
+def test_key() -> None:
+    top = TopK(2, key=lambda record: record["score"])
+    top.push_many([{"id": "a", "score": 3}, {"id": "b", "score": 10},
+                   {"id": "c", "score": 1}, {"id": "d", "score": 7}])
+
+    assert [record["id"] for _, record in top.result()] == ["b", "d"]
+
+
+def test_duplicate_records() -> None:
+    """
+    The same record can be kept more than once (for example,
+    if it appears twice in the stream)
+    """
+    top = TopK(3)
+    top.push_many([5, 5, 1, 5, 2])
+
+    assert top.result() == [(5, 5), (5, 5), (5, 5)]
+
+
+def test_memory_is_bounded() -> None:
+    top = TopK(5)
+    top.push_many(range(10_000))
+
+    assert len(top._records) == 5
+    assert top._mh._capacity == 5
+    assert [score for score, _ in top.result()] == \
+        [9999, 9998, 9997, 9996, 9995]
+
+
+@pytest.mark.parametrize("k", [1, 10, 100])
+def test_random_stream(k: int) -> None:
+    rng = random.Random(k)
+    stream = [(rng.randrange(1000), f"record{i}") for i in range(5000)]
+    top = TopK(k, key=lambda record: record[0])
+
+    for record in stream[:100]:
+        top.push(record)
+    top.push_many(stream[100:])
+
+    expected = sorted((score for score, _ in stream), reverse=True)[:k]
+    assert [score for score, _ in top.result()] == expected
+
+
+def test_merge() -> None:
+    rng = random.Random(0)
+    stream = [rng.random() for _ in range(3000)]
+
+    shards = [TopK(20) for _ in range(3)]
+    for i, shard in enumerate(shards):
+        shard.push_many(stream[i::3])
+
+    merged = TopK(20)
+    for shard in shards:
+        merged.merge(shard)
+
+    assert merged.result() == [(s, s) for s in sorted(stream, reverse=True)[:20]]
+    assert shards[0].size == 20
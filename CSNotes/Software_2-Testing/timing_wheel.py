@@ -0,0 +1,255 @@
+from typing import Optional
+
+# Each level of the wheel has 2**_BITS slots
+_BITS = 6
+_SLOTS = 1 << _BITS
+_MASK = _SLOTS - 1
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel: a structure that holds timers
+    (values with an integer deadline, measured in "ticks") and
+    returns them when the current time reaches their deadline.
+
+    Level 0 of the wheel has one slot for each of the next 64
+    ticks. Level 1 has one slot for each of the next 64 blocks
+    of 64 ticks, level 2 for each of the next 64 blocks of 64*64
+    ticks, and so on. A timer is stored in the level that
+    corresponds to the first (most significant) base-64 digit
+    in which its deadline differs from the current time. When
+    the current time reaches the start of a slot of level L > 0,
+    the timers in that slot are moved ("cascaded") to lower
+    levels, and each timer is cascaded at most once per level.
+
+    So, unlike a heap, adding, cancelling and rescheduling a
+    timer takes O(1) time regardless of the number of timers,
+    which makes the wheel suitable for millions of short timers.
+    The price is that deadlines have a resolution of one tick,
+    and that the earliest deadline is only known exactly once
+    it is within the next 64 ticks (see next_deadline).
+    """
+
+    # Current time: every timer with a deadline before _current
+    # has already been returned by advance (or is in _due)
+    _current: int
+
+    # _levels[L][s] maps the values of the timers in slot s of
+    # level L to their deadlines, and _counts[L] is the number
+    # of timers in level L
+    _levels: list[list[dict[str, int]]]
+    _counts: list[int]
+
+    # Timers whose deadline had already passed when they were
+    # added (they are returned by the next call to advance)
+    _due: dict[str, int]
+
+    # Level and slot of each timer (level -1 means _due)
+    _location: dict[str, tuple[int, int]]
+
+    def __init__(self, start: int = 0):
+        """
+        Constructor. Creates an empty timing wheel.
+
+        Args:
+            start: Current time, in ticks
+        """
+        self._current = start
+        self._levels = []
+        self._counts = []
+        self._due = {}
+        self._location = {}
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of timers in the wheel
+        """
+        return len(self._location)
+
+    @property
+    def current(self) -> int:
+        """
+        Returns the current time of the wheel (the time after
+        the last call to advance), in ticks
+        """
+        return self._current
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._location
+
+    def _place(self, value: str, deadline: int) -> None:
+        """
+        Stores a timer in the slot that corresponds to its
+        deadline (which must be at least the current time)
+        """
+        level = ((deadline ^ self._current).bit_length() - 1) // _BITS
+        if level < 0:
+            level = 0
+        while len(self._levels) <= level:
+            self._levels.append([{} for _ in range(_SLOTS)])
+            self._counts.append(0)
+        slot = (deadline >> (_BITS * level)) & _MASK
+        self._levels[level][slot][value] = deadline
+        self._counts[level] += 1
+        self._location[value] = (level, slot)
+
+    def enqueue(self, value: str, deadline: int) -> None:
+        """
+        Adds a timer to the wheel. If the deadline has already
+        passed, the timer is returned by the next call to advance.
+
+        Args:
+            value: Name of the timer
+            deadline: Time (in ticks) at which the timer expires
+
+        Raises:
+            ValueError: If `value` is already in the wheel
+
+        Returns: Nothing
+        """
+        if value in self._location:
+            raise ValueError(f"timer '{value}' already in the timing wheel")
+        if deadline < self._current:
+            self._due[value] = deadline
+            self._location[value] = (-1, 0)
+        else:
+            self._place(value, deadline)
+
+    def cancel(self, value: str) -> int:
+        """
+        Removes a timer from the wheel.
+
+        Args:
+            value: Name of the timer
+
+        Raises:
+            ValueError: If `value` is not in the wheel
+
+        Returns: The deadline that the timer had
+        """
+        location = self._location.pop(value, None)
+        if location is None:
+            raise ValueError(f"timer '{value}' not in the timing wheel")
+        level, slot = location
+        if level < 0:
+            return self._due.pop(value)
+        self._counts[level] -= 1
+        return self._levels[level][slot].pop(value)
+
+    def update_priority(self, value: str, new_deadline: int) -> None:
+        """
+        Changes the deadline of a timer.
+
+        Args:
+            value: Name of the timer
+            new_deadline: New deadline, in ticks
+
+        Raises:
+            ValueError: If `value` is not in the wheel
+
+        Returns: Nothing
+        """
+        self.cancel(value)
+        self.enqueue(value, new_deadline)
+
+    def _cascade(self, level: int) -> None:
+        """
+        Moves the timers in the slot of the given level that
+        starts at the current time to lower levels.
+        """
+        slot = (self._current >> (_BITS * level)) & _MASK
+        timers = self._levels[level][slot]
+        if not timers:
+            return
+        self._levels[level][slot] = {}
+        self._counts[level] -= len(timers)
+        for value, deadline in timers.items():
+            self._place(value, deadline)
+
+    def advance(self, now: int) -> list[tuple[str, int]]:
+        """
+        Moves the current time forward, and removes every timer
+        whose deadline is at most `now`.
+
+        Args:
+            now: New current time, in ticks (if it is earlier
+              than the current time, only the timers that were
+              already due are returned)
+
+        Returns: List of (value, deadline) pairs with the expired
+         timers, in order of deadline (timers with the same
+         deadline are returned in the order they were added)
+        """
+        expired = list(self._due.items())
+        self._due = {}
+
+        levels, counts = self._levels, self._counts
+        while self._current <= now:
+            current = self._current
+
+            # Cascade the levels whose slot starts at the current
+            # time, from the highest one down (a timer cascaded
+            # from level L may land in the slot of level L-1 that
+            # starts now, which is then cascaded too)
+            for level in range(len(levels) - 1, 0, -1):
+                if current & ((1 << (_BITS * level)) - 1) == 0:
+                    self._cascade(level)
+
+            if counts and counts[0]:
+                timers = levels[0][current & _MASK]
+                if timers:
+                    levels[0][current & _MASK] = {}
+                    counts[0] -= len(timers)
+                    expired.extend(timers.items())
+
+            # Skip the ticks in which nothing can happen: if the
+            # lowest non-empty level is L, the next event is the
+            # start of the next slot of level L (or later)
+            lowest = next((level for level, count in enumerate(counts)
+                           if count), None)
+            if lowest is None:
+                self._current = max(current + 1, now + 1)
+            elif lowest == 0:
+                self._current = current + 1
+            else:
+                width = 1 << (_BITS * lowest)
+                self._current = min((current // width + 1) * width, now + 1)
+
+        for value, _ in expired:
+            del self._location[value]
+        expired.sort(key=lambda timer: timer[1])
+        return expired
+
+    def next_deadline(self) -> Optional[int]:
+        """
+        Returns: A lower bound on the earliest deadline in the
+         wheel, which is exact if that deadline is within the next
+         64 ticks (otherwise, it's the time at which the timer
+         will be cascaded, so a caller that sleeps until then and
+         calls advance gets a better bound), or None if the wheel
+         is empty
+        """
+        if self._due:
+            return min(self._due.values())
+        rv = None
+        for level, count in enumerate(self._counts):
+            if count == 0:
+                continue
+            shift = _BITS * level
+            slots = self._levels[level]
+            # Every timer in this level is in the current slot or
+            # a later one (a timer of level L > 0 can only be in
+            # the current slot if the current time is the start
+            # of that slot, and the slot hasn't been cascaded yet)
+            for slot in range((self._current >> shift) & _MASK, _SLOTS):
+                if slots[slot]:
+                    if level == 0:
+                        bound = min(slots[slot].values())
+                    else:
+                        base = self._current >> (shift + _BITS) << (shift + _BITS)
+                        bound = base | (slot << shift)
+                    if rv is None or bound < rv:
+                        rv = bound
+                    break
+        return rv
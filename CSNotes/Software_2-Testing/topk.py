@@ -0,0 +1,162 @@
+from typing import Any, Callable, Iterable, Optional
+
+from minheap import MinHeap
+
+
+class TopK:
+    """
+    Keeps the k records with the highest scores seen in a
+    stream of records, using O(k) memory no matter how long
+    the stream is.
+
+    The records that are currently kept are stored in a
+    MinHeap of size k, so the record with the lowest score
+    (the one that would be dropped next) is always at the
+    root. A new record is only added if its score is higher
+    than that score, in which case it replaces the root.
+
+    Partial results can be combined with merge, so a stream
+    can be split into shards that are processed separately.
+    """
+
+    _k: int
+    _key: Callable[[Any], Any]
+
+    # The heap contains (score, slot) pairs, where slot is the
+    # position of the record (and its score) in _records and
+    # _scores. A record that is dropped from the heap is
+    # replaced in the same slot.
+    _mh: MinHeap
+    _records: list[Any]
+    _scores: list[Any]
+
+    def __init__(self, k: int, key: Optional[Callable[[Any], Any]] = None):
+        """
+        Constructor. Creates an empty selector.
+
+        Args:
+            k: Number of records to keep
+            key: Function that returns the score of a record
+              (if None, the records are their own scores)
+
+        Raises:
+            ValueError: If k is not positive
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self._k = k
+        self._key = key if key is not None else lambda record: record
+        # The slots are never compared with each other, since
+        # it doesn't matter which of two records with the same
+        # score is dropped first.
+        self._mh = MinHeap(initial_capacity=k, tie_break="none")
+        self._records = []
+        self._scores = []
+
+    @property
+    def k(self) -> int:
+        """
+        Returns: Number of records to keep
+        """
+        return self._k
+
+    @property
+    def size(self) -> int:
+        """
+        Returns: Number of records that are currently kept
+        (which is k once at least k records have been pushed)
+        """
+        return self._mh.size
+
+    @property
+    def threshold(self) -> Optional[Any]:
+        """
+        Returns: Score that a new record has to exceed to be
+         kept, or None if fewer than k records have been pushed.
+        """
+        if self._mh.size < self._k:
+            return None
+        entry = self._mh.min()
+        assert entry is not None
+        return entry[0]
+
+    def _add(self, score: Any, record: Any) -> None:
+        """
+        Adds a record to the selector, replacing the record
+        with the lowest score if the selector is full.
+        """
+        if self._mh.size < self._k:
+            slot = len(self._records)
+            self._records.append(record)
+            self._scores.append(score)
+            self._mh.insert(score, slot)  # type: ignore
+        else:
+            entry = self._mh.min()
+            assert entry is not None
+            slot = entry[1]
+            self._records[slot] = record  # type: ignore
+            self._scores[slot] = score  # type: ignore
+            self._mh.replace_min(score, slot)  # type: ignore
+
+    def push(self, record: Any) -> None:
+        """
+        Adds a record from the stream. The record is kept only
+        if it is among the k records with the highest scores.
+
+        Args:
+            record: Record to add
+
+        Returns: Nothing
+        """
+        score = self._key(record)
+        threshold = self.threshold
+        if threshold is None or threshold < score:
+            self._add(score, record)
+
+    def push_many(self, records: Iterable[Any]) -> None:
+        """
+        Adds several records from the stream. Once the selector
+        is full, most records in a long stream have a score
+        lower than the threshold, so we check that first
+        (without any method calls) and only touch the heap for
+        records that will be kept.
+
+        Args:
+            records: Iterable of records
+
+        Returns: Nothing
+        """
+        key = self._key
+        threshold = self.threshold
+        for record in records:
+            score = key(record)
+            if threshold is None or threshold < score:
+                self._add(score, record)
+                threshold = self.threshold
+
+    def merge(self, other: "TopK") -> None:
+        """
+        Adds the records kept by another selector (for example,
+        one that processed a different shard of the stream) to
+        this selector. The other selector is not modified.
+
+        Args:
+            other: Selector to merge into this one
+
+        Returns: Nothing
+        """
+        # The records are merged from highest to lowest score,
+        # so we can stop at the first one that isn't kept.
+        for score, record in other.result():
+            threshold = self.threshold
+            if threshold is not None and not threshold < score:
+                break
+            self._add(score, record)
+
+    def result(self) -> list[tuple[Any, Any]]:
+        """
+        Returns: List of (score, record) pairs for the records
+         that are currently kept, from highest to lowest score.
+        """
+        return sorted(zip(self._scores, self._records),
+                      key=lambda pair: pair[0], reverse=True)